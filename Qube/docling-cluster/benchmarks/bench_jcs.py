@@ -0,0 +1,108 @@
+"""
+JCS Benchmark - lib.jcs.canonicalize against the json.dumps encoder it replaced.
+
+Times canonicalization of realistic doc.normalized.v1 payloads (nested
+structure, non-ASCII text, integer offsets) and chunk.embedding.v1
+payloads (384- and 768-dim float vectors), and reports how often the two
+encoders disagree (only numbers ECMAScript formats differently, and keys
+outside ASCII, should).
+
+Usage:
+    python benchmarks/bench_jcs.py [--iterations N] [--dims 384 768]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib import jcs
+
+
+def legacy_canonicalize(obj) -> str:
+    """The previous lib.jcs.canonicalize."""
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+
+
+def make_doc_payload(i: int, blocks: int = 200) -> dict:
+    """Synthetic doc.normalized.v1 payload."""
+    rng = random.Random(i)
+    words = ["ledger", "canonical", "Zürich", "données", "naïve", "vector", "hash", "résumé"]
+    text = []
+    structure = []
+    offset = 0
+    for b in range(blocks):
+        block = " ".join(rng.choice(words) for _ in range(rng.randint(5, 40)))
+        structure.append({
+            "type": rng.choice(["heading", "paragraph", "list", "table", "code"]),
+            "start": offset,
+            "end": offset + len(block),
+            "level": b % 4,
+        })
+        text.append(block)
+        offset += len(block) + 1
+    return {
+        "id": f"doc-{i}",
+        "source_hash": f"sha256:{i:064x}",
+        "content": {"text": "\n".join(text), "structure": structure},
+        "metadata": {"title": f"Document {i}", "author": "Bench", "language": "en", "source_type": "pdf"},
+        "normalized_at": "2024-01-01T00:00:00+00:00",
+    }
+
+
+def make_chunk_payload(i: int, dim: int) -> dict:
+    """Synthetic chunk.embedding.v1 payload with an L2-normalized vector."""
+    rng = random.Random(i)
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return {
+        "schema": "chunk.embedding.v1",
+        "doc_id": f"sha256:{i:064x}",
+        "chunk_id": f"sha256:{i + 1:064x}",
+        "chunker": {"version": "chunk.v1", "method": "block+window", "params": {"max_tokens": 400, "overlap": 60}},
+        "embedding": {
+            "framework": "pytorch",
+            "model_id": "all-MiniLM-L6-v2",
+            "dim": dim,
+            "normalization": "l2",
+            "vector": [v / norm for v in vector],
+        },
+        "provenance": {"source_block_refs": [f"p{i}:b{j}" for j in range(3)]},
+    }
+
+
+def run(encode, payloads: list[dict], iterations: int) -> float:
+    """Microseconds per payload (best of iterations)."""
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for payload in payloads:
+            encode(payload)
+        best = min(best, time.perf_counter() - start)
+    return best / len(payloads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--payloads", type=int, default=200)
+    parser.add_argument("--dims", type=int, nargs="+", default=[384, 768])
+    args = parser.parse_args()
+
+    suites = [("doc.normalized.v1", [make_doc_payload(i) for i in range(args.payloads)])]
+    for dim in args.dims:
+        suites.append((f"chunk.embedding.v1/{dim}", [make_chunk_payload(i, dim) for i in range(args.payloads)]))
+
+    print(f"{'payload':<24} {'json.dumps':>14} {'jcs':>14} {'ratio':>7} {'differ':>7}")
+    for name, payloads in suites:
+        legacy = run(legacy_canonicalize, payloads, args.iterations)
+        strict = run(jcs.canonicalize, payloads, args.iterations)
+        differ = sum(legacy_canonicalize(p) != jcs.canonicalize(p) for p in payloads)
+        print(f"{name:<24} {legacy:>9.1f} us {strict:>9.1f} us {strict / legacy:>6.2f}x {differ:>7}")
+
+
+if __name__ == "__main__":
+    main()
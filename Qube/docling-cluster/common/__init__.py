@@ -1,22 +1,52 @@
 # Common utilities package
 from .canonicalize import (
+    HASH_ALGORITHM,
     jcs_canonical_bytes,
     sha256_hex,
+    hash_hex,
+    hash_hex_many,
+    prefixed_digest,
+    split_digest,
+    verify_digest,
     hash_canonical,
+    hash_canonical_as,
     hash_canonical_without_integrity,
+    canonical_bytes_without_integrity,
+    sha256_many,
+    hash_many,
 )
 from .normalize import (
+    CellNormalizer,
     normalize_text,
+    normalize_many,
+    normalize_stream,
     l2_normalize,
+    l2_normalize_,
     l2_normalize_numpy,
+    l2_normalize_numpy_,
 )
 
 __all__ = [
+    "HASH_ALGORITHM",
     "jcs_canonical_bytes",
     "sha256_hex",
+    "hash_hex",
+    "hash_hex_many",
+    "prefixed_digest",
+    "split_digest",
+    "verify_digest",
     "hash_canonical",
+    "hash_canonical_as",
     "hash_canonical_without_integrity",
+    "canonical_bytes_without_integrity",
+    "sha256_many",
+    "hash_many",
+    "CellNormalizer",
     "normalize_text",
+    "normalize_many",
+    "normalize_stream",
     "l2_normalize",
+    "l2_normalize_",
     "l2_normalize_numpy",
+    "l2_normalize_numpy_",
 ]
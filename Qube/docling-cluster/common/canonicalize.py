@@ -2,10 +2,43 @@
 JCS Canonicalization and SHA256 Hashing.
 
 For deterministic JSON serialization and integrity verification.
+Integrity digests are written as "<algorithm>:<hex>"; HASH_ALGORITHM picks
+the algorithm for new ones, and verifiers use whichever one a digest names
+(bare hex, as in older records, is SHA-256).
 """
 import hashlib
 import json
-from typing import Any
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, Sequence
+
+
+# Digest algorithms by prefix; BLAKE2b is truncated to 256 bits like SHA-256
+HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": partial(hashlib.blake2b, digest_size=32),
+}
+
+# Algorithm for new digests
+HASH_ALGORITHM = os.environ.get("HASH_ALGORITHM", "sha256")
+
+# hashlib releases the GIL only while hashing inputs at least this long
+HASHLIB_GIL_MINSIZE = 2048
+
+# Batches smaller than this many bytes in total are hashed in the calling thread
+PARALLEL_HASH_MIN_BYTES = 1024 * 1024
+
+# Threads in the shared hashing pool (1: never use it)
+HASH_THREADS = min(8, os.cpu_count() or 1)
+
+# Batches handed to each pool thread (smaller batches balance load)
+BATCHES_PER_THREAD = 4
+
+_hash_pool: ThreadPoolExecutor | None = None
+_hash_pool_lock = threading.Lock()
 
 
 def jcs_canonical_bytes(obj: dict[str, Any]) -> bytes:
@@ -26,17 +59,42 @@ def jcs_canonical_bytes(obj: dict[str, Any]) -> bytes:
     ).encode("utf-8")
 
 
+def new_hash(algorithm: str = HASH_ALGORITHM) -> Any:
+    """A hashlib object for one of HASH_ALGORITHMS."""
+    try:
+        return HASH_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}") from None
+
+
+def split_digest(digest: str) -> tuple[str, str]:
+    """Split "<algorithm>:<hex>" into its parts; bare hex is SHA-256."""
+    algorithm, sep, hex_digest = digest.rpartition(":")
+    if not sep:
+        return "sha256", digest
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}")
+    return algorithm, hex_digest
+
+
 def sha256_hex(data: bytes) -> str:
     """Compute SHA-256 hash and return as hex string."""
     return hashlib.sha256(data).hexdigest()
 
 
-def hash_canonical(payload: dict[str, Any]) -> str:
+def hash_hex(data: bytes, algorithm: str = HASH_ALGORITHM) -> str:
+    """Hex digest of data with one of HASH_ALGORITHMS."""
+    digest = new_hash(algorithm)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def hash_canonical(payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> str:
     """Hash a dict using JCS canonicalization."""
-    return sha256_hex(jcs_canonical_bytes(payload))
+    return hash_hex(jcs_canonical_bytes(payload), algorithm)
 
 
-def hash_canonical_without_integrity(payload: dict[str, Any]) -> str:
+def hash_canonical_without_integrity(payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> str:
     """
     Hash a dict, excluding the 'integrity' field.
     
@@ -45,4 +103,102 @@ def hash_canonical_without_integrity(payload: dict[str, Any]) -> str:
     """
     tmp = dict(payload)
     tmp.pop("integrity", None)
-    return sha256_hex(jcs_canonical_bytes(tmp))
+    return hash_hex(jcs_canonical_bytes(tmp), algorithm)
+
+
+def prefixed_digest(data: bytes, algorithm: str = HASH_ALGORITHM) -> str:
+    """Prefixed digest ("<algorithm>:<hex>") of data."""
+    return f"{algorithm}:{hash_hex(data, algorithm)}"
+
+
+def hash_canonical_as(payload: dict[str, Any], digest: str) -> str:
+    """
+    Hash a dict with the algorithm an existing digest names, written the
+    same way (bare hex or prefixed), so the two can be compared directly.
+    """
+    algorithm, _ = split_digest(digest)
+    hex_digest = hash_canonical(payload, algorithm)
+    return f"{algorithm}:{hex_digest}" if ":" in digest else hex_digest
+
+
+def verify_digest(data: bytes, digest: str) -> bool:
+    """Check data against a digest, with the algorithm the digest names."""
+    algorithm, hex_digest = split_digest(digest)
+    return hash_hex(data, algorithm) == hex_digest
+
+
+def _hash_pool_executor() -> ThreadPoolExecutor:
+    """The shared hashing pool, started on first use."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ThreadPoolExecutor(max_workers=HASH_THREADS, thread_name_prefix="hash")
+        return _hash_pool
+
+
+def _reset_hash_pool() -> None:
+    """Forget the parent's pool in a forked child (its threads do not survive the fork)."""
+    global _hash_pool, _hash_pool_lock
+    _hash_pool = None
+    _hash_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_hash_pool)
+
+
+def _hash_batch(items: Sequence[bytes], algorithm: str) -> list[str]:
+    return [hash_hex(data, algorithm) for data in items]
+
+
+def hash_hex_many(items: Sequence[bytes], algorithm: str = HASH_ALGORITHM) -> list[str]:
+    """
+    Hex digests of many byte strings, in order.
+    
+    Batches of at least PARALLEL_HASH_MIN_BYTES whose items are long
+    enough for hashlib to release the GIL are split across the shared
+    thread pool; anything smaller is hashed in the calling thread, where
+    handing it to threads would only add overhead.
+    """
+    total = sum(map(len, items))
+    if (
+        HASH_THREADS < 2
+        or len(items) < 2
+        or total < PARALLEL_HASH_MIN_BYTES
+        or total < HASHLIB_GIL_MINSIZE * len(items)
+    ):
+        return _hash_batch(items, algorithm)
+    new_hash(algorithm)  # Reject unknown algorithms before submitting
+    step = -(-len(items) // (HASH_THREADS * BATCHES_PER_THREAD))
+    pool = _hash_pool_executor()
+    futures = [pool.submit(_hash_batch, items[i:i + step], algorithm) for i in range(0, len(items), step)]
+    return list(chain.from_iterable(future.result() for future in futures))
+
+
+def sha256_many(items: Sequence[bytes]) -> list[str]:
+    """SHA-256 hex digests of many byte strings (as sha256_hex, batched like hash_hex_many)."""
+    return hash_hex_many(items, "sha256")
+
+
+def hash_many(
+    payloads: Sequence[Any],
+    algorithm: str = HASH_ALGORITHM,
+    encode: Callable[[Any], bytes] = jcs_canonical_bytes,
+) -> list[str]:
+    """
+    Canonical hashes of many payloads (as hash_canonical), in order.
+    
+    Serializing holds the GIL, so payloads are encoded in the calling
+    thread and only the digests go through hash_hex_many.
+    
+    Args:
+        payloads: Payloads to hash
+        algorithm: One of HASH_ALGORITHMS
+        encode: Canonical bytes of one payload (e.g.
+            canonical_bytes_without_integrity)
+    """
+    return hash_hex_many([encode(payload) for payload in payloads], algorithm)
+
+
+def canonical_bytes_without_integrity(payload: dict[str, Any]) -> bytes:
+    """Canonical bytes of a dict without its 'integrity' field (for hash_many)."""
+    return jcs_canonical_bytes({k: v for k, v in payload.items() if k != "integrity"})
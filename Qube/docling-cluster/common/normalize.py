@@ -6,10 +6,43 @@ Normalization utilities.
 """
 import re
 import unicodedata
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Iterator
 
 import torch
 
 
+# Runs of whitespace other than newlines, and of three or more newlines
+_HSPACE_RE = re.compile(r"[^\S\n]+")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
+# Distinct cell strings remembered by a CellNormalizer
+CELL_CACHE_SIZE = 65536
+
+# Rows per block for L2 normalization into an out buffer
+L2_BLOCK_ROWS = 16384
+
+
+def _normalize_unstripped(text: str) -> str:
+    """normalize_text without the final strip()."""
+    if not text.isascii() and not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
+    
+    # Normalize line endings to LF
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    
+    # Collapse whitespace runs (preserve newlines)
+    text = _HSPACE_RE.sub(" ", text)
+    
+    # Collapse multiple newlines to double newline (paragraph boundary)
+    if "\n\n\n" in text:
+        text = _NEWLINES_RE.sub("\n\n", text)
+    
+    return text
+
+
 def normalize_text(text: str) -> str:
     """
     Normalize text for deterministic processing.
@@ -17,47 +50,255 @@ def normalize_text(text: str) -> str:
     - Unicode: NFKC normalization
     - Whitespace: collapse runs to single space
     - Line endings: normalize to LF
+    
+    ASCII text is already NFKC-normalized, and printable ASCII without
+    double spaces (most table cells) only needs stripping; other text
+    skips NFKC when unicodedata.is_normalized says it is a no-op.
+    """
+    if text.isascii() and text.isprintable() and "  " not in text:
+        return text.strip()  # No whitespace but single spaces: nothing to collapse
+    return _normalize_unstripped(text).strip()
+
+
+# ASCII non-whitespace characters (str.isspace is true for \t-\r, \x1c-\x1f and space),
+# and other non-whitespace characters (boundary candidates)
+_ASCII_BOUNDARY_RE = re.compile(r"[\x00-\x08\x0e-\x1b!-\x7f]")
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f\s]")
+
+# Characters searched per step, from the end of a piece, for a boundary
+BOUNDARY_WINDOW = 4096
+
+
+@lru_cache(maxsize=None)
+def _composition_seconds() -> frozenset[str]:
+    """Starters that canonical composition can merge onto the character before them."""
+    seconds = {chr(cp) for cp in chain(range(0x1161, 0x1176), range(0x11A8, 0x11C3))}  # Hangul V and T jamo
+    for cp in range(0x110000):
+        decomposition = unicodedata.decomposition(chr(cp))
+        if decomposition and not decomposition.startswith("<"):
+            parts = decomposition.split()
+            if len(parts) == 2:
+                seconds.add(chr(int(parts[1], 16)))
+    return frozenset(c for c in seconds if unicodedata.combining(c) == 0)
+
+
+@lru_cache(maxsize=65536)
+def _is_boundary(c: str) -> bool:
     """
-    # Unicode normalization
-    text = unicodedata.normalize("NFKC", text)
+    Whether text can be cut before c and each side normalized on its own.
     
-    # Normalize line endings to LF
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    c must not be whitespace (no whitespace rule reaches across it), must
+    be a starter that NFKC leaves unchanged (nothing before it is reordered
+    past it or decomposes differently) and must not compose onto the
+    character before it.
+    """
+    if c < "\x80":
+        return not c.isspace()
+    return (
+        not c.isspace()
+        and unicodedata.combining(c) == 0
+        and unicodedata.is_normalized("NFKC", c)
+        and c not in _composition_seconds()
+    )
+
+
+def _last_boundary(piece: str) -> int:
+    """
+    Index of the last character in piece that text can be cut before, or -1.
     
-    # Collapse whitespace runs (preserve newlines)
-    text = re.sub(r"[^\S\n]+", " ", text)
+    Searches back from the end a window at a time: ASCII non-whitespace by
+    regex first, then any other boundary character (e.g. in CJK text).
+    """
+    end = len(piece)
+    while end > 0:
+        start = max(0, end - BOUNDARY_WINDOW)
+        match = None
+        for match in _ASCII_BOUNDARY_RE.finditer(piece, start, end):
+            pass
+        if match is not None:
+            return match.start()
+        for match in reversed(list(_NON_ASCII_RE.finditer(piece, start, end))):
+            if _is_boundary(match.group()):
+                return match.start()
+        end = start
+    return -1
+
+
+def normalize_stream(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    normalize_text over text arriving in pieces, yielding normalized pieces.
     
-    # Collapse multiple newlines to double newline (paragraph boundary)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    "".join(normalize_stream(pieces)) == normalize_text("".join(pieces)).
+    Some characters (any ASCII non-whitespace, and non-whitespace starters
+    that NFKC leaves alone and that never compose onto what precedes them,
+    such as CJK ideographs) never interact with the text before them under
+    NFKC or the whitespace rules, so text up to the last one in each piece
+    is normalized on its own; only the rest is carried into the next piece.
+    Memory is bounded by the piece size plus the longest stretch of text
+    without such a character.
+    """
+    pending: list[str] = []
+    started = False  # Leading whitespace has been stripped
+    for piece in pieces:
+        cut = _last_boundary(piece)
+        if cut < 0:
+            pending.append(piece)
+            continue
+        pending.append(piece[:cut])
+        text = _normalize_unstripped("".join(pending))
+        pending = [piece[cut:]]
+        if not started:
+            text = text.lstrip()
+            started = bool(text)
+        if text:
+            yield text
     
-    return text.strip()
+    text = _normalize_unstripped("".join(pending)).rstrip()
+    if not started:
+        text = text.lstrip()
+    if text:
+        yield text
 
 
-def l2_normalize(x: torch.Tensor, eps: float = 1e-12) -> torch.Tensor:
+def normalize_many(texts: Iterable[str]) -> list[str]:
+    """
+    normalize_text over many strings, in order.
+    
+    Repeated strings (common in table cells) are normalized once per call.
+    """
+    done: dict[str, str] = {}
+    results = []
+    for text in texts:
+        normalized = done.get(text)
+        if normalized is None:
+            normalized = done[text] = normalize_text(text)
+        results.append(normalized)
+    return results
+
+
+class CellNormalizer:
+    """
+    normalize_text for table cells, memoized in a bounded LRU cache.
+    
+    Tables repeat the same cell strings heavily ("0", "N/A", units), so
+    each distinct string is normalized once while it stays among the
+    max_entries most recently used. Meant to live for one document;
+    hits and misses report how well it did.
+    """
+    
+    def __init__(self, max_entries: int = CELL_CACHE_SIZE):
+        self.normalize = lru_cache(maxsize=max_entries)(normalize_text)
+    
+    def normalize_row(self, row: Iterable[str]) -> list[str]:
+        """Normalized cells of one table row."""
+        return list(map(self.normalize, row))
+    
+    def normalize_table(self, rows: Iterable[Iterable[str]]) -> list[list[str]]:
+        """Normalized cells of a table, row by row."""
+        return list(map(self.normalize_row, rows))
+    
+    @property
+    def hits(self) -> int:
+        return self.normalize.cache_info().hits
+    
+    @property
+    def misses(self) -> int:
+        return self.normalize.cache_info().misses
+    
+    def clear(self) -> None:
+        """Forget cached cells and reset the counters."""
+        self.normalize.cache_clear()
+
+
+def _check_out(x_shape, out) -> None:
+    if tuple(out.shape) != tuple(x_shape):
+        raise ValueError(f"out has shape {tuple(out.shape)}, expected {tuple(x_shape)}")
+
+
+def l2_normalize(
+    x: torch.Tensor,
+    eps: float = 1e-12,
+    out: torch.Tensor | None = None,
+    block_rows: int = L2_BLOCK_ROWS,
+) -> torch.Tensor:
     """
     L2 normalize a tensor along the last dimension.
     
     Args:
         x: Input tensor of shape (..., dim)
         eps: Small epsilon to prevent division by zero
+        out: Contiguous tensor of x's shape to write into (x itself to
+            normalize in place). Rows are then processed block_rows at
+            a time, so only one block's norms are allocated, and the
+            result has out's dtype.
+        block_rows: Rows per block when out is given
         
     Returns:
-        L2-normalized tensor
+        L2-normalized tensor (out, if given)
     """
-    norm = torch.norm(x, p=2, dim=-1, keepdim=True)
-    return x / torch.clamp(norm, min=eps)
+    if out is None:
+        norm = torch.norm(x, p=2, dim=-1, keepdim=True)
+        return x / torch.clamp(norm, min=eps)
+    
+    _check_out(x.shape, out)
+    if not out.is_contiguous():
+        raise ValueError("out must be contiguous")
+    dim = x.shape[-1] if x.dim() else 1
+    rows, out_rows = x.reshape(-1, dim), out.view(-1, dim)
+    # Norms in at least float32 (eps underflows to 0 in float16)
+    norm_dtype = torch.promote_types(x.dtype, torch.float32)
+    for start in range(0, rows.shape[0], block_rows):
+        block = rows[start:start + block_rows]
+        norm = torch.linalg.vector_norm(block, dim=-1, keepdim=True, dtype=norm_dtype)
+        torch.div(block, norm.clamp_(min=eps), out=out_rows[start:start + block_rows])
+    return out
+
 
+def l2_normalize_(x: torch.Tensor, eps: float = 1e-12, block_rows: int = L2_BLOCK_ROWS) -> torch.Tensor:
+    """L2 normalize a contiguous tensor in place, keeping its dtype (see l2_normalize)."""
+    return l2_normalize(x, eps, out=x, block_rows=block_rows)
 
-def l2_normalize_numpy(x):
+
+def l2_normalize_numpy(x, eps: float = 1e-12, out=None, block_rows: int = L2_BLOCK_ROWS):
     """
     L2 normalize a numpy array.
     
     Args:
         x: Input array of shape (..., dim)
+        eps: Small epsilon to prevent division by zero
+        out: C-contiguous array of x's shape to write into (x itself to
+            normalize in place). Rows are then processed block_rows at
+            a time with no temporaries larger than one block's norms,
+            and the result keeps out's dtype (float32 stays float32).
+        block_rows: Rows per block when out is given
         
     Returns:
-        L2-normalized array
+        L2-normalized array (out, if given)
     """
     import numpy as np
-    norm = np.linalg.norm(x, axis=-1, keepdims=True)
-    return x / np.maximum(norm, 1e-12)
+    if out is None:
+        norm = np.linalg.norm(x, axis=-1, keepdims=True)
+        return x / np.maximum(norm, eps)
+    
+    _check_out(np.shape(x), out)
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    x = np.asarray(x)
+    dim = x.shape[-1] if x.ndim else 1
+    rows, out_rows = x.reshape(-1, dim), out.reshape(-1, dim)
+    # Norms in at least float32 (eps underflows to 0 in float16)
+    norm_dtype = np.result_type(x.dtype, out.dtype, np.float32)
+    norm = np.empty((min(block_rows, rows.shape[0]), 1), dtype=norm_dtype)
+    for start in range(0, rows.shape[0], block_rows):
+        block = rows[start:start + block_rows]
+        block_norm = norm[:len(block)]
+        np.einsum("ij,ij->i", block, block, out=block_norm[:, 0])  # Squared norms, no block-sized temporary
+        np.sqrt(block_norm, out=block_norm)
+        np.maximum(block_norm, eps, out=block_norm)
+        np.divide(block, block_norm, out=out_rows[start:start + block_rows])
+    return out
+
+
+def l2_normalize_numpy_(x, eps: float = 1e-12, block_rows: int = L2_BLOCK_ROWS):
+    """L2 normalize a C-contiguous numpy array in place, keeping its dtype (see l2_normalize_numpy)."""
+    return l2_normalize_numpy(x, eps, out=x, block_rows=block_rows)
@@ -0,0 +1,149 @@
+"""
+Model weights hashing.
+
+The embedder's weights hash (embedding.weights_hash in chunk.embedding.v1)
+is a digest (HASH_ALGORITHMS) of every state_dict tensor's bytes, in
+sorted key order.
+Digests are cached on disk under a fingerprint of the model's files, so a
+restarted worker does not hash unchanged weights again.
+
+A model loaded before forking worker processes can be moved to shared
+memory with share_model_memory, so the children map one copy of it.
+"""
+import ctypes
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from .canonicalize import HASH_ALGORITHM, new_hash
+
+
+# Digests kept in a WeightsHashCache file (oldest dropped first)
+WEIGHTS_CACHE_ENTRIES = 64
+
+
+def weights_hash(state_dict: Mapping, algorithm: str = HASH_ALGORITHM) -> str:
+    """
+    Hex digest of a state_dict's tensors, in sorted key order.
+
+    Each tensor is fed to the hash as a view of its own memory, so no
+    copy of the weights is made (the digest is the same as hashing the
+    concatenated tensor bytes).
+    """
+    h = new_hash(algorithm)
+    for key in sorted(state_dict):
+        tensor = state_dict[key].detach().cpu().contiguous()
+        h.update(tensor.numpy())
+    return h.hexdigest()
+
+
+def model_files(model_dir: str | Path) -> list[Path]:
+    """All files under a model directory, sorted."""
+    return sorted(p for p in Path(model_dir).rglob("*") if p.is_file())
+
+
+def files_fingerprint(paths: Iterable[str | Path]) -> str:
+    """
+    SHA-256 hex digest of each file's resolved path, size and mtime.
+
+    Changes whenever a file is replaced, rewritten, added or removed.
+    """
+    entries = []
+    for path in sorted(Path(p).resolve() for p in paths):
+        stat = path.stat()
+        entries.append([str(path), stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+
+class WeightsHashCache:
+    """
+    Weights digests persisted in a JSON file, keyed by algorithm and
+    files_fingerprint ("<algorithm>:<fingerprint>").
+
+    Unreadable or corrupt cache files are treated as empty. Writes go
+    through a temporary file and os.replace, so concurrent workers never
+    see a partial file (the last writer wins).
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = WEIGHTS_CACHE_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+
+    def _load(self) -> dict:
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, key: str) -> str | None:
+        """Cached digest for a key, or None."""
+        return self._load().get(key)
+
+    def put(self, key: str, digest: str) -> None:
+        """Record a digest, dropping the oldest entries past max_entries."""
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = digest
+        entries = dict(list(entries.items())[-self.max_entries:])
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries))
+        os.replace(tmp, self.path)
+
+
+def cached_weights_hash(
+    state_dict: Mapping,
+    files: Iterable[str | Path] | None,
+    cache: WeightsHashCache | None,
+    algorithm: str = HASH_ALGORITHM,
+) -> tuple[str, bool]:
+    """
+    weights_hash(state_dict, algorithm), looked up in cache by the model's files first.
+
+    Args:
+        state_dict: Model state_dict to hash on a cache miss
+        files: Files the model was loaded from (None: do not use the cache)
+        cache: Digest cache (None: always hash)
+        algorithm: One of HASH_ALGORITHMS
+
+    Returns:
+        (hex digest, whether it came from the cache)
+    """
+    if cache is None or not files:
+        return weights_hash(state_dict, algorithm), False
+
+    key = f"{algorithm}:{files_fingerprint(files)}"
+    digest = cache.get(key)
+    if digest is not None:
+        return digest, True
+
+    digest = weights_hash(state_dict, algorithm)
+    try:
+        cache.put(key, digest)
+    except OSError:
+        pass  # An unwritable cache only means hashing again next start
+    return digest, False
+
+
+def share_model_memory(model):
+    """
+    Move a torch module's parameters and buffers to shared memory.
+
+    share_memory() copies each tensor into a shared mapping and frees the
+    original, which glibc's allocator would otherwise keep in the heap
+    (and forked children would inherit). The heap is trimmed afterwards
+    where glibc is available.
+
+    Returns:
+        model
+    """
+    model.share_memory()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass  # Not glibc
+    return model
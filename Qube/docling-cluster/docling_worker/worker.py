@@ -7,17 +7,19 @@ import os
 import sys
 from pathlib import Path
 from redis import Redis
-from rq import Queue, Worker
+from rq import Queue, SimpleWorker, Worker
 
 # Add parent directory for imports
 sys.path.insert(0, "/app")
 
-from lib import compute_chunk_id, get_ledger, hash_canonical_without_integrity
+from lib import compute_chunk_id, flush_ledger, get_ledger, hash_canonical_without_integrity
 from schemas import DocNormalizedV1
 
 # Configuration
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 DOCLING_VERSION = os.environ.get("DOCLING_VERSION", "2.0.0")
+# Run jobs in the worker process instead of a forked work horse per job
+RQ_SIMPLE_WORKER = os.environ.get("RQ_SIMPLE_WORKER", "0") == "1"
 
 redis_conn = Redis.from_url(REDIS_URL)
 
@@ -102,6 +104,9 @@ def parse_document(payload: dict) -> dict:
         "content_hash": sha256_canonical
     }
     ledger.append(ledger_record)
+    # Record the document before its chunks are enqueued (and before a
+    # forked work horse exits with os._exit)
+    flush_ledger()
     
     # Enqueue embedding task for EACH block (simplified to one job per page for now)
     q = Queue("embed_queue", connection=redis_conn)
@@ -118,7 +123,8 @@ def parse_document(payload: dict) -> dict:
     return doc_dict
 
 if __name__ == "__main__":
-    worker = Worker(
+    worker_class = SimpleWorker if RQ_SIMPLE_WORKER else Worker
+    worker = worker_class(
         queues=[Queue("docling_queue", connection=redis_conn)],
         connection=redis_conn
     )
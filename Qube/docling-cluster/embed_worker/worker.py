@@ -8,12 +8,13 @@ import torch
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, PointStruct, VectorParams
 from redis import Redis
-from rq import Queue, Worker
+from rq import Queue, SimpleWorker, Worker
 
 # Add parent paths for imports
 sys.path.insert(0, "/app")
 from lib import (
     compute_chunk_id,
+    flush_ledger,
     get_ledger,
     hash_canonical_without_integrity
 )
@@ -22,6 +23,8 @@ from schemas import ChunkEmbeddingV1, Chunker, Embedding, Provenance
 # Configuration from environment
 EMBEDDER_MODEL_ID = os.environ.get("EMBEDDER_MODEL_ID", "text-embedder-v1")
 CHUNKER_VERSION = os.environ.get("CHUNKER_VERSION", "chunk.v1")
+# Run jobs in the worker process instead of a forked work horse per job
+RQ_SIMPLE_WORKER = os.environ.get("RQ_SIMPLE_WORKER", "0") == "1"
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
@@ -123,6 +126,10 @@ def embed_chunk(job_payload: dict) -> dict:
         "content_hash": sha256_canonical
     }
     ledger.append(ledger_record)
+    if not RQ_SIMPLE_WORKER:
+        # A forked work horse exits with os._exit, so send its record first.
+        # A SimpleWorker keeps one client and batches records across jobs.
+        flush_ledger()
     
     return {
         "status": "embedded",
@@ -132,7 +139,8 @@ def embed_chunk(job_payload: dict) -> dict:
 
 if __name__ == "__main__":
     # Run as RQ worker
-    worker = Worker(
+    worker_class = SimpleWorker if RQ_SIMPLE_WORKER else Worker
+    worker = worker_class(
         queues=[Queue("embed_queue", connection=redis_conn)],
         connection=redis_conn
     )
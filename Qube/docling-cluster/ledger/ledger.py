@@ -2,6 +2,7 @@
 Ledger Service - FastAPI 
 Manages the append-only JSONL ledger with hash-chain integrity.
 """
+import base64
 import json
 import os
 import sys
@@ -10,7 +11,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Add parent directory for imports
@@ -22,11 +24,20 @@ app = FastAPI(title="Docling Ledger Service", version="0.2.0")
 LEDGER_PATH = Path(os.environ.get("LEDGER_PATH", "/app/data/ledger.jsonl"))
 LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Records between entries of the in-memory seek index
+INDEX_STRIDE = 1024
+
+# Bytes of NDJSON buffered per chunk of a streamed response
+STREAM_CHUNK_SIZE = 64 * 1024
+
 class LedgerEntry(BaseModel):
     event: str
     bundle_id: str
     payload: dict[str, Any]
 
+class LedgerBatch(BaseModel):
+    entries: list[LedgerEntry]
+
 class LedgerRecord(BaseModel):
     timestamp: str
     event: str
@@ -39,16 +50,24 @@ class Ledger:
     def __init__(self, path: Path):
         self.path = path
         self._lock = threading.Lock()
+        self._count = 0
+        self._size = 0
+        self._offsets: list[int] = []  # Byte offset of every INDEX_STRIDE-th record
         self._prev_hash = self._load_last_hash()
 
     def _load_last_hash(self) -> Optional[str]:
+        """Scan the file once, building the seek index; returns the last entry hash."""
         if not self.path.exists():
             return None
         last_line = None
-        with open(self.path, "r", encoding="utf-8") as f:
+        with open(self.path, "rb") as f:
             for line in f:
                 if line.strip():
+                    if self._count % INDEX_STRIDE == 0:
+                        self._offsets.append(self._size)
+                    self._count += 1
                     last_line = line
+                self._size += len(line)
         if last_line:
             try:
                 entry = json.loads(last_line)
@@ -58,30 +77,79 @@ class Ledger:
         return None
 
     def append(self, event: str, bundle_id: str, payload: dict[str, Any]) -> dict:
+        return self.append_many([(event, bundle_id, payload)])[0]
+
+    def append_many(self, entries: list[tuple[str, str, dict[str, Any]]]) -> list[dict]:
+        """Chain a batch of (event, bundle_id, payload) entries and write them at once."""
         with self._lock:
-            record = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "event": event,
-                "bundle_id": bundle_id,
-                "payload": payload,
-                "prev_hash": self._prev_hash
-            }
-            # Compute canonical hash
-            canonical_json = jcs.canonicalize(record)
-            entry_hash = f"sha256:{hashlib.sha256(canonical_json.encode()).hexdigest()}"
-            record["entry_hash"] = entry_hash
+            records = []
+            lines = []
+            prev_hash = self._prev_hash
+            for event, bundle_id, payload in entries:
+                record = {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "event": event,
+                    "bundle_id": bundle_id,
+                    "payload": payload,
+                    "prev_hash": prev_hash
+                }
+                # Compute canonical hash (with jcs.HASH_ALGORITHM)
+                entry_hash = jcs.canonical_hash(record)
+                record["entry_hash"] = entry_hash
+                records.append(record)
+                lines.append((jcs.canonicalize(record) + "\n").encode("utf-8"))
+                prev_hash = entry_hash
             
             # Write to file
-            with open(self.path, "a", encoding="utf-8") as f:
-                f.write(jcs.canonicalize(record) + "\n")
+            with open(self.path, "ab") as f:
+                f.write(b"".join(lines))
             
-            self._prev_hash = entry_hash
-            return record
+            for line in lines:
+                if self._count % INDEX_STRIDE == 0:
+                    self._offsets.append(self._size)
+                self._count += 1
+                self._size += len(line)
+            self._prev_hash = prev_hash
+            return records
 
     def get_prev_hash(self) -> Optional[str]:
         return self._prev_hash
 
-import hashlib
+    def position(self) -> tuple[int, int]:
+        """(record count, file size) at a consistent point."""
+        with self._lock:
+            return self._count, self._size
+
+    def seek(self, seq: int) -> tuple[int, int]:
+        """(seq, offset) of the nearest indexed record at or before seq."""
+        with self._lock:
+            if seq >= self._count:
+                return self._count, self._size
+            return seq - seq % INDEX_STRIDE, self._offsets[seq // INDEX_STRIDE]
+
+    def offset_of(self, seq: int) -> int:
+        """Byte offset where the record with the given seq starts (the file size past the last record)."""
+        count, size = self.position()
+        base_seq, start = self.seek(min(seq, count))
+        for line_seq, line_end, _ in self.iter_lines(base_seq, start, size):
+            if line_seq == seq:
+                return start
+            start = line_end
+        return start
+
+    def iter_lines(self, seq: int, offset: int, end: int):
+        """Yield (seq, offset after the line, line) for the records between offset and end."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while offset < end:
+                line = f.readline()
+                if not line:
+                    break
+                offset += len(line)
+                if line.strip():
+                    yield seq, offset, line
+                    seq += 1
+
 ledger = Ledger(LEDGER_PATH)
 
 @app.post("/append")
@@ -92,6 +160,84 @@ async def append_to_ledger(entry: LedgerEntry):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/append_batch")
+async def append_batch(batch: LedgerBatch):
+    try:
+        records = ledger.append_many([(e.event, e.bundle_id, e.payload) for e in batch.entries])
+        return {"records": records}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def encode_cursor(seq: int, offset: int) -> str:
+    """Opaque cursor for the record with the given seq at a byte offset."""
+    raw = json.dumps({"seq": seq, "offset": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """(seq, offset) of a cursor, checked to point at the start of record seq."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        seq, offset = int(position["seq"]), int(position["offset"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    count, _ = ledger.position()
+    # The offset must be where record seq starts (found from the sparse index)
+    if not 0 <= seq <= count or ledger.offset_of(seq) != offset:
+        raise HTTPException(status_code=400, detail="Cursor does not match the ledger")
+    return seq, offset
+
+def stream_records(seq: int, offset: int, skip: int, end: int, limit: int, event: Optional[str]):
+    """
+    Yield NDJSON chunks of {"seq", "record"} lines, skipping the first skip records.
+    The last line is {"cursor": ...}, pointing after the last record read.
+    """
+    chunk = []
+    size = 0
+    count = 0
+    for line_seq, line_end, line in ledger.iter_lines(seq, offset, end):
+        seq, offset = line_seq + 1, line_end
+        if skip:
+            skip -= 1
+            continue
+        if event is not None and json.loads(line).get("event") != event:
+            continue
+        out = b'{"seq":%d,"record":%s}\n' % (line_seq, line.rstrip())
+        chunk.append(out)
+        size += len(out)
+        count += 1
+        if count >= limit:
+            break
+        if size >= STREAM_CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    chunk.append(json.dumps({"cursor": encode_cursor(seq, offset)}).encode() + b"\n")
+    yield b"".join(chunk)
+
+@app.get("/entries")
+async def list_entries(
+    from_seq: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=100_000),
+    event: Optional[str] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    Stream records in order as NDJSON, starting at from_seq or a cursor.
+    Returns up to limit records (of the given event, if any); the final line
+    is {"cursor": ...}, which resumes after the last record read.
+    """
+    count, end = ledger.position()  # Records appended while streaming are left for the next page
+    if cursor is not None:
+        seq, offset = decode_cursor(cursor)
+        skip = 0
+    else:
+        seq, offset = ledger.seek(from_seq)
+        skip = min(from_seq, count) - seq
+    return StreamingResponse(
+        stream_records(seq, offset, skip, end, limit, event),
+        media_type="application/x-ndjson",
+    )
+
 @app.get("/prev_hash")
 async def get_prev_hash():
     return {"prev_hash": ledger.get_prev_hash()}
@@ -1,11 +1,17 @@
-import hashlib
+import atexit
+import os
+import threading
+import time
 from typing import Any
+
+import requests
+
 from . import jcs
 
 def compute_chunk_id(doc_id: str, index: int, text: str) -> str:
-    """Compute deterministic chunk ID."""
+    """Compute deterministic chunk ID (always SHA-256, so IDs do not change with HASH_ALGORITHM)."""
     content = f"{doc_id}:{index}:{text}"
-    return f"sha256:{hashlib.sha256(content.encode()).hexdigest()}"
+    return jcs.prefixed_digest(content.encode(), "sha256")
 
 def hash_canonical_without_integrity(obj: Any) -> str:
     """Compute canonical hash of object excluding integrity field."""
@@ -15,32 +21,196 @@ def hash_canonical_without_integrity(obj: Any) -> str:
         return jcs.canonical_hash(obj_copy)
     return jcs.canonical_hash(obj)
 
-def get_ledger():
-    """Client for the ledger service."""
-    import os
-    import requests
-    class LedgerClient:
-        def __init__(self):
-            self.url = os.environ.get("LEDGER_URL", "http://ledger:8001")
-        def append(self, record: dict):
+class LedgerClient:
+    """
+    Process-wide client for the ledger service.
+
+    append() only buffers the record. A background thread posts buffered
+    records to /append_batch over one keep-alive session as soon as
+    batch_size records are waiting or the oldest has waited flush_interval
+    seconds. Failed batches are retried in order with backoff for up to
+    retry_timeout seconds, then dropped and logged. The buffer is bounded,
+    so a ledger outage slows appends down while batches are retried.
+    Records still buffered at interpreter exit are flushed; a process that
+    ends with os._exit must call flush() first.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+        max_buffer: int = 10_000,
+        timeout: float = 5.0,
+        retry_timeout: float = 10.0,
+    ):
+        self.url = url.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.timeout = timeout
+        self.retry_timeout = retry_timeout
+        self.last_error: str | None = None
+
+        self._session = requests.Session()
+        self._cond = threading.Condition()
+        self._buffer: list[dict] = []
+        self._first_at: float | None = None  # When the oldest buffered record arrived
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ledger-client", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _entry(record: dict) -> dict:
+        """
+        Wrap a worker record as a LedgerEntry(event, bundle_id, payload).
+
+        Workers pass flat dicts, e.g. {"event": "chunk.embedding.v1",
+        "bundle_id": ..., "doc_id": ..., "chunk_id": ...}; every field other
+        than event and bundle_id goes into the payload.
+        """
+        return {
+            "event": record.get("event", "generic"),
+            "bundle_id": record.get("bundle_id", "unknown"),
+            "payload": {k: v for k, v in record.items() if k not in ["event", "bundle_id"]},
+        }
+
+    def append(self, record: dict) -> None:
+        """Buffer a record for the next batch (blocks while the buffer is full)."""
+        entry = self._entry(record)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Ledger client is closed")
+            while len(self._buffer) >= self.max_buffer:
+                self._cond.wait()
+            if not self._buffer:
+                self._first_at = time.monotonic()
+            self._buffer.append(entry)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Send buffered records now; returns False if they are not all sent by timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._buffer or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Flush and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"[LEDGER-CLIENT-ERROR] {len(self._buffer) + self._in_flight} records not sent at close")
+        self._session.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+
+                # Wait for a full batch, the latency bound, a flush or close
+                while len(self._buffer) < self.batch_size and not (self._closed or self._flush_requested):
+                    remaining = self._first_at + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:len(batch)]
+                self._in_flight = len(batch)
+                self._first_at = time.monotonic() if self._buffer else None
+                self._cond.notify_all()  # Room in the buffer
+
+            self._send(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                if not self._buffer:
+                    self._flush_requested = False
+                self._cond.notify_all()
+
+    def _send(self, batch: list[dict]) -> None:
+        """POST a batch, retrying server and connection errors with backoff until retry_timeout."""
+        start = time.monotonic()
+        delay = 0.1
+        while True:
             try:
-                # We expect record to have 'event', 'bundle_id', 'payload'
-                # But the workers pass simple dicts sometimes.
-                # Alignment check:
-                # docling-worker passes: {"event": "doc.normalized.v1", "bundle_id": bundle_id, "doc_id": doc_id, "content_hash": sha256_canonical}
-                # embed-worker passes: {"event": "chunk.embedding.v1", "bundle_id": bundle_id, "doc_id": doc_id, "chunk_id": chunk_id, "chunk_index": chunk_index, ...}
-                
-                # The Ledger API expects LedgerEntry(event, bundle_id, payload)
-                # We wrap the extra fields into payload if needed.
-                event = record.get("event", "generic")
-                bundle_id = record.get("bundle_id", "unknown")
-                payload = {k: v for k, v in record.items() if k not in ["event", "bundle_id"]}
-                
-                requests.post(f"{self.url}/append", json={
-                    "event": event,
-                    "bundle_id": bundle_id,
-                    "payload": payload
-                }, timeout=5)
-            except Exception as e:
-                print(f"[LEDGER-CLIENT-ERROR] {e}")
-    return LedgerClient()
+                response = self._session.post(
+                    f"{self.url}/append_batch", json={"entries": batch}, timeout=self.timeout
+                )
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    self.last_error = None
+                    return
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+            except requests.HTTPError as e:
+                # Rejected by the service: retrying cannot succeed
+                self.last_error = str(e)
+                print(f"[LEDGER-CLIENT-ERROR] Dropped {len(batch)} rejected records: {e}")
+                return
+            except requests.RequestException as e:
+                error = str(e)
+
+            self.last_error = error
+            elapsed = time.monotonic() - start
+            if elapsed + delay > self.retry_timeout:
+                print(f"[LEDGER-CLIENT-ERROR] {error}; dropped {len(batch)} records after {elapsed:.1f}s")
+                return
+            print(f"[LEDGER-CLIENT-ERROR] {error}; retrying {len(batch)} records in {delay:.1f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+
+_ledger: LedgerClient | None = None
+_ledger_pid: int | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> LedgerClient:
+    """
+    Process-wide client for the ledger service.
+
+    Configured through LEDGER_URL, LEDGER_BATCH_SIZE, LEDGER_FLUSH_INTERVAL
+    (seconds), LEDGER_MAX_BUFFER and LEDGER_RETRY_TIMEOUT (seconds). A
+    forked child gets its own client.
+    """
+    global _ledger, _ledger_pid
+    with _ledger_lock:
+        if _ledger is None or _ledger_pid != os.getpid():
+            _ledger = LedgerClient(
+                os.environ.get("LEDGER_URL", "http://ledger:8001"),
+                batch_size=int(os.environ.get("LEDGER_BATCH_SIZE", "100")),
+                flush_interval=float(os.environ.get("LEDGER_FLUSH_INTERVAL", "0.05")),
+                max_buffer=int(os.environ.get("LEDGER_MAX_BUFFER", "10000")),
+                retry_timeout=float(os.environ.get("LEDGER_RETRY_TIMEOUT", "10")),
+            )
+            _ledger_pid = os.getpid()
+            atexit.register(_ledger.close)
+        return _ledger
+
+
+def flush_ledger(timeout: float | None = None) -> bool:
+    """
+    Send this process's buffered ledger records, waiting at most timeout
+    seconds (default LEDGER_FLUSH_TIMEOUT, 15). Logs and returns False if
+    some were not sent in time.
+    """
+    if timeout is None:
+        timeout = float(os.environ.get("LEDGER_FLUSH_TIMEOUT", "15"))
+    if get_ledger().flush(timeout):
+        return True
+    print(f"[LEDGER-CLIENT-ERROR] Ledger records not sent within {timeout:.0f}s")
+    return False
@@ -62,7 +62,12 @@ class DocumentContent(BaseModel):
 
 
 class IntegrityInfo(BaseModel):
-    """Cryptographic integrity fields."""
+    """
+    Cryptographic integrity fields.
+    
+    sha256_canonical keeps its name whatever the algorithm: its value is
+    "<algorithm>:<hex>" (e.g. "blake2b:...") in the algorithm it names.
+    """
     sha256_canonical: str
     prev_ledger_hash: str | None = None
 
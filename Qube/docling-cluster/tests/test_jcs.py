@@ -0,0 +1,120 @@
+"""
+JCS Test - lib.jcs against the RFC 8785 examples.
+"""
+import hashlib
+import json
+import random
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib import jcs
+
+# RFC 8785 Appendix B: IEEE 754 bit patterns and their ECMAScript serialization
+NUMBER_SAMPLES = {
+    "0000000000000000": "0",
+    "8000000000000000": "0",
+    "0000000000000001": "5e-324",
+    "8000000000000001": "-5e-324",
+    "7fefffffffffffff": "1.7976931348623157e+308",
+    "ffefffffffffffff": "-1.7976931348623157e+308",
+    "4340000000000000": "9007199254740992",
+    "c340000000000000": "-9007199254740992",
+    "4430000000000000": "295147905179352830000",
+    "44b52d02c7e14af5": "9.999999999999997e+22",
+    "44b52d02c7e14af6": "1e+23",
+    "44b52d02c7e14af7": "1.0000000000000001e+23",
+    "444b1ae4d6e2ef4e": "999999999999999700000",
+    "444b1ae4d6e2ef4f": "999999999999999900000",
+    "444b1ae4d6e2ef50": "1e+21",
+    "3eb0c6f7a0b5ed8c": "9.999999999999997e-7",
+    "3eb0c6f7a0b5ed8d": "0.000001",
+    "41b3de4355555553": "333333333.3333332",
+    "41b3de4355555554": "333333333.33333325",
+    "41b3de4355555555": "333333333.3333333",
+    "41b3de4355555556": "333333333.3333334",
+    "41b3de4355555557": "333333333.33333343",
+    "becbf647612f3696": "-0.0000033333333333333333",
+    "43143ff3c1cb0959": "1424953923781206.2",
+}
+
+
+def test_number_serialization():
+    """Numbers should be formatted as ECMAScript does."""
+    for bits, expected in NUMBER_SAMPLES.items():
+        value = struct.unpack(">d", bytes.fromhex(bits))[0]
+        assert jcs.canonicalize(value) == expected, f"{bits}: {jcs.canonicalize(value)} != {expected}"
+    assert jcs.canonicalize([1.0, 0.5, -2.0, 10.0, 7]) == "[1,0.5,-2,10,7]"
+    assert jcs.canonicalize([1e-5, 0.0, -0.0, 2 ** 60]) == "[0.00001,0,0,1152921504606847000]"
+    rng = random.Random(3)
+    vector = [rng.choice([rng.uniform(-1, 1), rng.uniform(-1e-6, 1e-6), float(rng.randint(-3, 3)), 1e22])
+              for _ in range(500)]
+    expected = "[" + ",".join(map(jcs.format_number, vector)) + "]"
+    assert jcs.canonicalize(vector) == expected and jcs.canonicalize({"v": vector}) == '{"v":' + expected + "}"
+    for bad in (float("nan"), float("inf")):
+        try:
+            jcs.canonicalize({"x": bad})
+            assert False, f"{bad} should be rejected"
+        except ValueError:
+            pass
+
+
+def test_rfc_8785_examples():
+    """The RFC's sorting and serialization examples should match byte for byte."""
+    sorting = {
+        "€": "Euro Sign",
+        "\r": "Carriage Return",
+        "דּ": "Hebrew Letter Dalet With Dagesh",
+        "1": "One",
+        "\U0001f600": "Emoji: Grinning Face",
+        "\u0080": "Control",
+        "ö": "Latin Small Letter O With Diaeresis",
+    }
+    keys = list(json.loads(jcs.canonicalize(sorting)))
+    assert keys == ["\r", "1", "\u0080", "ö", "€", "\U0001f600", "דּ"], keys
+
+    example = {
+        "numbers": [333333333.33333329, 1E30, 4.50, 2e-3, 0.000000000000000000000000001],
+        "string": "€$\u000F\u000aA'B\"\\\\\"/",
+        "literals": [None, True, False],
+    }
+    assert jcs.canonicalize(example) == (
+        r'{"literals":[null,true,false],"numbers":[333333333.3333333,1e+30,4.5,0.002,1e-27],'
+        r'''"string":"€$\u000f\nA'B\"\\\\\"/"}'''
+    )
+
+
+def test_matches_json_dumps_where_it_is_canonical():
+    """Payloads with ASCII keys and ordinary floats should serialize as before."""
+    rng = random.Random(7)
+    payload = {
+        "schema": "chunk.embedding.v1",
+        "embedding": {"dim": 384, "vector": [rng.uniform(-1, 1) for _ in range(384)]},
+        "provenance": {"source_block_refs": [{"page": 1, "block": i, "text": "naïve ✓"} for i in range(3)]},
+    }
+    legacy = json.dumps(payload, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    assert jcs.canonicalize(payload) == legacy
+    assert jcs.canonical_hash(payload).startswith("sha256:")
+
+
+def test_hash_prefix_selects_algorithm():
+    """canonical_hash should use the requested algorithm and verify_hash the one a hash names."""
+    payload = {"schema": "doc.normalized.v1", "content": {"text": "naïve"}}
+    canonical = jcs.canonicalize(payload).encode("utf-8")
+    blake = jcs.canonical_hash(payload, "blake2b")
+    assert blake == "blake2b:" + hashlib.blake2b(canonical, digest_size=32).hexdigest()
+    assert jcs.canonical_hash(payload, "sha256") == "sha256:" + hashlib.sha256(canonical).hexdigest()
+    assert jcs.verify_hash(payload, blake)
+    assert jcs.verify_hash(payload, hashlib.sha256(canonical).hexdigest()), "Bare hex is SHA-256"
+    assert not jcs.verify_hash(payload, "sha256:" + blake.split(":")[1])
+    assert not jcs.verify_hash(payload, "md5:" + hashlib.md5(canonical).hexdigest())
+
+
+if __name__ == "__main__":
+    test_number_serialization()
+    test_rfc_8785_examples()
+    test_matches_json_dumps_where_it_is_canonical()
+    test_hash_prefix_selects_algorithm()
+    print("All JCS tests passed!")
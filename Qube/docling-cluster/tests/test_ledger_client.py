@@ -0,0 +1,180 @@
+"""
+Ledger Client Test - /append_batch, /entries and the buffered LedgerClient.
+Runs the ledger service in-process (no docker-compose needed).
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib import LedgerClient
+
+
+def load_service(ledger_path):
+    """Import a fresh copy of the ledger service writing to ledger_path."""
+    os.environ["LEDGER_PATH"] = str(ledger_path)
+    spec = importlib.util.spec_from_file_location("qube_ledger_service", ROOT / "ledger" / "ledger.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def serve(service, fail_first=0):
+    """Serve /append_batch from the service's Ledger over real HTTP; records batch sizes."""
+    batches = []
+    failures = [fail_first]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if failures[0]:
+                failures[0] -= 1
+                self.send_response(503)
+                self.end_headers()
+                return
+            entries = [(e["event"], e["bundle_id"], e["payload"]) for e in body["entries"]]
+            batches.append(len(entries))
+            data = json.dumps({"records": service.ledger.append_many(entries)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, batches
+
+
+async def _post_batch(service, entries):
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        return (await client.post("/append_batch", json={"entries": entries})).json()
+
+
+def test_append_batch_chains_records():
+    """A batch should be chained in order onto the existing head."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(Path(tmp) / "ledger.jsonl")
+        first = service.ledger.append("doc.normalized.v1", "b1", {"doc_id": "d1"})
+        entries = [{"event": "chunk.embedding.v1", "bundle_id": "b1", "payload": {"i": i}} for i in range(3)]
+        records = asyncio.run(_post_batch(service, entries))["records"]
+
+        assert [r["payload"]["i"] for r in records] == [0, 1, 2]
+        assert records[0]["prev_hash"] == first["entry_hash"]
+        assert all(b["prev_hash"] == a["entry_hash"] for a, b in zip(records, records[1:]))
+        assert service.ledger.get_prev_hash() == records[-1]["entry_hash"]
+        assert len((Path(tmp) / "ledger.jsonl").read_text().splitlines()) == 4
+
+
+def test_client_batches_with_bounded_latency():
+    """Appends should be batched, sent within the flush interval and retried on failure."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(Path(tmp) / "ledger.jsonl")
+        server, batches = serve(service, fail_first=1)
+        client = LedgerClient(
+            f"http://127.0.0.1:{server.server_port}", batch_size=10, flush_interval=0.2
+        )
+
+        for i in range(25):
+            client.append({"event": "chunk.embedding.v1", "bundle_id": "b1", "chunk_index": i})
+        assert client.flush(timeout=10), "Buffered records should be sent"
+        assert sum(batches) == 25 and max(batches) <= 10, f"Batches: {batches}"
+        assert client.last_error is None, "Retried batch should have succeeded"
+
+        start = time.monotonic()
+        client.append({"event": "doc.normalized.v1", "bundle_id": "b2", "doc_id": "d2"})
+        while sum(batches) < 26 and time.monotonic() - start < 5:
+            time.sleep(0.01)
+        assert sum(batches) == 26, "A lone record should be sent after the flush interval"
+        client.close()
+        server.shutdown()
+
+        lines = [json.loads(l) for l in (Path(tmp) / "ledger.jsonl").read_text().splitlines()]
+        assert [l["payload"].get("chunk_index") for l in lines[:25]] == list(range(25)), "Order kept"
+        assert lines[-1]["bundle_id"] == "b2" and lines[-1]["payload"] == {"doc_id": "d2"}
+
+
+def test_client_gives_up_after_retry_timeout():
+    """An unreachable ledger should not hang flush(): the batch is dropped after retry_timeout."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(Path(tmp) / "ledger.jsonl")
+        server, batches = serve(service, fail_first=1000)
+        client = LedgerClient(
+            f"http://127.0.0.1:{server.server_port}", flush_interval=0.01, retry_timeout=0.5
+        )
+
+        start = time.monotonic()
+        client.append({"event": "doc.normalized.v1", "bundle_id": "b1", "doc_id": "d1"})
+        assert client.flush(timeout=5), "Retries should stop after retry_timeout"
+        assert time.monotonic() - start < 2, "flush() should return once the batch is dropped"
+        assert batches == [] and client.last_error.startswith("HTTP 503")
+
+        client.append({"event": "doc.normalized.v1", "bundle_id": "b1", "doc_id": "d2"})
+        assert not client.flush(timeout=0.05), "flush() should report records still unsent"
+        client.close()
+        server.shutdown()
+
+
+async def _get_entries(service, **params):
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        response = await client.get("/entries", params=params)
+    if response.status_code != 200:
+        return response.status_code, None
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]["cursor"]
+
+
+def test_entries_seek_and_cursor():
+    """/entries should seek via the sparse index and resume from its cursor."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(Path(tmp) / "ledger.jsonl")
+        service.ledger.append_many([
+            ("doc.normalized.v1" if i % 5 == 0 else "chunk.embedding.v1", "b1", {"i": i})
+            for i in range(12)
+        ])
+        service = load_service(Path(tmp) / "ledger.jsonl")  # Rebuild the index from the file
+        service.INDEX_STRIDE = 4
+        service.ledger = service.Ledger(service.LEDGER_PATH)
+
+        page, cursor = asyncio.run(_get_entries(service, from_seq=6, limit=3))
+        assert [e["seq"] for e in page] == [6, 7, 8]
+        assert [e["record"]["payload"]["i"] for e in page] == [6, 7, 8]
+        page, cursor = asyncio.run(_get_entries(service, cursor=cursor))
+        assert [e["seq"] for e in page] == [9, 10, 11], "Cursor should resume after the last record"
+        page, tail = asyncio.run(_get_entries(service, cursor=cursor))
+        assert page == [] and tail == cursor, "Cursor at the head should be stable"
+
+        service.ledger.append("doc.normalized.v1", "b1", {"i": 12})
+        page, _ = asyncio.run(_get_entries(service, cursor=tail))
+        assert [e["seq"] for e in page] == [12], "Tail cursor should return new records"
+        page, _ = asyncio.run(_get_entries(service, event="doc.normalized.v1"))
+        assert [e["seq"] for e in page] == [0, 5, 10, 12]
+        assert asyncio.run(_get_entries(service, cursor="bm90LWpzb24"))[0] == 400
+        lines = (Path(tmp) / "ledger.jsonl").read_bytes().splitlines(keepends=True)
+        record_3 = sum(len(line) for line in lines[:3])
+        assert asyncio.run(_get_entries(service, cursor=service.encode_cursor(3, record_3)))[0][0]["seq"] == 3
+        mismatched = service.encode_cursor(5, record_3)  # A record start, but not record 5's
+        assert asyncio.run(_get_entries(service, cursor=mismatched))[0] == 400
+
+
+if __name__ == "__main__":
+    test_append_batch_chains_records()
+    test_client_batches_with_bounded_latency()
+    test_client_gives_up_after_retry_timeout()
+    test_entries_seek_and_cursor()
+    print("All ledger client tests passed!")
@@ -0,0 +1,94 @@
+"""
+Canonical Encoder Benchmark - per-payload canonicalization cost in the pipeline.
+
+For chunk.embedding.v1 payloads with 384- and 768-dim vectors, times what
+the embed worker does per chunk: hash the payload without its integrity
+field, then have the ledger canonicalize the payload with it. Compares the
+one-shot functions (each pass serializes the vector again) with a shared
+CanonicalEncoder, and an append_many into a ledger with and without it.
+
+Usage:
+    python benchmarks/bench_canonical_encoder.py [--events N] [--dims 384 768]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.canonicalize import (
+    CanonicalEncoder,
+    hash_canonical_without_integrity,
+    jcs_canonical_bytes,
+)
+from docling.ledger import Ledger
+from bench_ledger_append import make_payload
+
+
+def with_integrity(payload: dict, digest: str) -> dict:
+    payload["integrity"] = {"sha256_canonical": f"sha256:{digest}", "prev_ledger_hash": None}
+    return payload
+
+
+def run_functions(payloads: list[dict]) -> float:
+    """Seconds to hash and re-serialize every payload with the one-shot functions."""
+    start = time.perf_counter()
+    for payload in payloads:
+        with_integrity(payload, hash_canonical_without_integrity(payload))
+        jcs_canonical_bytes(payload)
+    return time.perf_counter() - start
+
+
+def run_encoder(payloads: list[dict]) -> float:
+    """Seconds to do the same through one CanonicalEncoder."""
+    start = time.perf_counter()
+    encoder = CanonicalEncoder()
+    for payload in payloads:
+        with_integrity(payload, encoder.hash_without_integrity(payload))
+        encoder.encode(payload)
+    return time.perf_counter() - start
+
+
+def run_ledger(payloads: list[dict], use_encoder: bool) -> float:
+    """Seconds to hash the payloads and append them with one append_many."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.jsonl", index=False)
+        start = time.perf_counter()
+        encoder = CanonicalEncoder() if use_encoder else None
+        for payload in payloads:
+            digest = encoder.hash_without_integrity(payload) if encoder else hash_canonical_without_integrity(payload)
+            with_integrity(payload, digest)
+        ledger.append_many((("chunk.embedding.v1", p) for p in payloads), encoder)
+        elapsed = time.perf_counter() - start
+        ledger.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--dims", type=int, nargs="+", default=[384, 768])
+    args = parser.parse_args()
+
+    print(f"{'dim':>5} {'stage':<22} {'functions':>14} {'encoder':>14} {'speedup':>8}")
+    for dim in args.dims:
+        def fresh():
+            return [make_payload(i, dim) for i in range(args.events)]
+
+        rows = [
+            ("hash + serialize", run_functions(fresh()), run_encoder(fresh())),
+            ("hash + append_many", run_ledger(fresh(), False), run_ledger(fresh(), True)),
+        ]
+        for stage, functions, encoder in rows:
+            per_functions = functions / args.events * 1e6
+            per_encoder = encoder / args.events * 1e6
+            print(
+                f"{dim:>5} {stage:<22} {per_functions:>9.1f} us/ev {per_encoder:>9.1f} us/ev "
+                f"{functions / encoder:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
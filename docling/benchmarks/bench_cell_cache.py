@@ -0,0 +1,86 @@
+"""
+Cell Cache Benchmark - table cell normalization with and without CellNormalizer.
+
+Builds large tables whose cells repeat the way financial and spec tables
+do (zeros, "N/A", units, a bounded set of amounts) and normalizes them as
+the docling worker used to (normalize_text per cell, and normalize_many
+over the flattened table reshaped into rows) and through a per-document
+CellNormalizer, reporting its hit rate.
+
+Usage:
+    python benchmarks/bench_cell_cache.py [--rows N] [--columns N] [--distinct N]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.normalize import CellNormalizer, normalize_many, normalize_text
+
+COMMON = ["0", "N/A", "-", "kg", "mm", "USD", "%", " Total ", "Yes", "No", "n/a", "—", "1"]
+
+
+def make_rows(rows: int, columns: int, distinct: int) -> list[list[str]]:
+    """Rows of cells: half drawn from COMMON, the rest from `distinct` amounts."""
+    rng = random.Random(rows)
+    amounts = [f"{rng.uniform(-1e5, 1e5):,.2f}" for _ in range(distinct)]
+    return [
+        [rng.choice(COMMON) if rng.random() < 0.5 else rng.choice(amounts) for _ in range(columns)]
+        for _ in range(rows)
+    ]
+
+
+def per_cell(rows):
+    return [[normalize_text(cell) for cell in row] for row in rows]
+
+
+def flattened(rows):
+    flat = iter(normalize_many(cell for row in rows for cell in row))
+    return [[next(flat) for _ in row] for row in rows]
+
+
+def timed(fn, rows) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--distinct", type=int, nargs="+", default=[1_000, 100_000])
+    args = parser.parse_args()
+
+    cells = args.rows * args.columns
+    print(f"{cells:,} cells ({args.rows:,} rows x {args.columns})")
+    print(f"{'distinct':>9} {'path':<16} {'seconds':>8} {'ns/cell':>8} {'speedup':>8} {'hit rate':>9}")
+    for distinct in args.distinct:
+        rows = make_rows(args.rows, args.columns, distinct)
+        expected = per_cell(rows)
+        baseline = None
+        for name, fn in [
+            ("per cell", per_cell),
+            ("flatten+reshape", flattened),
+            ("CellNormalizer", lambda r: CellNormalizer().normalize_table(r)),
+        ]:
+            assert fn(rows) == expected
+            elapsed = timed(fn, rows)
+            baseline = baseline or elapsed
+            hit_rate = ""
+            if name == "CellNormalizer":
+                normalizer = CellNormalizer()
+                normalizer.normalize_table(rows)
+                hit_rate = f"{normalizer.hits / cells:.1%}"
+            print(f"{distinct:>9,} {name:<16} {elapsed:>8.2f} {elapsed / cells * 1e9:>8.0f} "
+                  f"{baseline / elapsed:>7.2f}x {hit_rate:>9}")
+
+
+if __name__ == "__main__":
+    main()
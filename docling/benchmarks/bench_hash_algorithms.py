@@ -0,0 +1,77 @@
+"""
+Hash Algorithm Benchmark - SHA-256 vs BLAKE2b for integrity digests.
+
+Times the raw digest over inputs the size of chunk texts, canonical
+chunk payloads and ledger read blocks, then appends and fully verifies a
+chunk.embedding.v1 ledger hashed with each algorithm. SHA-256 is often
+hardware-accelerated (SHA-NI), so which one wins depends on the machine.
+
+Usage:
+    python benchmarks/bench_hash_algorithms.py [--entries N] [--dim N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.canonicalize import HASH_ALGORITHMS, hash_hex
+from docling.ledger import Ledger
+from bench_ledger_append import make_payload
+
+SIZES = [("chunk text", 2 * 1024), ("chunk payload", 16 * 1024), ("read block", 1024 * 1024)]
+
+
+def bench_digest(algorithm: str, data: bytes) -> float:
+    """MB/s hashing data repeatedly for about 0.2 s."""
+    rounds = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < 0.2:
+        for _ in range(10):
+            hash_hex(data, algorithm)
+        rounds += 10
+    return rounds * len(data) / elapsed / 1e6
+
+
+def bench_ledger(algorithm: str, entries: int, dim: int) -> tuple[float, float]:
+    """Seconds to append, and to fully verify, a ledger hashed with algorithm."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.jsonl", index=False, hash_algorithm=algorithm)
+        payloads = [make_payload(i, dim) for i in range(entries)]
+        start = time.perf_counter()
+        for i in range(0, entries, 1000):
+            ledger.append_many(("chunk.embedding.v1", p) for p in payloads[i:i + 1000])
+        appended = time.perf_counter() - start
+        start = time.perf_counter()
+        ok, errors = ledger.verify(full=True, workers=1)
+        verified = time.perf_counter() - start
+        assert ok, errors[:3]
+        ledger.close()
+    return appended, verified
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    algorithms = list(HASH_ALGORITHMS)
+    print(f"{'input':<14} {'bytes':>9} " + " ".join(f"{a + ' MB/s':>14}" for a in algorithms))
+    for name, size in SIZES:
+        data = os.urandom(size)
+        rates = [bench_digest(a, data) for a in algorithms]
+        print(f"{name:<14} {size:>9,} " + " ".join(f"{r:>14,.0f}" for r in rates))
+
+    print(f"\n{args.entries:,} entries, dim {args.dim}")
+    print(f"{'algorithm':<10} {'append s':>9} {'verify s':>9} {'verify entries/s':>17}")
+    for algorithm in algorithms:
+        appended, verified = bench_ledger(algorithm, args.entries, args.dim)
+        print(f"{algorithm:<10} {appended:>9.2f} {verified:>9.2f} {args.entries / verified:>17,.0f}")
+
+
+if __name__ == "__main__":
+    main()
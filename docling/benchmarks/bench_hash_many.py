@@ -0,0 +1,95 @@
+"""
+Batch Hashing Benchmark - per-chunk hashing loop vs hash_many / hash_hex_many.
+
+For documents of thousands of chunks, times what embed_document hashes:
+chunk texts for their chunk_ids and chunk.embedding.v1 payloads for
+their integrity field (canonical and vector_digest modes), one at a time
+and as a batch through the shared thread pool. Serialization holds the
+GIL, so only the digest step can overlap; the gain needs several cores.
+
+Usage:
+    python benchmarks/bench_hash_many.py [--chunks 1000 5000] [--threads N]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common import canonicalize
+from docling.common.canonicalize import (
+    CanonicalEncoder,
+    canonical_bytes_vector_digest,
+    hash_canonical_vector_digest,
+    hash_hex,
+    hash_hex_many,
+    hash_many,
+)
+from bench_ledger_append import make_payload
+
+WORDS = ["ledger", "canonical", "vector", "chunk", "document", "hash", "embedding", "normalized"]
+
+
+def make_texts(count: int, chars: int = 2000) -> list[bytes]:
+    """Chunk-sized texts (400 tokens is roughly 2000 characters)."""
+    rng = random.Random(count)
+    texts = []
+    for _ in range(count):
+        words = []
+        while sum(map(len, words)) + len(words) < chars:
+            words.append(rng.choice(WORDS))
+        texts.append(" ".join(words).encode())
+    return texts
+
+
+def timed(fn) -> float:
+    """Best of three runs, in seconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--threads", type=int, default=canonicalize.HASH_THREADS)
+    args = parser.parse_args()
+    canonicalize.HASH_THREADS = args.threads
+
+    print(f"hash pool threads: {args.threads}")
+    print(f"{'chunks':>7} {'stage':<24} {'loop':>10} {'batch':>10} {'speedup':>8}")
+    for count in args.chunks:
+        texts = make_texts(count)
+        payloads = [make_payload(i, args.dim) for i in range(count)]
+        encoder = CanonicalEncoder()
+        rows = [
+            (
+                "chunk_id",
+                lambda: [hash_hex(t) for t in texts],
+                lambda: hash_hex_many(texts),
+            ),
+            (
+                "integrity canonical",
+                lambda: [encoder.hash_without_integrity(p) for p in payloads],
+                lambda: hash_many(payloads, "sha256", encoder.encode_without_integrity),
+            ),
+            (
+                "integrity vector_digest",
+                lambda: [hash_canonical_vector_digest(p) for p in payloads],
+                lambda: hash_many(payloads, "sha256", canonical_bytes_vector_digest),
+            ),
+        ]
+        for stage, loop, batch in rows:
+            assert loop() == batch()
+            loop_s, batch_s = timed(loop), timed(batch)
+            print(f"{count:>7} {stage:<24} {loop_s * 1e3:>7.1f} ms {batch_s * 1e3:>7.1f} ms {loop_s / batch_s:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
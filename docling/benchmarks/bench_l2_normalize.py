@@ -0,0 +1,81 @@
+"""
+L2 Normalize Benchmark - allocating vs out= vs in-place, torch and numpy.
+
+Normalizes a random float32 embedding matrix with the allocating
+l2_normalize / l2_normalize_numpy, with out= into a preallocated buffer,
+and in place (l2_normalize_ / l2_normalize_numpy_), reporting wall time
+and, for numpy, the peak of allocations (tracemalloc) on top of the
+input. The out= and in-place variants work in blocks of --block-rows.
+
+Usage:
+    python benchmarks/bench_l2_normalize.py [--rows 1000000] [--dim 384] [--block-rows 16384]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.normalize import (
+    l2_normalize,
+    l2_normalize_,
+    l2_normalize_numpy,
+    l2_normalize_numpy_,
+)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def peak_mb(fn) -> float:
+    """Peak MB allocated (as seen by tracemalloc) while running fn."""
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--block-rows", type=int, default=16384)
+    args = parser.parse_args()
+
+    x = np.random.default_rng(0).standard_normal((args.rows, args.dim)).astype(np.float32)
+    blocks = args.block_rows
+    print(f"input: {args.rows:,} x {args.dim} float32 ({x.nbytes / 1e6:.0f} MB), blocks of {blocks:,} rows")
+
+    t = torch.from_numpy(x.copy())
+    t_out = torch.empty_like(t)
+    print(f"\n{'torch':<14} {'seconds':>8}")
+    for name, fn in [
+        ("allocating", lambda: l2_normalize(t)),
+        ("out=", lambda: l2_normalize(t, out=t_out, block_rows=blocks)),
+        ("in place", lambda: l2_normalize_(t, block_rows=blocks)),
+    ]:
+        print(f"{name:<14} {timed(fn):>8.2f}")
+
+    y = x.copy()
+    y_out = np.empty_like(x)
+    print(f"\n{'numpy':<14} {'seconds':>8} {'peak MB':>9} {'dtype':>8}")
+    for name, fn in [
+        ("allocating", lambda: l2_normalize_numpy(y)),
+        ("out=", lambda: l2_normalize_numpy(y, out=y_out, block_rows=blocks)),
+        ("in place", lambda: l2_normalize_numpy_(y, block_rows=blocks)),
+    ]:
+        elapsed = timed(fn)
+        print(f"{name:<14} {elapsed:>8.2f} {peak_mb(fn):>9.1f} {str(fn().dtype):>8}")
+
+
+if __name__ == "__main__":
+    main()
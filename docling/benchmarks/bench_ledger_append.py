@@ -0,0 +1,68 @@
+"""
+Ledger Append Benchmark - events/sec per durability mode.
+
+Appends synthetic chunk.embedding.v1 payloads one at a time and in
+append_many batches for each durability mode.
+
+Usage:
+    python benchmarks/bench_ledger_append.py [--events N] [--batch N] [--dim N]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.ledger import Ledger
+from docling.ledger.ledger import DURABILITY_MODES
+
+
+def make_payload(i: int, dim: int) -> dict:
+    """Synthetic chunk.embedding.v1 payload."""
+    return {
+        "schema": "chunk.embedding.v1",
+        "doc_id": "bench-doc",
+        "chunk_id": f"sha256:{i:064x}",
+        "embedding": {"dim": dim, "vector": [((i + j) % 97) / 97 for j in range(dim)]},
+        "provenance": {"source_block_refs": [f"p0:b{i}"]},
+    }
+
+
+def run(durability: str, payloads: list[dict], batch: int) -> float:
+    """Append all payloads and return events/sec."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.jsonl", durability=durability)
+        start = time.perf_counter()
+        if batch <= 1:
+            for payload in payloads:
+                ledger.append("chunk.embedding.v1", payload)
+        else:
+            for i in range(0, len(payloads), batch):
+                ledger.append_many(
+                    ("chunk.embedding.v1", p) for p in payloads[i:i + batch]
+                )
+        ledger.close()  # Include the final commit
+        elapsed = time.perf_counter() - start
+    return len(payloads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    payloads = [make_payload(i, args.dim) for i in range(args.events)]
+
+    print(f"{'durability':<10} {'append':>14} {'append_many':>14}")
+    for durability in DURABILITY_MODES:
+        single = run(durability, payloads, 1)
+        batched = run(durability, payloads, args.batch)
+        print(f"{durability:<10} {single:>10,.0f} ev/s {batched:>10,.0f} ev/s")
+
+
+if __name__ == "__main__":
+    main()
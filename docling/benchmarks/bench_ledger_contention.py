@@ -0,0 +1,83 @@
+"""
+Ledger Contention Benchmark - events/sec with concurrent appending threads.
+
+Splits a fixed number of synthetic chunk.embedding.v1 appends across 1, 4
+and 16 threads sharing one Ledger, as a threaded Celery pool would, and
+reports throughput and the share of time spent inside the append lock.
+
+Usage:
+    python benchmarks/bench_ledger_contention.py [--events N] [--dim N] [--threads 1 4 16]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.ledger import Ledger
+from bench_ledger_append import make_payload
+
+
+class TimedLock:
+    """Lock wrapper accumulating the time it is held."""
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.held = 0.0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._acquired = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.held += time.perf_counter() - self._acquired
+        self._lock.release()
+
+
+def run(threads: int, payloads: list[dict]) -> tuple[float, float]:
+    """Append all payloads from the given number of threads; return (events/sec, lock share)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.jsonl")
+        lock = ledger._lock = TimedLock(ledger._lock)
+
+        def worker(chunk):
+            for payload in chunk:
+                ledger.append("chunk.embedding.v1", payload)
+
+        workers = [
+            threading.Thread(target=worker, args=(payloads[i::threads],))
+            for i in range(threads)
+        ]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+        ledger.close()
+
+        ok, errors = ledger.verify()
+        assert ok, errors[:3]
+    return len(payloads) / elapsed, lock.held / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=4000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    payloads = [make_payload(i, args.dim) for i in range(args.events)]
+
+    print(f"{'threads':>7} {'throughput':>14} {'lock held':>10}")
+    for threads in args.threads:
+        rate, held = run(threads, payloads)
+        print(f"{threads:>7} {rate:>10,.0f} ev/s {held:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Ledger Daemon Benchmark - cost of the single-writer daemon for worker processes.
+
+Compares worker processes appending through the single-writer daemon with
+each process appending to the file through its own Ledger (the prefork
+default, whose chain breaks as soon as two processes interleave and whose
+sidecar updates can race). The daemon is a correctness fix, one writer per
+chain, not a throughput gain: it adds a socket round trip per request and
+re-parses every payload to check it, so expect it to be slower than the
+broken per-process files. The "ok"/"BROKEN" column says whether the
+resulting chain verifies.
+
+Usage:
+    python benchmarks/bench_ledger_daemon.py [--events N] [--dim N] [--processes 1 4 8] [--batch 1 50]
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.ledger import Ledger, LedgerClient, LedgerDaemon
+from bench_ledger_append import make_payload
+
+
+def _append(ledger, start, count, dim, batch):
+    for i in range(start, start + count, batch):
+        ledger.append_many(
+            ("chunk.embedding.v1", make_payload(j, dim)) for j in range(i, min(i + batch, start + count))
+        )
+    ledger.close()
+
+
+def _append_direct(path, start, count, dim, batch):
+    _append(Ledger(path, index=False), start, count, dim, batch)
+
+
+def _append_daemon(socket_path, start, count, dim, batch):
+    _append(LedgerClient(socket_path), start, count, dim, batch)
+
+
+def run(mode: str, processes: int, events: int, dim: int, batch: int) -> tuple[float, bool]:
+    """Append events from the given number of processes; return (events/sec, chain valid)."""
+    per_process = events // processes
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        if mode == "daemon":
+            daemon = LedgerDaemon(Ledger(path, index=False), Path(tmp) / "ledger.sock")
+            threading.Thread(target=daemon.serve_forever, daemon=True).start()
+            target, where = _append_daemon, daemon.socket_path
+        else:
+            target, where = _append_direct, path
+
+        ctx = multiprocessing.get_context("fork")
+        workers = [
+            ctx.Process(target=target, args=(where, p * per_process, per_process, dim, batch))
+            for p in range(processes)
+        ]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+
+        if mode == "daemon":
+            daemon.close()
+        valid, _ = Ledger(path, index=False).verify()
+    return per_process * processes / elapsed, valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=4000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 50], help="Events per append_many")
+    args = parser.parse_args()
+
+    print(f"{'batch':>5} {'processes':>9} {'per-process file':>22} {'daemon':>22}")
+    for batch in args.batch:
+        for processes in args.processes:
+            cells = []
+            for mode in ("direct", "daemon"):
+                rate, valid = run(mode, processes, args.events, args.dim, batch)
+                cells.append(f"{rate:>10,.0f} ev/s {'ok' if valid else 'BROKEN':>6}")
+            print(f"{batch:>5} {processes:>9} {cells[0]:>22} {cells[1]:>22}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Ledger Verification Benchmark - entries/sec by worker count.
+
+Builds a synthetic ledger of chunk.embedding.v1 entries and runs a full
+verification sequentially and with increasing process pool sizes.
+
+Usage:
+    python benchmarks/bench_ledger_verify.py [--entries N] [--dim N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.ledger import Ledger
+from bench_ledger_append import make_payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.jsonl")
+        for i in range(0, args.entries, 1000):
+            ledger.append_many(
+                ("chunk.embedding.v1", make_payload(j, args.dim))
+                for j in range(i, min(i + 1000, args.entries))
+            )
+        size_mb = ledger.path.stat().st_size / 1e6
+        print(f"{args.entries:,} entries, {size_mb:,.1f} MB")
+
+        cpus = os.cpu_count() or 1
+        counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+        baseline = None
+        print(f"{'workers':>8} {'seconds':>9} {'entries/s':>12} {'speedup':>8}")
+        for workers in counts:
+            start = time.perf_counter()
+            ok, errors = ledger.verify(full=True, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert ok, errors[:3]
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.entries / elapsed:>12,.0f} "
+                  f"{baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Model Preload Benchmark - total RSS/PSS of N forked workers: per-child load vs preloaded in parent.
+
+Mimics the embed worker's prefork pool with a synthetic model of about
+--mb MB (stacked Linear layers, loaded from a saved state_dict). Either
+each of --workers forked children loads its own copy on its first task,
+or the parent loads it once and moves it to shared memory before
+forking (EMBEDDER_PRELOAD, share_model_memory). Once every child has run one forward pass,
+reports the time each child waited for its first result and the summed
+RSS and PSS (proportional set size, which splits shared pages between
+the processes mapping them) of the parent and all children, from
+/proc/<pid>/smaps_rollup (Linux only).
+
+Usage:
+    python benchmarks/bench_model_preload.py [--workers 4] [--mb 200]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.weights import share_model_memory
+
+DIM = 1024
+
+
+def memory_mb(pid: int) -> tuple[float, float]:
+    """(RSS, PSS) of a process in MB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                fields[name] = int(value.split()[0]) / 1024
+    return fields["Rss"], fields["Pss"]
+
+
+def build_model(layers: int) -> torch.nn.Module:
+    with torch.device("meta"):
+        model = torch.nn.Sequential(*(torch.nn.Linear(DIM, DIM) for _ in range(layers)))
+    return model.to_empty(device="cpu").eval()
+
+
+def load_model(path: Path, layers: int) -> torch.nn.Module:
+    model = build_model(layers)
+    model.load_state_dict(torch.load(path))
+    return model
+
+
+def child(model, path: Path, layers: int, ready, done) -> None:
+    """A pool child: load the model if it was not inherited, run one task, wait."""
+    torch.set_num_threads(1)
+    start = time.perf_counter()
+    if model is None:
+        model = load_model(path, layers)
+    with torch.inference_mode():
+        model(torch.randn(1, DIM))
+    ready.put(time.perf_counter() - start)
+    done.wait()
+
+
+def save_model(path: Path, layers: int) -> None:
+    model = build_model(layers)
+    for param in model.parameters():
+        torch.nn.init.normal_(param)
+    torch.save(model.state_dict(), path)
+
+
+def run(mode: str, path: Path, layers: int, workers: int) -> None:
+    ctx = multiprocessing.get_context("fork")
+    model = None
+    if mode == "preloaded":
+        model = share_model_memory(load_model(path, layers))
+
+    ready, done = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=child, args=(model, path, layers, ready, done)) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    waits = [ready.get() for _ in procs]
+
+    usage = [memory_mb(pid) for pid in [os.getpid()] + [proc.pid for proc in procs]]
+    done.set()
+    for proc in procs:
+        proc.join()
+    rss, pss = sum(u[0] for u in usage), sum(u[1] for u in usage)
+    print(f"{mode:<10} {max(waits):>12.3f} {rss:>10.0f} {pss:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mb", type=int, default=200)
+    args = parser.parse_args()
+
+    layers = max(1, args.mb * 1_000_000 // (4 * DIM * (DIM + 1)))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "model.pt"
+        # Built in a subprocess, so no freed model memory lingers in the parent
+        saver = multiprocessing.get_context("fork").Process(target=save_model, args=(path, layers))
+        saver.start()
+        saver.join()
+
+        print(f"model: {layers} x Linear({DIM}, {DIM}), {layers * 4 * DIM * (DIM + 1) / 1e6:.0f} MB; {args.workers} workers")
+        print(f"{'mode':<10} {'first task s':>12} {'RSS MB':>10} {'PSS MB':>10}")
+        for mode in ("per-child", "preloaded"):
+            run(mode, path, layers, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Normalize Benchmark - normalize_text on table-heavy documents.
+
+Generates table cells like a parsed financial report (numbers, dates,
+short labels, some repeated, a few with non-ASCII text or stray
+whitespace) plus paragraph blocks, and times the original pipeline,
+normalize_text per cell, and normalize_many per table.
+
+Usage:
+    python benchmarks/bench_normalize.py [--cells N] [--blocks N]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.normalize import normalize_many, normalize_text
+
+LABELS = ["Revenue", "Total", "Net income", "Q1", "Q2", "Q3", "Q4", "n/a", "—", "Zürich", "Operating  costs"]
+
+
+def legacy_normalize_text(text: str) -> str:
+    """The previous normalize_text."""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[^\S\n]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def make_tables(cells: int, columns: int = 8, rows_per_table: int = 50) -> list[list[str]]:
+    """Tables as flat cell lists."""
+    rng = random.Random(cells)
+    values = []
+    for i in range(cells):
+        kind = rng.random()
+        if kind < 0.5:
+            values.append(f"{rng.uniform(-1e6, 1e6):,.2f}")
+        elif kind < 0.6:
+            values.append(f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        elif kind < 0.95:
+            values.append(rng.choice(LABELS))
+        else:
+            values.append(f" {rng.choice(LABELS)} {i} \n")
+    size = columns * rows_per_table
+    return [values[i:i + size] for i in range(0, cells, size)]
+
+
+def make_blocks(count: int) -> list[str]:
+    rng = random.Random(count)
+    words = ["ledger", "naïve", "ﬁnance", "report", "the", "of", "revenue", "　", "and"]
+    return ["  ".join(rng.choice(words) for _ in range(rng.randint(20, 120))) + "\r\n\r\n\r\n" for _ in range(count)]
+
+
+def timed(fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cells", type=int, default=1_000_000)
+    parser.add_argument("--blocks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    tables = make_tables(args.cells)
+    blocks = make_blocks(args.blocks)
+    assert [legacy_normalize_text(c) for t in tables for c in t] == [c for t in tables for c in normalize_many(t)]
+    assert [legacy_normalize_text(b) for b in blocks] == [normalize_text(b) for b in blocks]
+
+    rows = [
+        ("table cells", args.cells, [
+            ("legacy", lambda: [[legacy_normalize_text(c) for c in t] for t in tables]),
+            ("normalize_text", lambda: [[normalize_text(c) for c in t] for t in tables]),
+            ("normalize_many", lambda: [normalize_many(t) for t in tables]),
+        ]),
+        ("text blocks", args.blocks, [
+            ("legacy", lambda: [legacy_normalize_text(b) for b in blocks]),
+            ("normalize_text", lambda: [normalize_text(b) for b in blocks]),
+        ]),
+    ]
+    print(f"{'input':<12} {'count':>10} {'function':<15} {'seconds':>8} {'ns/item':>9} {'speedup':>8}")
+    for name, count, variants in rows:
+        baseline = None
+        for label, fn in variants:
+            elapsed = timed(fn)
+            baseline = baseline or elapsed
+            print(f"{name:<12} {count:>10,} {label:<15} {elapsed:>8.2f} {elapsed / count * 1e9:>9.0f} "
+                  f"{baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
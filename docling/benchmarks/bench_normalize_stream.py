@@ -0,0 +1,73 @@
+"""
+Streaming Normalize Benchmark - peak memory and time for large text blocks.
+
+Normalizes a synthetic extraction of the given size (mixed ASCII and
+non-ASCII text, CRLF line endings, whitespace runs) with normalize_text
+on the whole string and with normalize_stream over fixed-size pieces,
+reporting wall time and the peak of Python allocations (tracemalloc) on
+top of the input itself.
+
+Usage:
+    python benchmarks/bench_normalize_stream.py [--mb 50] [--piece-kb 1024]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.normalize import normalize_stream, normalize_text
+
+WORDS = ["ledger", "naïve", "ﬁnance", "report", "the", "of", "Zürich", "revenue", "　", "and", "2024"]
+
+
+def make_text(mb: int) -> str:
+    """About mb million characters of extracted text."""
+    rng = random.Random(mb)
+    paragraph = "\r\n".join("  ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(20))
+    paragraph += "\r\n\r\n\r\n"
+    return paragraph * (mb * 1_000_000 // len(paragraph) + 1)
+
+
+def streamed(text: str, piece: int) -> str:
+    pieces = (text[i:i + piece] for i in range(0, len(text), piece))
+    return "".join(normalize_stream(pieces))
+
+
+def measure(fn) -> tuple[float, float]:
+    """(seconds, peak MB allocated while running fn)."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=int, default=50)
+    parser.add_argument("--piece-kb", type=int, default=1024)
+    args = parser.parse_args()
+
+    text = make_text(args.mb)
+    piece = args.piece_kb * 1024
+    assert streamed(text, piece) == normalize_text(text)
+    print(f"input: {len(text):,} characters, pieces of {piece:,}")
+    print(f"{'function':<18} {'seconds':>8} {'peak MB':>9}")
+    for name, fn in [
+        ("normalize_text", lambda: normalize_text(text)),
+        ("normalize_stream", lambda: streamed(text, piece)),
+        ("stream, no join", lambda: sum(map(len, normalize_stream(text[i:i + piece] for i in range(0, len(text), piece))))),
+    ]:
+        elapsed, peak = measure(fn)
+        print(f"{name:<18} {elapsed:>8.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
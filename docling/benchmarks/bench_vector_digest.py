@@ -0,0 +1,78 @@
+"""
+Vector Digest Benchmark - chunk.embedding.v1 integrity hashing by mode.
+
+For 384- and 768-dim chunk payloads, times hashing a payload for its
+integrity field and verifying a stored one, with the vector serialized
+as JSON ("canonical" mode) and committed by its float32 bytes
+("vector_digest" mode).
+
+Usage:
+    python benchmarks/bench_vector_digest.py [--events N] [--dims 384 768]
+"""
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.canonicalize import (
+    INTEGRITY_CANONICAL,
+    INTEGRITY_VECTOR_DIGEST,
+    hash_canonical_vector_digest,
+    hash_canonical_without_integrity,
+    verify_integrity,
+)
+from bench_ledger_append import make_payload
+
+HASHERS = {
+    INTEGRITY_CANONICAL: hash_canonical_without_integrity,
+    INTEGRITY_VECTOR_DIGEST: hash_canonical_vector_digest,
+}
+
+
+def make_float32_payload(i: int, dim: int) -> dict:
+    """make_payload with the vector rounded to float32, as the embed worker stores it."""
+    payload = make_payload(i, dim)
+    vector = payload["embedding"]["vector"]
+    payload["embedding"]["vector"] = list(struct.unpack(f"<{dim}f", struct.pack(f"<{dim}f", *vector)))
+    return payload
+
+
+def run(payloads: list[dict], mode: str) -> tuple[float, float]:
+    """Seconds to hash every payload, and to verify them all afterwards."""
+    hasher = HASHERS[mode]
+    start = time.perf_counter()
+    for payload in payloads:
+        payload["integrity"] = {
+            "sha256_canonical": f"sha256:{hasher(payload)}",
+            "prev_ledger_hash": None,
+            "mode": mode,
+        }
+    hashed = time.perf_counter() - start
+    start = time.perf_counter()
+    assert all(verify_integrity(p) for p in payloads)
+    return hashed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--dims", type=int, nargs="+", default=[384, 768])
+    args = parser.parse_args()
+
+    print(f"{'dim':>5} {'stage':<8} {'canonical':>14} {'vector_digest':>14} {'speedup':>8}")
+    for dim in args.dims:
+        payloads = [make_float32_payload(i, dim) for i in range(args.events)]
+        canonical = run(payloads, INTEGRITY_CANONICAL)
+        digest = run(payloads, INTEGRITY_VECTOR_DIGEST)
+        for stage, before, after in zip(("hash", "verify"), canonical, digest):
+            print(
+                f"{dim:>5} {stage:<8} {before / args.events * 1e6:>9.1f} us/ev "
+                f"{after / args.events * 1e6:>9.1f} us/ev {before / after:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
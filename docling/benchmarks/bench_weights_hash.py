@@ -0,0 +1,90 @@
+"""
+Weights Hash Benchmark - embed worker cold start: concatenated vs streamed vs cached hash.
+
+Saves a synthetic model (--tensors float32 tensors, --mb in total; the
+defaults are about all-MiniLM-L6-v2's size) and times a worker's cold
+start up to its first embedding: load the weights, compute the weights
+hash, run one forward pass. The hash is computed the previous way
+(bytes concatenated with +=), streamed with weights_hash, and read back
+from a warm WeightsHashCache. Peak allocations (tracemalloc) cover the
+hash step only.
+
+Usage:
+    python benchmarks/bench_weights_hash.py [--mb 90] [--tensors 100]
+"""
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.weights import WeightsHashCache, cached_weights_hash, model_files, weights_hash
+
+
+def concatenated_hash(state_dict) -> str:
+    """The weights hash as get_model used to compute it."""
+    weights_bytes = b""
+    for key in sorted(state_dict.keys()):
+        weights_bytes += state_dict[key].cpu().numpy().tobytes()
+    return hashlib.sha256(weights_bytes).hexdigest()
+
+
+def make_model_dir(path: Path, mb: int, tensors: int) -> None:
+    per_tensor = mb * 1_000_000 // 4 // tensors
+    state_dict = {f"layer.{i}.weight": torch.randn(per_tensor) for i in range(tensors)}
+    path.mkdir()
+    torch.save(state_dict, path / "model.pt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=int, default=90)
+    parser.add_argument("--tensors", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model_dir = Path(tmpdir) / "model"
+        make_model_dir(model_dir, args.mb, args.tensors)
+        cache = WeightsHashCache(Path(tmpdir) / "weights_hashes.json")
+        files = model_files(model_dir)
+        query = torch.randn(1, args.mb * 1_000_000 // 4 // args.tensors)
+
+        hashers = [
+            ("concatenated", concatenated_hash),
+            ("streamed", weights_hash),
+            ("cached", lambda sd: cached_weights_hash(sd, files, cache)[0]),
+        ]
+        cached_weights_hash(torch.load(model_dir / "model.pt"), files, cache)  # Warm the cache
+
+        print(f"model: {args.tensors} tensors, {args.mb} MB")
+        print(f"{'hash':<14} {'load s':>7} {'hash s':>7} {'first s':>8} {'total s':>8} {'hash peak MB':>13}")
+        digests = set()
+        for name, hasher in hashers:
+            start = time.perf_counter()
+            state_dict = torch.load(model_dir / "model.pt")
+            loaded = time.perf_counter()
+            digests.add(hasher(state_dict))
+            hashed = time.perf_counter()
+            with torch.inference_mode():
+                query @ state_dict["layer.0.weight"]  # First "embedding"
+            done = time.perf_counter()
+
+            tracemalloc.start()
+            hasher(state_dict)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{name:<14} {loaded - start:>7.2f} {hashed - loaded:>7.2f} "
+                f"{done - hashed:>8.3f} {done - start:>8.2f} {peak / 1e6:>13.1f}"
+            )
+        assert len(digests) == 1, "All hashes should agree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Ledger Service Load Test - /append latency as the ledger grows.
+
+Pre-fills the ledger file to each target size, restarts the service state
+and measures /append latency through the ASGI app. Filler records are not
+hash-chained; only the tail matters for recovery and appends.
+
+Usage:
+    python benchmarks/load_ledger_service.py [--sizes 10000,100000,...] [--appends N]
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+SERVICE_PATH = Path(__file__).parent.parent / "services" / "ledger" / "ledger.py"
+FILL_BLOCK = 10_000
+
+
+def load_service(data_dir: Path):
+    """Import the ledger service module against a scratch data directory."""
+    os.environ["LEDGER_DATA_DIR"] = str(data_dir)
+    spec = importlib.util.spec_from_file_location("ledger_service", SERVICE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fill(path: Path, start: int, stop: int):
+    """Append filler records with seq in [start, stop)."""
+    with open(path, "ab") as f:
+        for block in range(start, stop, FILL_BLOCK):
+            f.write(b"".join(
+                (json.dumps({
+                    "seq": seq,
+                    "timestamp": "2024-01-01T00:00:00",
+                    "type": "chunk.embedding.v1",
+                    "bundle_id": "load-test",
+                    "payload_hash": f"sha256:{seq:064x}",
+                    "prev_hash": f"sha256:{seq - 1:064x}",
+                    "entry_hash": f"sha256:{seq:064x}",
+                }) + "\n").encode()
+                for seq in range(block, min(block + FILL_BLOCK, stop))
+            ))
+
+
+async def measure(service, appends: int) -> list[float]:
+    """Restart service state and time sequential /append calls (ms)."""
+    service.last_hash = None
+    service.next_seq = 0
+    service.ledger_offset = 0
+    await service.startup()
+
+    latencies = []
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        for i in range(appends):
+            start = time.perf_counter()
+            resp = await client.post("/append", json={
+                "type": "chunk.embedding.v1",
+                "bundle_id": "load-test",
+                "payload": {"chunk_index": i},
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+            resp.raise_for_status()
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000")
+    parser.add_argument("--appends", type=int, default=500)
+    parser.add_argument("--data-dir", help="Scratch directory (default: temp dir)")
+    args = parser.parse_args()
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    with tempfile.TemporaryDirectory(dir=args.data_dir) as tmp:
+        service = load_service(Path(tmp))
+        service.DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+        print(f"{'entries':>12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        filled = 0
+        for size in sizes:
+            fill(service.LEDGER_FILE, filled, size)
+            latencies = await measure(service, args.appends)
+            filled = size + args.appends
+
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(f"{size:>12,} {statistics.median(latencies):>8.3f} "
+                  f"{p99:>8.3f} {latencies[-1]:>8.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
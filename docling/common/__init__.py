@@ -1,22 +1,56 @@
 # Common utilities package
 from .canonicalize import (
+    HASH_ALGORITHM,
+    CanonicalEncoder,
     jcs_canonical_bytes,
     sha256_hex,
+    hash_hex,
+    hash_hex_many,
+    sha256_many,
+    hash_many,
+    prefixed_digest,
+    split_digest,
+    verify_digest,
     hash_canonical,
     hash_canonical_without_integrity,
+    hash_canonical_vector_digest,
+    vector_commitment,
+    verify_integrity,
 )
 from .normalize import (
+    CellNormalizer,
     normalize_text,
+    normalize_many,
+    normalize_stream,
     l2_normalize,
+    l2_normalize_,
     l2_normalize_numpy,
+    l2_normalize_numpy_,
 )
 
 __all__ = [
+    "HASH_ALGORITHM",
+    "CanonicalEncoder",
     "jcs_canonical_bytes",
     "sha256_hex",
+    "hash_hex",
+    "hash_hex_many",
+    "sha256_many",
+    "hash_many",
+    "prefixed_digest",
+    "split_digest",
+    "verify_digest",
     "hash_canonical",
     "hash_canonical_without_integrity",
+    "hash_canonical_vector_digest",
+    "vector_commitment",
+    "verify_integrity",
+    "CellNormalizer",
     "normalize_text",
+    "normalize_many",
+    "normalize_stream",
     "l2_normalize",
+    "l2_normalize_",
     "l2_normalize_numpy",
+    "l2_normalize_numpy_",
 ]
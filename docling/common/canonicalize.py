@@ -2,10 +2,62 @@
 JCS Canonicalization and SHA256 Hashing.
 
 For deterministic JSON serialization and integrity verification.
+Integrity digests are written as "<algorithm>:<hex>"; HASH_ALGORITHM picks
+the algorithm for new ones, and verifiers use whichever one a digest names
+(bare hex, as in older records, is SHA-256).
 """
 import hashlib
 import json
-from typing import Any
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, Sequence
+
+
+# Values json.dumps encodes on its own (no nested containers)
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# Encoded containers smaller than this are not worth caching
+MIN_CACHED_SIZE = 1024
+
+# Bytes buffered before feeding a hash object
+HASH_CHUNK_SIZE = 64 * 1024
+
+# chunk.embedding.v1 integrity modes (integrity.mode; records without one are "canonical")
+INTEGRITY_CANONICAL = "canonical"
+INTEGRITY_VECTOR_DIGEST = "vector_digest"
+
+# Byte layout a vector is committed as in vector_digest mode
+VECTOR_DTYPE = "float32-le"
+
+# Digest algorithms by prefix; BLAKE2b is truncated to 256 bits like SHA-256
+HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": partial(hashlib.blake2b, digest_size=32),
+}
+
+# Algorithm for new digests
+HASH_ALGORITHM = os.environ.get("HASH_ALGORITHM", "sha256")
+
+# hashlib releases the GIL only while hashing inputs at least this long
+HASHLIB_GIL_MINSIZE = 2048
+
+# Batches smaller than this many bytes in total are hashed in the calling thread
+PARALLEL_HASH_MIN_BYTES = 1024 * 1024
+
+# Threads in the shared hashing pool (1: never use it)
+HASH_THREADS = min(8, os.cpu_count() or 1)
+
+# Batches handed to each pool thread (smaller batches balance load)
+BATCHES_PER_THREAD = 4
+
+_hash_pool: ThreadPoolExecutor | None = None
+_hash_pool_lock = threading.Lock()
 
 
 def jcs_canonical_bytes(obj: dict[str, Any]) -> bytes:
@@ -26,17 +78,42 @@ def jcs_canonical_bytes(obj: dict[str, Any]) -> bytes:
     ).encode("utf-8")
 
 
+def new_hash(algorithm: str = HASH_ALGORITHM) -> Any:
+    """A hashlib object for one of HASH_ALGORITHMS."""
+    try:
+        return HASH_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}") from None
+
+
+def split_digest(digest: str) -> tuple[str, str]:
+    """Split "<algorithm>:<hex>" into its parts; bare hex is SHA-256."""
+    algorithm, sep, hex_digest = digest.rpartition(":")
+    if not sep:
+        return "sha256", digest
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}")
+    return algorithm, hex_digest
+
+
 def sha256_hex(data: bytes) -> str:
     """Compute SHA-256 hash and return as hex string."""
     return hashlib.sha256(data).hexdigest()
 
 
-def hash_canonical(payload: dict[str, Any]) -> str:
+def hash_hex(data: bytes, algorithm: str = HASH_ALGORITHM) -> str:
+    """Hex digest of data with one of HASH_ALGORITHMS."""
+    digest = new_hash(algorithm)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def hash_canonical(payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> str:
     """Hash a dict using JCS canonicalization."""
-    return sha256_hex(jcs_canonical_bytes(payload))
+    return hash_hex(jcs_canonical_bytes(payload), algorithm)
 
 
-def hash_canonical_without_integrity(payload: dict[str, Any]) -> str:
+def hash_canonical_without_integrity(payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> str:
     """
     Hash a dict, excluding the 'integrity' field.
     
@@ -45,4 +122,266 @@ def hash_canonical_without_integrity(payload: dict[str, Any]) -> str:
     """
     tmp = dict(payload)
     tmp.pop("integrity", None)
-    return sha256_hex(jcs_canonical_bytes(tmp))
+    return hash_hex(jcs_canonical_bytes(tmp), algorithm)
+
+
+def prefixed_digest(data: bytes, algorithm: str = HASH_ALGORITHM) -> str:
+    """Prefixed digest ("<algorithm>:<hex>") of data."""
+    return f"{algorithm}:{hash_hex(data, algorithm)}"
+
+
+def _hash_pool_executor() -> ThreadPoolExecutor:
+    """The shared hashing pool, started on first use."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ThreadPoolExecutor(max_workers=HASH_THREADS, thread_name_prefix="hash")
+        return _hash_pool
+
+
+def _reset_hash_pool() -> None:
+    """Forget the parent's pool in a forked child (its threads do not survive the fork)."""
+    global _hash_pool, _hash_pool_lock
+    _hash_pool = None
+    _hash_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_hash_pool)
+
+
+def _hash_batch(items: Sequence[bytes], algorithm: str) -> list[str]:
+    return [hash_hex(data, algorithm) for data in items]
+
+
+def hash_hex_many(items: Sequence[bytes], algorithm: str = HASH_ALGORITHM) -> list[str]:
+    """
+    Hex digests of many byte strings, in order.
+    
+    Batches of at least PARALLEL_HASH_MIN_BYTES whose items are long
+    enough for hashlib to release the GIL are split across the shared
+    thread pool; anything smaller is hashed in the calling thread, where
+    handing it to threads would only add overhead.
+    """
+    total = sum(map(len, items))
+    if (
+        HASH_THREADS < 2
+        or len(items) < 2
+        or total < PARALLEL_HASH_MIN_BYTES
+        or total < HASHLIB_GIL_MINSIZE * len(items)
+    ):
+        return _hash_batch(items, algorithm)
+    new_hash(algorithm)  # Reject unknown algorithms before submitting
+    step = -(-len(items) // (HASH_THREADS * BATCHES_PER_THREAD))
+    pool = _hash_pool_executor()
+    futures = [pool.submit(_hash_batch, items[i:i + step], algorithm) for i in range(0, len(items), step)]
+    return list(chain.from_iterable(future.result() for future in futures))
+
+
+def sha256_many(items: Sequence[bytes]) -> list[str]:
+    """SHA-256 hex digests of many byte strings (as sha256_hex, batched like hash_hex_many)."""
+    return hash_hex_many(items, "sha256")
+
+
+def hash_many(
+    payloads: Sequence[Any],
+    algorithm: str = HASH_ALGORITHM,
+    encode: Callable[[Any], bytes] = jcs_canonical_bytes,
+) -> list[str]:
+    """
+    Canonical hashes of many payloads (as hash_canonical), in order.
+    
+    Serializing holds the GIL, so payloads are encoded in the calling
+    thread and only the digests go through hash_hex_many.
+    
+    Args:
+        payloads: Payloads to hash
+        algorithm: One of HASH_ALGORITHMS
+        encode: Canonical bytes of one payload (e.g. a CanonicalEncoder's
+            encode, or canonical_bytes_vector_digest)
+    """
+    return hash_hex_many([encode(payload) for payload in payloads], algorithm)
+
+
+def hash_canonical_as(payload: dict[str, Any], digest: str) -> str:
+    """
+    Hash a dict with the algorithm an existing digest names, written the
+    same way (bare hex or prefixed), so the two can be compared directly.
+    """
+    algorithm, _ = split_digest(digest)
+    hex_digest = hash_canonical(payload, algorithm)
+    return f"{algorithm}:{hex_digest}" if ":" in digest else hex_digest
+
+
+def verify_digest(data: bytes, digest: str) -> bool:
+    """Check data against a digest, with the algorithm the digest names."""
+    algorithm, hex_digest = split_digest(digest)
+    return hash_hex(data, algorithm) == hex_digest
+
+
+def vector_bytes(vector: list[float]) -> bytes:
+    """A vector as little-endian float32 bytes."""
+    data = array("f", vector)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def vector_commitment(vector: list[float], algorithm: str = HASH_ALGORITHM) -> dict[str, Any]:
+    """
+    What a vector is replaced by in vector_digest mode: its dim, dtype and
+    byte digest, keyed by the digest's algorithm (e.g. {"sha256": hex}).
+    """
+    return {"dim": len(vector), "dtype": VECTOR_DTYPE, algorithm: hash_hex(vector_bytes(vector), algorithm)}
+
+
+def canonical_bytes_vector_digest(payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> bytes:
+    """
+    Canonical bytes hashed in vector_digest mode (see
+    hash_canonical_vector_digest), with the vector committed by algorithm.
+    """
+    tmp = {k: v for k, v in payload.items() if k != "integrity"}
+    embedding = dict(tmp["embedding"])
+    embedding["vector"] = vector_commitment(embedding["vector"], algorithm)
+    tmp["embedding"] = embedding
+    return jcs_canonical_bytes(tmp)
+
+
+def hash_canonical_vector_digest(payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> str:
+    """
+    Hash a chunk payload, excluding 'integrity', with its embedding vector
+    committed by vector_commitment (with the same algorithm).
+    
+    Only the short commitment goes through JSON, so no float is ever
+    formatted as decimal text. The vector is committed at float32
+    precision, which is what the embed worker produces.
+    """
+    return hash_hex(canonical_bytes_vector_digest(payload, algorithm), algorithm)
+
+
+def verify_integrity(payload: dict[str, Any]) -> bool:
+    """
+    Check a payload's integrity.sha256_canonical in the mode, and with
+    the hash algorithm, it names.
+    
+    In vector_digest mode the stored vector must also hold exact float32
+    values, so that its decimal text cannot be changed below float32
+    precision without failing verification.
+    """
+    integrity = payload.get("integrity") or {}
+    mode = integrity.get("mode", INTEGRITY_CANONICAL)
+    algorithm, expected = split_digest(integrity.get("sha256_canonical") or "")
+    if mode == INTEGRITY_CANONICAL:
+        digest = hash_canonical_without_integrity(payload, algorithm)
+    elif mode == INTEGRITY_VECTOR_DIGEST:
+        vector = payload["embedding"]["vector"]
+        if array("f", vector).tolist() != list(vector):
+            return False
+        digest = hash_canonical_vector_digest(payload, algorithm)
+    else:
+        raise ValueError(f"Unknown integrity mode: {mode}")
+    return digest == expected
+
+
+class CanonicalEncoder:
+    """
+    Canonical JSON encoder that caches the bytes of encoded subtrees.
+    
+    Produces the same bytes as jcs_canonical_bytes. Lists and dicts of
+    scalars (such as embedding vectors) whose encoding is at least
+    min_cached_size bytes are cached by identity, so when the same object
+    appears again (in a payload hashed for its integrity field and then
+    written to the ledger) its bytes are reused instead of re-serialized.
+    Enclosing containers are re-joined from their pieces each time, so
+    adding a field to a payload is always picked up. Hashing feeds the
+    digest piece by piece rather than joining the whole document first.
+    
+    Cached containers must not be modified in place while the encoder is
+    in use (a changed length is detected, a replaced item is not).
+    Encoders are not thread-safe; use one per task and drop it afterwards.
+    """
+    
+    def __init__(self, max_entries: int = 4096, min_cached_size: int = MIN_CACHED_SIZE):
+        self.max_entries = max_entries
+        self.min_cached_size = min_cached_size
+        # id -> (object, length, bytes); holding the object keeps its id from being reused
+        self._cache: OrderedDict[int, tuple[Any, int, bytes]] = OrderedDict()
+    
+    def encode(self, obj: Any) -> bytes:
+        """Canonical JSON bytes of obj."""
+        if isinstance(obj, dict):
+            if _SCALAR_TYPES.issuperset(map(type, obj.values())):
+                return self._encode_leaf(obj)
+            if not all(type(key) is str for key in obj):
+                return jcs_canonical_bytes(obj)
+            return b"".join(self._iter_dict(obj))
+        if isinstance(obj, (list, tuple)):
+            if _SCALAR_TYPES.issuperset(map(type, obj)):
+                return self._encode_leaf(obj)
+            return b"[" + b",".join(self.encode(v) for v in obj) + b"]"
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    
+    def _encode_leaf(self, obj: dict | list | tuple) -> bytes:
+        """Encode a container of scalars in one json.dumps call, through the cache."""
+        key = id(obj)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] is obj and cached[1] == len(obj):
+            self._cache.move_to_end(key)
+            return cached[2]
+        data = jcs_canonical_bytes(obj)
+        if len(data) >= self.min_cached_size:
+            self._cache[key] = (obj, len(obj), data)
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return data
+    
+    def _iter_dict(self, obj: dict[str, Any]):
+        """Yield the pieces of a dict's encoding: brace, key, value, ..., brace."""
+        yield b"{"
+        for i, key in enumerate(sorted(obj)):
+            prefix = b"," if i else b""
+            yield prefix + json.dumps(key, ensure_ascii=False).encode("utf-8") + b":"
+            yield self.encode(obj[key])
+        yield b"}"
+    
+    def update(self, digest: Any, obj: Any) -> None:
+        """Feed the canonical bytes of obj into a hashlib object."""
+        if (
+            isinstance(obj, dict)
+            and not _SCALAR_TYPES.issuperset(map(type, obj.values()))
+            and all(type(key) is str for key in obj)
+        ):
+            pieces = self._iter_dict(obj)
+        else:
+            pieces = [self.encode(obj)]
+        buffer = bytearray()
+        for piece in pieces:
+            if len(piece) >= HASH_CHUNK_SIZE:
+                if buffer:
+                    digest.update(buffer)
+                    buffer.clear()
+                digest.update(piece)
+            else:
+                buffer += piece
+                if len(buffer) >= HASH_CHUNK_SIZE:
+                    digest.update(buffer)
+                    buffer.clear()
+        if buffer:
+            digest.update(buffer)
+    
+    def hash(self, payload: Any, algorithm: str = HASH_ALGORITHM) -> str:
+        """Hex digest of the canonical bytes (as hash_canonical)."""
+        digest = new_hash(algorithm)
+        self.update(digest, payload)
+        return digest.hexdigest()
+    
+    def hash_without_integrity(self, payload: dict[str, Any], algorithm: str = HASH_ALGORITHM) -> str:
+        """Hex digest excluding the 'integrity' field (as hash_canonical_without_integrity)."""
+        return self.hash({k: v for k, v in payload.items() if k != "integrity"}, algorithm)
+    
+    def encode_without_integrity(self, payload: dict[str, Any]) -> bytes:
+        """Canonical bytes excluding the 'integrity' field (for hash_many)."""
+        return self.encode({k: v for k, v in payload.items() if k != "integrity"})
+    
+    def clear(self) -> None:
+        """Forget all cached subtrees."""
+        self._cache.clear()
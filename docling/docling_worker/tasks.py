@@ -14,8 +14,8 @@ from celery import Celery
 # Add parent directory for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.canonicalize import hash_canonical_without_integrity
-from common.normalize import normalize_text
+from common.canonicalize import HASH_ALGORITHM, CanonicalEncoder
+from common.normalize import CellNormalizer, normalize_stream, normalize_text
 from ledger import get_ledger
 
 
@@ -23,6 +23,11 @@ from ledger import get_ledger
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 DOCLING_VERSION = os.environ.get("DOCLING_VERSION", "2.0.0")  # Pin version
 
+# Text blocks longer than this are normalized in pieces of STREAM_PIECE_SIZE
+# characters, so only one piece's intermediate copies are alive at a time
+STREAM_NORMALIZE_MIN = 4 * 1024 * 1024
+STREAM_PIECE_SIZE = 1024 * 1024
+
 # Celery app
 celery_app = Celery("docling_worker", broker=REDIS_URL)
 celery_app.conf.update(
@@ -34,6 +39,14 @@ celery_app.conf.update(
 )
 
 
+def _normalize_block_text(text: str) -> str:
+    """normalize_text, streamed for very large blocks."""
+    if len(text) < STREAM_NORMALIZE_MIN:
+        return normalize_text(text)
+    pieces = (text[i:i + STREAM_PIECE_SIZE] for i in range(0, len(text), STREAM_PIECE_SIZE))
+    return "".join(normalize_stream(pieces))
+
+
 def compute_config_hash() -> str:
     """Compute hash of Docling configuration for reproducibility."""
     config = {
@@ -86,26 +99,23 @@ def parse_document(payload: dict) -> dict:
     # Simulated Docling output (replace with actual Docling call)
     raw_pages = _simulate_docling_parse(file_path)
     
-    # Normalize text content
+    # Normalize text content (table cells through a per-document cache)
+    cells = CellNormalizer()
     normalized_pages = []
     for page_idx, page in enumerate(raw_pages):
         normalized_blocks = []
         for block_idx, block in enumerate(page.get("blocks", [])):
             if block["type"] == "text":
-                normalized_text = normalize_text(block["text"])
+                normalized_text = _normalize_block_text(block["text"])
                 normalized_blocks.append({
                     "type": "text",
                     "text": normalized_text
                 })
             elif block["type"] == "table":
                 # Tables: normalize cell text
-                normalized_cells = [
-                    [normalize_text(cell) for cell in row]
-                    for row in block.get("cells", [])
-                ]
                 normalized_blocks.append({
                     "type": "table",
-                    "cells": normalized_cells
+                    "cells": cells.normalize_table(block.get("cells", []))
                 })
         
         normalized_pages.append({
@@ -113,6 +123,9 @@ def parse_document(payload: dict) -> dict:
             "blocks": normalized_blocks
         })
     
+    if cells.hits or cells.misses:
+        print(f"[docling-worker] Table cells: {cells.hits} cache hits, {cells.misses} misses")
+    
     # Build doc.normalized.v1 payload
     doc_payload = {
         "schema": "doc.normalized.v1",
@@ -142,15 +155,16 @@ def parse_document(payload: dict) -> dict:
         }
     }
     
-    # Compute integrity hash
-    canonical_hash = hash_canonical_without_integrity(doc_payload)
+    # Compute integrity hash (the encoder keeps the content's bytes for the ledger)
+    encoder = CanonicalEncoder()
+    canonical_hash = encoder.hash_without_integrity(doc_payload, HASH_ALGORITHM)
     doc_payload["integrity"] = {
-        "sha256_canonical": f"sha256:{canonical_hash}",
+        "sha256_canonical": f"{HASH_ALGORITHM}:{canonical_hash}",
         "prev_ledger_hash": prev_ledger_hash
     }
     
     # Append to ledger
-    ledger.append("doc.normalized.v1", doc_payload)
+    ledger.append("doc.normalized.v1", doc_payload, encoder)
     
     print(f"[docling-worker] Completed doc {doc_id}, hash: {canonical_hash[:16]}...")
     
@@ -6,18 +6,31 @@ Celery worker that chunks documents and generates embeddings using PyTorch.
 import hashlib
 import os
 import sys
+import time
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 import torch
 from sentence_transformers import SentenceTransformer
 
 # Add parent directory for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.canonicalize import hash_canonical, hash_canonical_without_integrity
-from common.normalize import l2_normalize
+from common.canonicalize import (
+    HASH_ALGORITHM,
+    INTEGRITY_CANONICAL,
+    INTEGRITY_VECTOR_DIGEST,
+    CanonicalEncoder,
+    canonical_bytes_vector_digest,
+    hash_canonical,
+    hash_many,
+    sha256_many,
+)
+from common.normalize import l2_normalize_
+from common.weights import WeightsHashCache, cached_weights_hash, model_files, share_model_memory
 from ledger import get_ledger
 
 
@@ -27,10 +40,24 @@ QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
 EMBEDDER_MODEL_ID = os.environ.get("EMBEDDER_MODEL_ID", "all-MiniLM-L6-v2")
 
+# Weights digests cached by model file paths, sizes and mtimes ("" disables)
+WEIGHTS_HASH_CACHE = os.environ.get(
+    "WEIGHTS_HASH_CACHE", str(Path.home() / ".cache" / "docling" / "weights_hashes.json")
+)
+
 # Chunker configuration
 CHUNK_MAX_TOKENS = 400
 CHUNK_OVERLAP = 60
 
+# "canonical" hashes vectors as JSON; "vector_digest" (opt-in) commits them by their float32 bytes
+CHUNK_INTEGRITY_MODE = os.environ.get("CHUNK_INTEGRITY_MODE", INTEGRITY_CANONICAL)
+
+# "1": load the model in the worker's parent process before the prefork pool
+# starts, so children share its weights. The weights then live in /dev/shm,
+# which must be larger than the model (Docker's default is 64 MB; set
+# shm_size). Off by default: each child loads its own copy on first use.
+EMBEDDER_PRELOAD = os.environ.get("EMBEDDER_PRELOAD", "0") == "1"
+
 # Celery app
 celery_app = Celery("embed_worker", broker=REDIS_URL)
 celery_app.conf.update(
@@ -41,31 +68,74 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
-# Global model (lazy loaded)
+# Global model (preloaded in the parent, or lazy loaded)
 _model: SentenceTransformer | None = None
 _weights_hash: str | None = None
 
 
+def _model_dir() -> Path | None:
+    """Local directory holding EMBEDDER_MODEL_ID's files, if it can be found."""
+    if Path(EMBEDDER_MODEL_ID).is_dir():
+        return Path(EMBEDDER_MODEL_ID)
+    
+    from huggingface_hub import snapshot_download
+    repo_id = EMBEDDER_MODEL_ID if "/" in EMBEDDER_MODEL_ID else f"sentence-transformers/{EMBEDDER_MODEL_ID}"
+    try:
+        return Path(snapshot_download(repo_id, local_files_only=True))
+    except Exception:
+        return None
+
+
 def get_model() -> tuple[SentenceTransformer, str]:
     """Get or load the embedding model with weights hash."""
     global _model, _weights_hash
     
     if _model is None:
         print(f"[embed-worker] Loading model: {EMBEDDER_MODEL_ID}")
+        start = time.perf_counter()
         _model = SentenceTransformer(EMBEDDER_MODEL_ID)
+        loaded = time.perf_counter()
         
-        # Compute weights hash for reproducibility
-        state_dict = _model.state_dict()
-        weights_bytes = b""
-        for key in sorted(state_dict.keys()):
-            weights_bytes += state_dict[key].cpu().numpy().tobytes()
-        _weights_hash = hashlib.sha256(weights_bytes).hexdigest()
+        # Compute weights hash for reproducibility (streamed over the
+        # tensors, or read back from the cache for unchanged model files)
+        model_dir = _model_dir()
+        cache = WeightsHashCache(WEIGHTS_HASH_CACHE) if WEIGHTS_HASH_CACHE else None
+        _weights_hash, cached = cached_weights_hash(
+            _model.state_dict(), model_files(model_dir) if model_dir else None, cache, HASH_ALGORITHM
+        )
+        hashed = time.perf_counter()
         
-        print(f"[embed-worker] Model loaded, weights hash: {_weights_hash[:16]}...")
+        print(
+            f"[embed-worker] Model loaded in {loaded - start:.2f}s, weights hash "
+            f"{'from cache' if cached else 'computed'} in {hashed - loaded:.2f}s: {_weights_hash[:16]}..."
+        )
     
     return _model, _weights_hash
 
 
+@worker_init.connect
+def preload_model(**kwargs):
+    """
+    Load the model in the worker's parent process, before the pool forks.
+    
+    Its tensors are moved to shared memory, so every prefork child (and
+    every child that replaces one) maps the same weights instead of
+    loading a copy, and a child's first task does not wait on a load.
+    """
+    if not EMBEDDER_PRELOAD:
+        return
+    model, _ = get_model()
+    share_model_memory(model)
+    print(f"[embed-worker] Model preloaded in parent {os.getpid()}, weights in shared memory")
+
+
+@worker_process_init.connect
+def report_shared_model(**kwargs):
+    """Log whether a new pool child inherited the parent's model."""
+    if _model is not None:
+        print(f"[embed-worker] Child {os.getpid()} sharing preloaded model")
+
+
 def chunk_document(doc_payload: dict) -> list[dict]:
     """
     Chunk a document into text segments.
@@ -135,25 +205,27 @@ def embed_document(payload: dict) -> list[dict]:
         print(f"[embed-worker] No text chunks to embed")
         return []
     
-    # Encode with PyTorch
-    with torch.no_grad():
+    # Encode with PyTorch (inference mode lets the output be normalized in place)
+    with torch.inference_mode():
         embeddings = model.encode(chunk_texts, convert_to_tensor=True)
-        embeddings = l2_normalize(embeddings)
+        l2_normalize_(embeddings)
     
-    # Build chunk.embedding.v1 payloads
+    # Build chunk.embedding.v1 payloads (chained onto the head at batch start);
+    # the encoder serializes each vector once across the integrity hash and the ledger
+    encoder = CanonicalEncoder()
     results = []
+    prev_ledger_hash = ledger.get_prev_hash()
     
-    for chunk, embedding in zip(chunks, embeddings):
-        prev_ledger_hash = ledger.get_prev_hash()
-        
-        # Compute chunk_id
-        chunk_content_hash = hashlib.sha256(chunk["text"].encode()).hexdigest()
-        chunk_id = f"sha256:{chunk_content_hash}"
-        
+    # Compute chunk_ids (hashed as a batch). They identify chunks (and their
+    # Qdrant points) rather than protect them, so they stay SHA-256 whatever
+    # HASH_ALGORITHM is
+    chunk_hashes = sha256_many([c["text"].encode() for c in chunks])
+    
+    for chunk, chunk_hash, embedding in zip(chunks, chunk_hashes, embeddings):
         chunk_payload = {
             "schema": "chunk.embedding.v1",
             "doc_id": doc_id,
-            "chunk_id": chunk_id,
+            "chunk_id": f"sha256:{chunk_hash}",
             "chunker": {
                 "version": "chunk.v1",
                 "method": "block+window",
@@ -162,7 +234,7 @@ def embed_document(payload: dict) -> list[dict]:
             "embedding": {
                 "framework": "pytorch",
                 "model_id": EMBEDDER_MODEL_ID,
-                "weights_hash": f"sha256:{weights_hash}",
+                "weights_hash": f"{HASH_ALGORITHM}:{weights_hash}",
                 "dim": embedding.shape[-1],
                 "normalization": "l2",
                 "vector": embedding.tolist()
@@ -171,25 +243,30 @@ def embed_document(payload: dict) -> list[dict]:
                 "source_block_refs": chunk["source_block_refs"]
             }
         }
-        
-        # Compute integrity
-        canonical_hash = hash_canonical_without_integrity(chunk_payload)
+        results.append(chunk_payload)
+    
+    # Compute integrity (hashed as a batch)
+    if CHUNK_INTEGRITY_MODE == INTEGRITY_VECTOR_DIGEST:
+        encode = partial(canonical_bytes_vector_digest, algorithm=HASH_ALGORITHM)
+    else:
+        encode = encoder.encode_without_integrity
+    for chunk_payload, canonical_hash in zip(results, hash_many(results, HASH_ALGORITHM, encode)):
         chunk_payload["integrity"] = {
-            "sha256_canonical": f"sha256:{canonical_hash}",
-            "prev_ledger_hash": prev_ledger_hash
+            "sha256_canonical": f"{HASH_ALGORITHM}:{canonical_hash}",
+            "prev_ledger_hash": prev_ledger_hash,
+            "mode": CHUNK_INTEGRITY_MODE
         }
-        
-        # Append to ledger
-        ledger.append("chunk.embedding.v1", chunk_payload)
-        
-        # Store in Qdrant
-        _store_in_qdrant(chunk_id, embedding.tolist(), {
+    
+    # Append the whole document to the ledger as one group commit
+    ledger.append_many((("chunk.embedding.v1", p) for p in results), encoder)
+    
+    # Store in Qdrant
+    for chunk, chunk_payload in zip(chunks, results):
+        _store_in_qdrant(chunk_payload["chunk_id"], chunk_payload["embedding"]["vector"], {
             "doc_id": doc_id,
-            "chunk_id": chunk_id,
+            "chunk_id": chunk_payload["chunk_id"],
             "text": chunk["text"][:500]  # Store truncated text for retrieval
         })
-        
-        results.append(chunk_payload)
     
     print(f"[embed-worker] Completed {len(results)} embeddings for doc {doc_id}")
     return results
@@ -1,4 +1,6 @@
 # Ledger package
 from .ledger import Ledger, get_ledger
+from .daemon import LedgerClient, LedgerDaemon
+from .merkle import verify_inclusion
 
-__all__ = ["Ledger", "get_ledger"]
+__all__ = ["Ledger", "LedgerClient", "LedgerDaemon", "get_ledger", "verify_inclusion"]
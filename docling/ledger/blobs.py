@@ -0,0 +1,61 @@
+"""
+Content-Addressed Blob Store for large ledger payloads.
+
+Payloads over the ledger's blob threshold are stored once under the
+digest of their canonical bytes and the entry keeps a small stub with the
+digest, so the entry hash still commits to the payload. Blobs are checked
+against their digest, with the algorithm it names, when read.
+"""
+import os
+import threading
+from pathlib import Path
+
+from ..common.canonicalize import HASH_ALGORITHM, prefixed_digest, split_digest, verify_digest
+
+
+# Stub payload key holding the blob digest ("sha256:<hex>" or "blake2b:<hex>")
+BLOB_KEY = "$blob"
+
+
+class BlobStore:
+    """
+    Directory of blobs named by their digest (two-character fan-out).
+    """
+
+    def __init__(self, directory: str | Path, hash_algorithm: str = HASH_ALGORITHM):
+        self.directory = Path(directory)
+        self.hash_algorithm = hash_algorithm
+
+    def _path(self, digest: str) -> Path:
+        _, hex_digest = split_digest(digest)
+        return self.directory / hex_digest[:2] / hex_digest[2:]
+
+    def put(self, data: bytes, fsync: bool = False) -> str:
+        """
+        Store data and return its digest. Existing blobs are not rewritten.
+
+        Args:
+            data: Blob content
+            fsync: fsync the blob before returning
+        """
+        digest = prefixed_digest(data, self.hash_algorithm)
+        path = self._path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Read a blob, checking it against its digest."""
+        data = self._path(digest).read_bytes()
+        if not verify_digest(data, digest):
+            raise ValueError(f"Blob {digest} does not match its digest")
+        return data
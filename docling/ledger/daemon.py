@@ -0,0 +1,290 @@
+"""
+Single-Writer Ledger Daemon.
+
+Worker processes (e.g. Celery prefork children) cannot share one Ledger
+instance, and separate instances each chain onto their own stale head. The
+daemon owns the only Ledger and serves appends over a Unix socket. Requests
+that arrive while a batch is being written are chained and written together
+as the next batch (one write and one flush or fsync for all of them).
+Clients send payloads already canonicalized. The daemon parses each one,
+rejects the request unless it re-encodes to the same bytes, and derives
+its lookup keys itself, so a client cannot write arbitrary bytes or keys
+into the ledger.
+
+Protocol: a JSON header line per request, one JSON line per response.
+    {"op": "append", "events": [[event_type, length], ...]}
+    followed by the canonical payload bytes of each event, back to back
+        -> {"entries": [{"seq", "entry_hash", "prev_hash", "timestamp"}, ...]}
+    {"op": "head"} -> {"seq": next seq, "entry_hash": head hash}
+Failures are returned as {"error": message}.
+
+Usage:
+    python -m docling.ledger.daemon --socket /run/ledger.sock [--path ledger.jsonl]
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from ..common.canonicalize import CanonicalEncoder, jcs_canonical_bytes
+from .index import index_keys
+from .ledger import Ledger
+
+
+# Most events written in one batch
+MAX_BATCH = 1000
+
+# Longest request header line accepted (the events list of a large batch)
+MAX_HEADER_BYTES = 16 * 1024 * 1024
+
+
+def _bad_request(reason: Any) -> dict[str, Any]:
+    """
+    Error response for a request that cannot be framed.
+
+    The payload bytes it declared (if any) cannot be trusted, so the
+    connection is closed after replying ("close") instead of reading
+    the next header from the middle of a payload.
+    """
+    return {"error": f"Bad request: {reason}", "close": True}
+
+
+class _Request:
+    """Events from one client request awaiting the writer."""
+
+    def __init__(self, events: list[tuple[str, bytes, dict[str, str]]]):
+        self.events = events
+        self.done = threading.Event()
+        self.response: dict[str, Any] = {}
+
+
+class LedgerDaemon:
+    """
+    Unix socket server in front of a single Ledger writer thread.
+    """
+
+    def __init__(self, ledger: Ledger, socket_path: str | Path, max_batch: int = MAX_BATCH):
+        self.ledger = ledger
+        self.socket_path = Path(socket_path)
+        self.max_batch = max_batch
+        self._queue: queue.Queue[_Request | None] = queue.Queue()
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()  # Stale socket from a previous run
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline(MAX_HEADER_BYTES + 1)
+                    if not line:
+                        return
+                    if len(line) > MAX_HEADER_BYTES:
+                        response = _bad_request(f"header longer than {MAX_HEADER_BYTES} bytes")
+                    else:
+                        response = daemon._handle(line, self.rfile)
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                    if response.get("close"):
+                        return  # Payload bytes of unknown length may follow: drop the connection
+
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        self._server.daemon_threads = True
+        self._writer = threading.Thread(target=self._writer_loop, name="ledger-daemon-writer", daemon=True)
+        self._writer.start()
+
+    def _handle(self, line: bytes, rfile) -> dict[str, Any]:
+        try:
+            request = json.loads(line)
+            if request.get("op") == "head":
+                return {"seq": len(self.ledger), "entry_hash": self.ledger.get_prev_hash()}
+            if request.get("op") != "append":
+                return _bad_request(f"Unknown op: {request.get('op')}")
+            headers = [(event_type, length) for event_type, length in request["events"]]
+            if not all(isinstance(t, str) and isinstance(n, int) and n >= 0 for t, n in headers):
+                raise TypeError("events must be [event_type, length] pairs")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return _bad_request(e)
+        
+        payloads = []
+        for event_type, length in headers:
+            data = rfile.read(length)
+            if len(data) != length:
+                return _bad_request("truncated payload")
+            payloads.append((event_type, data))
+        
+        # The request was framed correctly, so the connection stays usable
+        events = []
+        for i, (event_type, data) in enumerate(payloads):
+            try:
+                payload = json.loads(data)
+            except ValueError as e:
+                return {"error": f"Payload {i} is not JSON: {e}"}
+            if not isinstance(payload, dict) or jcs_canonical_bytes(payload) != data:
+                return {"error": f"Payload {i} is not a canonical JSON object"}
+            events.append((event_type, data, index_keys(payload)))
+
+        pending = _Request(events)
+        self._queue.put(pending)
+        pending.done.wait()
+        return pending.response
+
+    def _writer_loop(self) -> None:
+        """Drain queued requests into batches; the only thread that appends."""
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            size = len(request.events)
+            while size < self.max_batch:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)  # Stop after this batch
+                    break
+                batch.append(request)
+                size += len(request.events)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list[_Request]) -> None:
+        try:
+            seq = len(self.ledger)
+            entries = self.ledger.append_canonical(e for request in batch for e in request.events)
+        except Exception as e:
+            for request in batch:
+                request.response = {"error": f"Append failed: {e}"}
+                request.done.set()
+            return
+
+        receipts = [
+            {
+                "seq": seq + i,
+                "entry_hash": entry["entry_hash"],
+                "prev_hash": entry["prev_hash"],
+                "timestamp": entry["timestamp"],
+            }
+            for i, entry in enumerate(entries)
+        ]
+        start = 0
+        for request in batch:
+            end = start + len(request.events)
+            request.response = {"entries": receipts[start:end]}
+            request.done.set()
+            start = end
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        """Stop serving, finish queued appends and close the ledger."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._queue.put(None)
+        self._writer.join()
+        self.ledger.close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class LedgerClient:
+    """
+    Ledger stand-in that appends through a LedgerDaemon.
+
+    append() and append_many() return receipts (seq, entry_hash,
+    prev_hash, timestamp) rather than full entries. The connection is
+    reopened after a fork, so a client created before forking is safe.
+    """
+
+    def __init__(self, socket_path: str | Path):
+        self.socket_path = str(socket_path)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._sock: socket.socket | None = None
+        self._file = None
+
+    def _call(self, request: dict[str, Any], body: bytes = b"") -> dict[str, Any]:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._sock.connect(self.socket_path)
+                self._file = self._sock.makefile("rwb")
+                self._pid = os.getpid()
+            self._file.write(json.dumps(request).encode("utf-8") + b"\n" + body)
+            self._file.flush()
+            line = self._file.readline()
+            if not line:
+                self._pid = None  # Reconnect on the next call
+                raise ConnectionError("Ledger daemon closed the connection")
+            response = json.loads(line)
+            if response.get("close"):
+                self._file.close()
+                self._sock.close()
+                self._sock = self._file = None
+                self._pid = None  # The daemon dropped the connection; reconnect on the next call
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+    def append(
+        self, event_type: str, payload: dict[str, Any], encoder: CanonicalEncoder | None = None
+    ) -> dict[str, Any]:
+        """Append an entry; returns its receipt."""
+        return self.append_many([(event_type, payload)], encoder)[0]
+
+    def append_many(
+        self, events: Iterable[tuple[str, dict[str, Any]]], encoder: CanonicalEncoder | None = None
+    ) -> list[dict[str, Any]]:
+        """Append a batch of entries, chained in order; returns their receipts."""
+        headers = []
+        body = []
+        for event_type, payload in events:
+            data = encoder.encode(payload) if encoder is not None else jcs_canonical_bytes(payload)
+            headers.append([event_type, len(data)])
+            body.append(data)
+        if not headers:
+            return []
+        return self._call({"op": "append", "events": headers}, b"".join(body))["entries"]
+
+    def get_prev_hash(self) -> str | None:
+        """Get the hash of the last entry."""
+        return self._call({"op": "head"})["entry_hash"]
+
+    def __len__(self) -> int:
+        return self._call({"op": "head"})["seq"]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sock is not None and self._pid == os.getpid():
+                self._file.close()
+                self._sock.close()
+            self._sock = self._file = None
+            self._pid = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-writer ledger daemon")
+    parser.add_argument("--socket", default=os.environ.get("LEDGER_SOCKET", "./data/ledger.sock"))
+    parser.add_argument("--path", default=None, help="Ledger file (default: LEDGER_PATH)")
+    args = parser.parse_args()
+
+    # Ledger options (durability, index, segments, ...) come from the environment
+    from .ledger import get_ledger
+    daemon = LedgerDaemon(get_ledger(args.path, local=True), args.socket)
+    print(f"[ledger-daemon] Serving {daemon.ledger.path} on {daemon.socket_path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
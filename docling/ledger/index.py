@@ -0,0 +1,112 @@
+"""
+Ledger Offset Index.
+
+SQLite sidecar mapping each entry's seq and lookup keys (doc_id,
+chunk_id, bundle_id) to its byte offset in the ledger, so a lookup is a
+single seek and read. The index is derived data: it can always be
+rebuilt from the ledger, so it is written without fsync.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+
+# Payload fields indexed for lookups
+INDEX_KEYS = ("doc_id", "chunk_id", "bundle_id")
+
+
+def index_keys(payload: Any) -> dict[str, str]:
+    """Extract the indexed lookup keys present in a payload."""
+    if not isinstance(payload, dict):
+        return {}
+    return {key: payload[key] for key in INDEX_KEYS if isinstance(payload.get(key), str)}
+
+
+class LedgerIndex:
+    """
+    seq -> (offset, length) and key -> seq index for a JSONL ledger.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                seq INTEGER PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS keys (
+                name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                PRIMARY KEY (name, value, seq)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def last(self) -> tuple[int, int] | None:
+        """(seq, end offset) of the last indexed entry, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, offset + length FROM entries ORDER BY seq DESC LIMIT 1"
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def add(self, rows: Iterable[tuple[int, int, int, dict[str, str]]]) -> None:
+        """
+        Index entries and commit.
+
+        Args:
+            rows: (seq, offset, length, lookup keys) per entry
+        """
+        with self._lock, self._conn:
+            for seq, offset, length, keys in rows:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (seq, offset, length)
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO keys VALUES (?, ?, ?)",
+                    [(name, value, seq) for name, value in keys.items()],
+                )
+
+    def locate(self, seq: int) -> tuple[int, int] | None:
+        """(offset, length) of the entry with the given seq."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset, length FROM entries WHERE seq = ?", (seq,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def find(self, limit: int | None = None, **keys: str) -> list[int]:
+        """Seqs of entries matching all given keys, in ledger order."""
+        unknown = set(keys) - set(INDEX_KEYS)
+        if unknown:
+            raise ValueError(f"Not an indexed key: {', '.join(sorted(unknown))}")
+        if not keys:
+            raise ValueError("At least one key is required")
+
+        query = " INTERSECT ".join(
+            "SELECT seq FROM keys WHERE name = ? AND value = ?" for _ in keys
+        ) + " ORDER BY seq"
+        params = [item for pair in keys.items() for item in pair]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def truncate(self, seq: int) -> None:
+        """Drop entries at or after seq (ledger shorter than the index)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE seq >= ?", (seq,))
+            self._conn.execute("DELETE FROM keys WHERE seq >= ?", (seq,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -3,14 +3,91 @@ Append-only JSONL Ledger with Hash-Chain.
 
 Provides cryptographic integrity for all pipeline operations.
 """
+import atexit
 import json
 import os
 import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
-from ..common.canonicalize import hash_canonical, jcs_canonical_bytes
+from ..common.canonicalize import (
+    HASH_ALGORITHM,
+    CanonicalEncoder,
+    hash_canonical_as,
+    jcs_canonical_bytes,
+    new_hash,
+)
+from .blobs import BLOB_KEY, BlobStore
+from .index import LedgerIndex, index_keys
+from .merkle import MerkleAccumulator, leaf_hash
+from .parallel import PARALLEL_MIN_BYTES, stitch, verify_parallel
+from .segments import SegmentStore, verify_segment
+
+if TYPE_CHECKING:
+    from .daemon import LedgerClient
+
+
+# Entries between checkpoint sidecar updates
+CHECKPOINT_INTERVAL = 1000
+
+# Block size used when seeking backwards from EOF
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# (event_type, payload, canonical bytes up to prev_hash, hash state over them)
+PreparedEntry = tuple[str, dict[str, Any], bytes, Any]
+
+# Durability modes for appends:
+# - flush: hand every append to the OS before returning
+# - fsync: flush and fsync every append before returning
+# - group: buffer appends; a background thread flushes and fsyncs them
+#   on the configured intervals (group commit)
+DURABILITY_MODES = ("flush", "fsync", "group")
+
+
+def _json_bytes(value: Any) -> bytes:
+    """Canonical JSON bytes of a scalar (matches jcs_canonical_bytes)."""
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def read_tail_line(path: str | Path, end: int | None = None) -> tuple[int, bytes] | None:
+    """
+    Read the last non-empty line of a file by seeking backwards.
+    
+    Args:
+        path: File to read
+        end: Treat the file as ending at this byte offset (default: EOF)
+        
+    Returns:
+        (byte offset of the line, line bytes including newline) or None
+    """
+    with open(path, "rb") as f:
+        if end is None:
+            end = f.seek(0, os.SEEK_END)
+        
+        pos = end
+        buf = b""
+        while pos > 0:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            
+            content_end = len(buf.rstrip())
+            if content_end == 0:
+                continue  # Only trailing blank lines so far
+            
+            newline = buf.rfind(b"\n", 0, content_end)
+            if newline < 0 and pos > 0:
+                continue  # Line starts before the buffer
+            
+            line = buf[newline + 1:content_end]
+            if buf[content_end:content_end + 1] == b"\n":
+                line += b"\n"
+            return pos + newline + 1, line
+    return None
 
 
 class Ledger:
@@ -25,89 +102,761 @@ class Ledger:
     - entry_hash (hash of this entry)
     """
     
-    def __init__(self, path: str | Path):
+    def __init__(
+        self,
+        path: str | Path,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        durability: str = "flush",
+        flush_interval: float = 0.05,
+        fsync_interval: float | None = 1.0,
+        index: bool = True,
+        merkle: bool = False,
+        segment_max_bytes: int | None = None,
+        segment_max_entries: int | None = None,
+        blob_threshold: int | None = None,
+        hash_algorithm: str | None = None,
+    ):
+        """
+        Args:
+            path: Ledger JSONL file
+            checkpoint_interval: Entries between checkpoint sidecar updates
+            durability: One of DURABILITY_MODES
+            flush_interval: Seconds between group-commit flushes
+            fsync_interval: Seconds between group-commit fsyncs (None: never)
+            index: Maintain the offset index sidecar for get() / find()
+            merkle: Maintain a Merkle tree over entry hashes for inclusion proofs
+            segment_max_bytes: Seal the active file into a compressed segment
+                once it reaches this size (None: no size limit)
+            segment_max_entries: Seal the active file once it holds this
+                many entries (None: no entry limit)
+            blob_threshold: Store payloads whose canonical form is larger
+                than this many bytes in the blob store (None: always inline)
+            hash_algorithm: Algorithm for new entry hashes (default:
+                HASH_ALGORITHM). SHA-256 hashes are bare hex, as they always
+                were; others are prefixed ("blake2b:<hex>"). Existing
+                entries are verified with the algorithm they name.
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.hash_algorithm = hash_algorithm or HASH_ALGORITHM
+        new_hash(self.hash_algorithm)  # Reject unknown algorithms up front
+        
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = self.path.with_name(self.path.name + ".head")
+        self.verify_checkpoint_path = self.path.with_name(self.path.name + ".verified")
+        self.checkpoint_interval = checkpoint_interval
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_entries = segment_max_entries
+        self.blob_threshold = blob_threshold
+        self.blobs = BlobStore(self.path.with_name(self.path.name + ".blobs"), self.hash_algorithm)
         self._lock = threading.Lock()
+        
+        # Sealed history; the active file holds entries from _base_seq on
+        self._segments = SegmentStore(self.path.with_name(self.path.name + ".segments"))
+        self._base_seq = self._segments.next_seq
+        self._seq = self._base_seq  # Number of entries (seq of the next entry)
+        self._offset = 0  # Byte offset of the end of the last entry in the active file
+        
+        # Persistent append handle, opened on first write
+        self._file = None
         self._prev_hash: str | None = self._load_last_hash()
+        
+        self._index: LedgerIndex | None = None
+        if index:
+            self._index = LedgerIndex(self.path.with_name(self.path.name + ".index"))
+            self._sync_index()
+        
+        self._merkle: MerkleAccumulator | None = None
+        if merkle:
+            self._merkle = MerkleAccumulator(self.path.with_name(self.path.name + ".merkle"))
+            self._sync_merkle()
+        
+        self._closed = threading.Event()
+        self._committer: threading.Thread | None = None
+        if durability == "group":
+            self._committer = threading.Thread(
+                target=self._group_commit_loop, name="ledger-group-commit", daemon=True
+            )
+            self._committer.start()
+    
+    def __len__(self) -> int:
+        """Number of entries in the ledger."""
+        with self._lock:
+            return self._seq
     
     def _load_last_hash(self) -> str | None:
-        """Load the hash of the last entry, if any."""
+        """
+        Load the hash of the last entry, if any.
+        
+        The head hash is read by seeking backwards from EOF. The entry
+        count resumes from the checkpoint sidecar when it still matches
+        the ledger, so only entries appended after the checkpoint are
+        counted; otherwise the whole file is counted once and a fresh
+        checkpoint is written for the next start. An empty active file
+        continues from the head of the last sealed segment.
+        """
         if not self.path.exists():
-            return None
+            return self._segments.head_hash
+        self._drop_sealed_copy()
+        
+        tail = read_tail_line(self.path)
+        if tail is None:
+            self._offset = self.path.stat().st_size
+            return self._segments.head_hash
+        
+        checkpoint = self._read_checkpoint()
+        if checkpoint is not None:
+            self._seq = checkpoint["seq"] + 1
+            self._offset = checkpoint["offset"]
         
-        last_line = None
-        with open(self.path, "r", encoding="utf-8") as f:
+        # Count entries written after the checkpoint (no JSON parsing)
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
             for line in f:
+                self._offset += len(line)
                 if line.strip():
-                    last_line = line
+                    self._seq += 1
         
-        if last_line:
-            try:
-                entry = json.loads(last_line)
-                return entry.get("entry_hash")
-            except json.JSONDecodeError:
+        try:
+            prev_hash = json.loads(tail[1]).get("entry_hash")
+        except json.JSONDecodeError:
+            return None
+        
+        if checkpoint is None or checkpoint["seq"] + 1 != self._seq:
+            self._write_checkpoint(prev_hash)
+        return prev_hash
+    
+    def _drop_sealed_copy(self) -> None:
+        """
+        Empty the active file if it was sealed but not reset (crash in rotation).
+        
+        The active file is the sealed copy if its first entry links to the
+        same prev_hash as the last sealed segment.
+        """
+        if not self._segments.segments:
+            return
+        with open(self.path, "rb") as f:
+            first = next((line for line in f if line.strip()), None)
+        if first is None:
+            return
+        try:
+            prev_hash = json.loads(first).get("prev_hash")
+        except ValueError:
+            return
+        if prev_hash == self._segments.segments[-1]["prev_hash"]:
+            self._reset_active()
+    
+    def _reset_active(self) -> None:
+        """Atomically replace the active file with an empty one."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_bytes(b"")
+        os.replace(tmp_path, self.path)
+        self.checkpoint_path.unlink(missing_ok=True)
+    
+    def _read_checkpoint(self) -> dict[str, Any] | None:
+        """
+        Load the checkpoint sidecar and validate it against the ledger.
+        
+        The checkpoint is trusted only if the entry ending at its offset
+        still carries its head hash.
+        """
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_bytes())
+            seq = int(checkpoint["seq"])
+            offset = int(checkpoint["offset"])
+            head_hash = checkpoint["head_hash"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        
+        if seq < self._base_seq or offset <= 0 or offset > self.path.stat().st_size:
+            return None
+        
+        tail = read_tail_line(self.path, end=offset)
+        if tail is None or tail[0] + len(tail[1]) != offset:
+            return None
+        try:
+            if json.loads(tail[1]).get("entry_hash") != head_hash:
                 return None
-        return None
+        except json.JSONDecodeError:
+            return None
+        return {"seq": seq, "offset": offset, "head_hash": head_hash}
+    
+    def _write_checkpoint(self, head_hash: str | None) -> None:
+        """Atomically persist (head hash, seq, byte offset) to the sidecar."""
+        if self._file is not None:
+            self._file.flush()  # Never checkpoint past what the OS has seen
+        checkpoint = {
+            "seq": self._seq - 1,
+            "offset": self._offset,
+            "head_hash": head_hash,
+        }
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp_path.write_bytes(jcs_canonical_bytes(checkpoint))
+        os.replace(tmp_path, self.checkpoint_path)
     
-    def append(self, event_type: str, payload: dict[str, Any]) -> dict[str, Any]:
+    def _prepare_entry(
+        self, event_type: str, payload: dict[str, Any], data: bytes | None = None
+    ) -> PreparedEntry:
+        """
+        Canonicalize an event and start its entry hash, without the lock.
+        
+        Canonical entries sort their keys as entry_hash, event_type,
+        payload, prev_hash, timestamp, so everything before prev_hash can
+        be serialized and hashed before the entry is chained.
+        
+        Args:
+            event_type: Type of event
+            payload: Event payload (or only its lookup keys if data is given)
+            data: The payload's canonical bytes, if already serialized
+        """
+        if data is None:
+            data = jcs_canonical_bytes(payload)
+        payload, data = self._store_payload(payload, data)
+        head = b'{"event_type":' + _json_bytes(event_type) + b',"payload":' + data + b',"prev_hash":'
+        digest = new_hash(self.hash_algorithm)
+        digest.update(head)
+        return event_type, payload, head, digest
+    
+    def _build_entry(
+        self, prepared: PreparedEntry, prev_hash: str | None
+    ) -> tuple[dict[str, Any], bytes]:
+        """
+        Chain a prepared entry onto prev_hash and serialize its line.
+        
+        Only prev_hash and the timestamp are hashed here; the line is
+        byte-identical to jcs_canonical_bytes(entry).
+        """
+        event_type, payload, head, digest = prepared
+        timestamp = datetime.now(timezone.utc).isoformat()
+        tail = _json_bytes(prev_hash) + b',"timestamp":' + _json_bytes(timestamp) + b"}"
+        digest.update(tail)
+        entry_hash = digest.hexdigest()
+        if self.hash_algorithm != "sha256":
+            entry_hash = f"{self.hash_algorithm}:{entry_hash}"
+        
+        entry = {
+            "timestamp": timestamp,
+            "event_type": event_type,
+            "payload": payload,
+            "prev_hash": prev_hash,
+            "entry_hash": entry_hash,
+        }
+        line = b'{"entry_hash":"' + entry_hash.encode("ascii") + b'",' + head[1:] + tail + b"\n"
+        return entry, line
+    
+    def _sync_index(self) -> None:
+        """Bring the offset index up to date with the ledger."""
+        last = self._index.last()
+        seq, offset = (last[0] + 1, last[1]) if last else (0, 0)
+        
+        # Rebuild if the last indexed entry no longer lines up with the
+        # active file (sealed segments never change)
+        if last is not None and (last[0] >= self._base_seq or last[0] >= self._seq):
+            tail = None
+            if seq <= self._seq and offset <= self._offset:
+                tail = read_tail_line(self.path, end=offset)
+            if tail is None or tail[0] != self._index.locate(last[0])[0]:
+                self._index.truncate(0)
+                seq, offset = 0, 0
+        if seq == self._seq:
+            return
+        
+        rows = []
+        for seq, offset, line in self._iter_lines(seq, offset if seq > self._base_seq else None):
+            try:
+                keys = index_keys(json.loads(line).get("payload"))
+            except ValueError:
+                keys = {}
+            rows.append((seq, offset, len(line), keys))
+            if len(rows) >= 10_000:
+                self._index.add(rows)
+                rows = []
+        self._index.add(rows)
+    
+    def _sync_merkle(self) -> None:
+        """Bring the Merkle tree up to date with the ledger file."""
+        size = self._merkle.size
+        if size > self._seq:
+            self._merkle.truncate(0)
+        elif size:
+            last = self.get(size - 1, resolve=False) or {}
+            if leaf_hash(last.get("entry_hash") or "") != self._merkle.leaf(size - 1):
+                self._merkle.truncate(0)
+        
+        batch = []
+        for entry in self.iter_entries(self._merkle.size, resolve=False):
+            batch.append(entry.get("entry_hash") or "")
+            if len(batch) >= 10_000:
+                self._merkle.append(batch)
+                batch = []
+        self._merkle.append(batch)
+        self._merkle.flush()
+    
+    def _store_payload(self, payload: dict[str, Any], data: bytes) -> tuple[dict[str, Any], bytes]:
+        """
+        Move a payload over the blob threshold into the blob store.
+        
+        Returns the payload and its canonical bytes, or a stub with the blob
+        digest and the payload's indexed lookup keys and the stub's bytes.
+        """
+        if self.blob_threshold is None or len(data) <= self.blob_threshold:
+            return payload, data
+        digest = self.blobs.put(data, fsync=self.durability == "fsync")
+        stub = {BLOB_KEY: digest, "size": len(data), **index_keys(payload)}
+        return stub, jcs_canonical_bytes(stub)
+    
+    def resolve(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """Rehydrate an entry whose payload was moved to the blob store."""
+        payload = entry.get("payload")
+        if not isinstance(payload, dict) or BLOB_KEY not in payload:
+            return entry
+        return {**entry, "payload": json.loads(self.blobs.get(payload[BLOB_KEY]))}
+    
+    def _write(self, entries: list[dict[str, Any]], lines: list[bytes]) -> None:
+        """Write chained lines and advance the head. Caller holds the lock."""
+        if self._closed.is_set():
+            raise ValueError("Ledger is closed")
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        
+        data = b"".join(lines)
+        self._file.write(data)
+        if self.durability != "group":
+            self._file.flush()
+            if self.durability == "fsync":
+                os.fsync(self._file.fileno())
+        
+        if self._index is not None:
+            rows = []
+            offset = self._offset
+            for seq, (entry, line) in enumerate(zip(entries, lines), self._seq):
+                rows.append((seq, offset, len(line), index_keys(entry["payload"])))
+                offset += len(line)
+            self._index.add(rows)
+        if self._merkle is not None:
+            self._merkle.append([entry["entry_hash"] for entry in entries])
+        
+        prev_seq = self._seq
+        self._prev_hash = entries[-1]["entry_hash"]
+        self._seq += len(lines)
+        self._offset += len(data)
+        if prev_seq // self.checkpoint_interval != self._seq // self.checkpoint_interval:
+            self._write_checkpoint(self._prev_hash)
+        
+        if (self.segment_max_bytes is not None and self._offset >= self.segment_max_bytes) or (
+            self.segment_max_entries is not None
+            and self._seq - self._base_seq >= self.segment_max_entries
+        ):
+            self._rotate()
+    
+    def _rotate(self) -> None:
+        """
+        Seal the active file as a segment and start an empty one.
+        
+        The segment is durable and listed in the manifest before the active
+        file is replaced; readers holding the old file keep reading it.
+        Caller holds the lock.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._segments.seal(self.path, self._base_seq)
+        
+        self._file.close()
+        self._file = None
+        self._reset_active()
+        self._base_seq = self._seq
+        self._offset = 0
+    
+    def append(
+        self, event_type: str, payload: dict[str, Any], encoder: CanonicalEncoder | None = None
+    ) -> dict[str, Any]:
         """
         Append an entry to the ledger.
         
         Args:
             event_type: Type of event (e.g., "doc.normalized.v1", "chunk.embedding.v1")
             payload: Event payload (will be canonicalized)
+            encoder: Encoder that already hashed the payload, to reuse its cached bytes
             
         Returns:
-            The complete ledger entry with hashes
+            The complete ledger entry with hashes, as written (large
+            payloads are blob stubs; see resolve())
         """
+        data = encoder.encode(payload) if encoder is not None else None
+        prepared = self._prepare_entry(event_type, payload, data)
         with self._lock:
-            entry = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "event_type": event_type,
-                "payload": payload,
-                "prev_hash": self._prev_hash,
-            }
+            entry, line = self._build_entry(prepared, self._prev_hash)
+            self._write([entry], [line])
+            return entry
+    
+    def append_many(
+        self, events: Iterable[tuple[str, dict[str, Any]]], encoder: CanonicalEncoder | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Append a batch of entries under a single lock acquisition.
+        
+        The entries are chained in order and written with one write call,
+        so the batch costs one flush (or fsync) instead of one per entry.
+        
+        Args:
+            events: (event_type, payload) pairs
+            encoder: Encoder that already hashed the payloads, to reuse its cached bytes
             
-            # Compute entry hash (without entry_hash field)
-            entry_hash = hash_canonical(entry)
-            entry["entry_hash"] = entry_hash
+        Returns:
+            The complete ledger entries with hashes, as written
+        """
+        return self._append_prepared([
+            self._prepare_entry(event_type, payload, encoder.encode(payload) if encoder is not None else None)
+            for event_type, payload in events
+        ])
+    
+    def append_canonical(
+        self, events: Iterable[tuple[str, bytes, dict[str, str]]]
+    ) -> list[dict[str, Any]]:
+        """
+        Append a batch of payloads that are already canonical JSON bytes.
+        
+        Lets the single-writer daemon leave canonicalization to its clients.
+        The bytes are written as given; callers must check that they are
+        canonical and derive the lookup keys from them (the daemon does).
+        
+        Args:
+            events: (event_type, canonical payload bytes, payload lookup keys)
             
-            # Write to file
-            with open(self.path, "a", encoding="utf-8") as f:
-                f.write(jcs_canonical_bytes(entry).decode("utf-8") + "\n")
+        Returns:
+            The ledger entries with hashes; their payload holds only the
+            lookup keys (or the blob stub)
+        """
+        return self._append_prepared(
+            [self._prepare_entry(event_type, keys, data) for event_type, data, keys in events]
+        )
+    
+    def _append_prepared(self, prepared: list[PreparedEntry]) -> list[dict[str, Any]]:
+        """Chain and write prepared entries under a single lock acquisition."""
+        entries = []
+        lines = []
+        with self._lock:
+            prev_hash = self._prev_hash
+            for item in prepared:
+                entry, line = self._build_entry(item, prev_hash)
+                prev_hash = entry["entry_hash"]
+                entries.append(entry)
+                lines.append(line)
+            if lines:
+                self._write(entries, lines)
+        return entries
+    
+    def flush(self, fsync: bool = False) -> None:
+        """Push buffered entries to the OS, and optionally to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                if fsync:
+                    os.fsync(self._file.fileno())
+            if self._merkle is not None:
+                self._merkle.flush()
+    
+    def _group_commit_loop(self) -> None:
+        """Background flusher for group-commit durability."""
+        last_fsync = time.monotonic()
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if self._file is None:
+                    continue
+                self._file.flush()
+                fileno = self._file.fileno()
             
-            self._prev_hash = entry_hash
-            return entry
+            # fsync outside the lock so appends keep flowing
+            now = time.monotonic()
+            if self.fsync_interval is not None and now - last_fsync >= self.fsync_interval:
+                try:
+                    os.fsync(fileno)
+                except OSError:
+                    pass  # Closed by a rotation, which fsyncs on its own
+                last_fsync = now
+    
+    def close(self) -> None:
+        """Commit buffered entries, update the checkpoint and release the handle."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._committer is not None:
+            self._committer.join()
+        
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                if self.durability != "flush":
+                    os.fsync(self._file.fileno())
+                if self._seq:
+                    self._write_checkpoint(self._prev_hash)
+                self._file.close()
+                self._file = None
+            if self._index is not None:
+                self._index.close()
+            if self._merkle is not None:
+                self._merkle.close()
+    
+    def __enter__(self) -> "Ledger":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
     def get_prev_hash(self) -> str | None:
         """Get the hash of the last entry."""
         with self._lock:
             return self._prev_hash
     
-    def verify(self) -> tuple[bool, list[str]]:
+    def merkle_root(self) -> dict[str, Any]:
+        """Current Merkle root over all entry hashes."""
+        if self._merkle is None:
+            raise RuntimeError("Ledger was opened without a Merkle tree")
+        with self._lock:
+            return {"tree_size": self._merkle.size, "root": self._merkle.root().hex()}
+    
+    def inclusion_proof(self, seq: int, tree_size: int | None = None) -> dict[str, Any]:
+        """
+        O(log n) proof that the entry with the given seq is in the tree.
+        
+        Check it with merkle.verify_inclusion(entry_hash, seq, tree_size,
+        audit_path, root); the ledger itself is not needed.
+        
+        Args:
+            seq: Sequence number of the entry
+            tree_size: Prove against an earlier tree size (default: current)
+        """
+        if self._merkle is None:
+            raise RuntimeError("Ledger was opened without a Merkle tree")
+        entry = self.get(seq, resolve=False)
+        if entry is None:
+            raise KeyError(seq)
+        with self._lock:
+            tree_size = self._merkle.size if tree_size is None else tree_size
+            audit_path = self._merkle.proof(seq, tree_size)
+            root = self._merkle.root(tree_size)
+        return {
+            "seq": seq,
+            "tree_size": tree_size,
+            "entry_hash": entry["entry_hash"],
+            "audit_path": [node.hex() for node in audit_path],
+            "root": root.hex(),
+        }
+    
+    def get(self, seq: int, resolve: bool = True) -> dict[str, Any] | None:
         """
-        Verify the integrity of the entire ledger.
+        Get the entry with the given sequence number.
         
+        With the offset index this is a single seek and read (and, for a
+        sealed entry, one frame decompression); without it the ledger is
+        scanned.
+        
+        Args:
+            seq: Sequence number of the entry
+            resolve: Rehydrate a blob-stored payload (False: return the stub)
+        """
+        if self._index is None:
+            return next(self.iter_entries(seq, resolve), None) if 0 <= seq else None
+        
+        location = self._index.locate(seq)
+        if location is None:
+            return None
+        # Choose segment or active file under the lock, so a rotation cannot
+        # reset the active file between the choice and the read
+        with self._lock:
+            meta = self._segments.find(seq)
+            if meta is None:
+                if self._file is not None:
+                    self._file.flush()
+                with open(self.path, "rb") as f:
+                    f.seek(location[0])
+                    entry = json.loads(f.read(location[1]))
+        if meta is not None:
+            entry = json.loads(self._segments.read(meta, *location))  # Sealed: immutable
+        return self.resolve(entry) if resolve else entry
+    
+    def find(
+        self,
+        doc_id: str | None = None,
+        chunk_id: str | None = None,
+        bundle_id: str | None = None,
+        limit: int | None = None,
+        resolve: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        Find entries whose payload matches all given keys, in ledger order.
+        
+        Requires the offset index. Blob-stored payloads keep their lookup
+        keys in the stub, so they are found without reading the blob.
+        """
+        if self._index is None:
+            raise RuntimeError("Ledger was opened without an index")
+        
+        keys = {"doc_id": doc_id, "chunk_id": chunk_id, "bundle_id": bundle_id}
+        seqs = self._index.find(limit=limit, **{k: v for k, v in keys.items() if v is not None})
+        return [self.get(seq, resolve) for seq in seqs]
+    
+    def iter_entries(self, from_seq: int = 0, resolve: bool = True) -> Iterator[dict[str, Any]]:
+        """Iterate over entries starting at from_seq, across sealed segments."""
+        self.flush()
+        for _, _, line in self._iter_lines(from_seq):
+            entry = json.loads(line)
+            yield self.resolve(entry) if resolve else entry
+    
+    def _iter_lines(
+        self, from_seq: int = 0, offset: int | None = None
+    ) -> Iterator[tuple[int, int, bytes]]:
+        """
+        Iterate over (seq, offset, line) of entries starting at from_seq.
+        
+        Offsets are relative to the segment or active file holding the entry.
+        
+        Args:
+            from_seq: First seq to yield
+            offset: Offset of from_seq in the active file, if known
+        """
+        # Snapshot segments and the active file together; a rotation
+        # replaces the active file, so the open handle stays consistent
+        with self._lock:
+            segments = list(self._segments.segments)
+            seq = self._base_seq
+            f = open(self.path, "rb") if self.path.exists() else None
+        
+        try:
+            for meta in segments:
+                if meta["last_seq"] >= from_seq:
+                    yield from self._segments.iter_lines(meta, from_seq)
+            if f is None:
+                return
+            
+            start = 0
+            if from_seq > seq:
+                if offset is None and self._index is not None:
+                    location = self._index.locate(from_seq)
+                    offset = location[0] if location is not None else None
+                if offset is not None:
+                    seq, start = from_seq, offset
+            
+            f.seek(start)
+            for line in f:
+                if line.strip():
+                    if seq >= from_seq:
+                        yield seq, start, line
+                    seq += 1
+                start += len(line)
+        finally:
+            if f is not None:
+                f.close()
+    
+    def verify(self, full: bool = False, workers: int | None = 1) -> tuple[bool, list[str]]:
+        """
+        Verify the integrity of the ledger.
+        
+        Verification resumes after the last verified entry recorded in the
+        verification checkpoint, so only new entries are re-hashed. The
+        checkpoint only advances when no errors were found. Sealed segments
+        are also checked against their recorded seq range, head hash and
+        root; line numbers count from the first sealed line.
+        
+        Args:
+            full: Ignore the checkpoint and re-verify from the first entry
+            workers: Processes used to re-hash entries (None: all cores)
+            
         Returns:
             (is_valid, list of error messages)
         """
-        errors = []
-        prev_hash = None
-        line_num = 0
-        
-        if not self.path.exists():
+        if not self.path.exists() and not self._segments.segments:
             return True, []
         
-        with open(self.path, "r", encoding="utf-8") as f:
+        self.flush()
+        start = None if full else self._read_verify_checkpoint()
+        if start is None:
+            start = self._segment_position(0)
+        
+        errors, position = self._verify_segments(start, workers)
+        if self.path.exists():
+            pending = self.path.stat().st_size - position["offset"]
+            if workers != 1 and pending >= PARALLEL_MIN_BYTES:
+                active_errors, last = verify_parallel(self.path, position, workers)
+            else:
+                active_errors, last = self._verify_from(position)
+            errors.extend(active_errors)
+        else:
+            last = position
+        if not errors and last["seq"] > start["seq"]:
+            self._write_verify_checkpoint(last)
+        return len(errors) == 0, errors
+    
+    def _segment_position(self, count: int) -> dict[str, Any]:
+        """Verified position after the first count sealed segments."""
+        sealed = self._segments.segments[:count]
+        return {
+            "seq": sealed[-1]["last_seq"] if sealed else -1,
+            "offset": 0,
+            "line": sum(meta["lines"] for meta in sealed),
+            "entry_hash": sealed[-1]["head_hash"] if sealed else None,
+        }
+    
+    def _verify_segments(
+        self, start: dict[str, Any], workers: int | None
+    ) -> tuple[list[str], dict[str, Any]]:
+        """
+        Verify the sealed segments after a verified position.
+        
+        Segments are independent, so with workers != 1 they are re-hashed
+        in a process pool.
+        
+        Returns:
+            (list of error messages, position at the start of the active file)
+        """
+        segments = self._segments.segments
+        pending = [meta for meta in segments if meta["last_seq"] > start["seq"]]
+        if not pending:
+            return [], start
+        
+        directory = self._segments.directory
+        if workers != 1 and len(pending) > 1 and sum(m["size"] for m in pending) >= PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(verify_segment, [directory] * len(pending), pending))
+        else:
+            results = [verify_segment(directory, meta) for meta in pending]
+        
+        errors, position = stitch(results, self._segment_position(len(segments) - len(pending)))
+        position["offset"] = 0
+        return errors, position
+    
+    def _verify_from(self, start: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+        """
+        Verify entries after a verified position.
+        
+        Args:
+            start: Last verified position (seq, byte offset, line, entry_hash)
+            
+        Returns:
+            (list of error messages, last position reached)
+        """
+        errors = []
+        prev_hash = start["entry_hash"]
+        seq = start["seq"]
+        offset = start["offset"]
+        line_num = start["line"]
+        
+        with open(self.path, "rb") as f:
+            f.seek(offset)
             for line in f:
                 line_num += 1
+                offset += len(line)
                 if not line.strip():
                     continue
+                seq += 1
                 
                 try:
                     entry = json.loads(line)
-                except json.JSONDecodeError as e:
+                except ValueError as e:
                     errors.append(f"Line {line_num}: Invalid JSON: {e}")
                     continue
                 
@@ -120,7 +869,10 @@ class Ledger:
                 
                 # Verify entry_hash
                 stored_hash = entry.pop("entry_hash", None)
-                computed_hash = hash_canonical(entry)
+                try:
+                    computed_hash = hash_canonical_as(entry, stored_hash or "")
+                except ValueError as e:
+                    computed_hash = f"<{e}>"  # Unknown algorithm prefix
                 entry["entry_hash"] = stored_hash  # Restore
                 
                 if stored_hash != computed_hash:
@@ -131,17 +883,98 @@ class Ledger:
                 
                 prev_hash = stored_hash
         
-        return len(errors) == 0, errors
+        last = {"seq": seq, "offset": offset, "line": line_num, "entry_hash": prev_hash}
+        return errors, last
+    
+    def _read_verify_checkpoint(self) -> dict[str, Any] | None:
+        """
+        Load the verification checkpoint, if it still matches the ledger.
+        
+        The entry ending at the checkpoint offset must still carry the
+        checkpointed hash, and that hash must still be its own. A checkpoint
+        that has since been sealed resumes at the end of its segment if it
+        was the segment's head, or at the start of the segment otherwise.
+        """
+        try:
+            checkpoint = json.loads(self.verify_checkpoint_path.read_bytes())
+            start = {key: checkpoint[key] for key in ("seq", "offset", "line", "entry_hash")}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        
+        if start["seq"] < self._base_seq:
+            meta = self._segments.find(start["seq"])
+            if meta is None:
+                return None
+            count = self._segments.segments.index(meta)
+            if start["seq"] == meta["last_seq"] and start["entry_hash"] == meta["head_hash"]:
+                count += 1
+            return self._segment_position(count)
+        
+        if not self.path.exists() or not 0 < start["offset"] <= self.path.stat().st_size:
+            return None
+        tail = read_tail_line(self.path, end=start["offset"])
+        if tail is None or tail[0] + len(tail[1]) != start["offset"]:
+            return None
+        try:
+            entry = json.loads(tail[1])
+        except ValueError:
+            return None
+        
+        stored_hash = entry.pop("entry_hash", None)
+        try:
+            if stored_hash != start["entry_hash"] or hash_canonical_as(entry, stored_hash or "") != stored_hash:
+                return None
+        except ValueError:
+            return None
+        return start
+    
+    def _write_verify_checkpoint(self, last: dict[str, Any]) -> None:
+        """Atomically record the last verified position."""
+        tmp_path = self.verify_checkpoint_path.with_name(self.verify_checkpoint_path.name + ".tmp")
+        tmp_path.write_bytes(jcs_canonical_bytes(last))
+        os.replace(tmp_path, self.verify_checkpoint_path)
 
 
 # Global ledger instance (lazy initialization)
-_ledger: Ledger | None = None
+_ledger: "Ledger | LedgerClient | None" = None
 
 
-def get_ledger(path: str | None = None) -> Ledger:
-    """Get or create the global ledger instance."""
+def get_ledger(path: str | None = None, local: bool = False) -> "Ledger | LedgerClient":
+    """
+    Get or create the global ledger instance.
+    
+    When LEDGER_SOCKET is set (and local is False) this is a LedgerClient
+    appending through the single-writer daemon on that socket, so every
+    worker process chains onto the same head.
+    
+    Durability is configured through LEDGER_DURABILITY, LEDGER_FLUSH_INTERVAL
+    and LEDGER_FSYNC_INTERVAL (seconds; "none" disables group fsync).
+    LEDGER_INDEX=0 disables the offset index sidecar and LEDGER_MERKLE=1
+    enables the Merkle tree for inclusion proofs. LEDGER_SEGMENT_MAX_BYTES
+    and LEDGER_SEGMENT_MAX_ENTRIES enable rotation into sealed segments, and
+    LEDGER_BLOB_THRESHOLD moves payloads over that many bytes to the blob store.
+    """
     global _ledger
+    if _ledger is None and os.environ.get("LEDGER_SOCKET") and not local:
+        from .daemon import LedgerClient
+        _ledger = LedgerClient(os.environ["LEDGER_SOCKET"])
+        atexit.register(_ledger.close)
     if _ledger is None:
         ledger_path = path or os.environ.get("LEDGER_PATH", "./data/ledger.jsonl")
-        _ledger = Ledger(ledger_path)
+        fsync_interval = os.environ.get("LEDGER_FSYNC_INTERVAL", "1.0")
+        max_bytes = os.environ.get("LEDGER_SEGMENT_MAX_BYTES")
+        max_entries = os.environ.get("LEDGER_SEGMENT_MAX_ENTRIES")
+        blob_threshold = os.environ.get("LEDGER_BLOB_THRESHOLD")
+        _ledger = Ledger(
+            ledger_path,
+            durability=os.environ.get("LEDGER_DURABILITY", "flush"),
+            flush_interval=float(os.environ.get("LEDGER_FLUSH_INTERVAL", "0.05")),
+            fsync_interval=None if fsync_interval.lower() == "none" else float(fsync_interval),
+            index=os.environ.get("LEDGER_INDEX", "1") != "0",
+            merkle=os.environ.get("LEDGER_MERKLE", "0") == "1",
+            segment_max_bytes=int(max_bytes) if max_bytes else None,
+            segment_max_entries=int(max_entries) if max_entries else None,
+            blob_threshold=int(blob_threshold) if blob_threshold else None,
+        )
+        atexit.register(_ledger.close)
     return _ledger
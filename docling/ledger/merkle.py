@@ -0,0 +1,246 @@
+"""
+Merkle Tree Accumulator over ledger entry hashes.
+
+An RFC 6962 / RFC 9162 Merkle tree is maintained incrementally as entries
+are appended. Every complete, aligned subtree is stored once in a
+fixed-width level file (level 0 holds the leaf hashes), so appends are
+amortized O(1) writes and inclusion proofs for any seq need O(log n)
+stored nodes. The frontier (the last node of every level with an odd
+node count) is persisted implicitly by the level files.
+"""
+import hashlib
+from pathlib import Path
+
+
+HASH_SIZE = 32
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(entry_hash: str) -> bytes:
+    """Merkle leaf for a ledger entry_hash."""
+    return hashlib.sha256(LEAF_PREFIX + entry_hash.encode("utf-8")).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Merkle interior node over two children."""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly smaller than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def merkle_root(leaves: list[bytes]) -> bytes:
+    """Root of an in-memory list of leaf hashes."""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split(len(leaves))
+    return node_hash(merkle_root(leaves[:k]), merkle_root(leaves[k:]))
+
+
+def verify_inclusion(
+    entry_hash: str, seq: int, tree_size: int, audit_path: list[str], root: str
+) -> bool:
+    """
+    Check an inclusion proof (RFC 9162, section 2.1.3.2).
+
+    Args:
+        entry_hash: The ledger entry's entry_hash
+        seq: The entry's sequence number (leaf index)
+        tree_size: Tree size the proof was produced for
+        audit_path: Sibling hashes (hex), leaf to root
+        root: Expected root (hex) for tree_size
+    """
+    if not 0 <= seq < tree_size:
+        return False
+
+    fn, sn = seq, tree_size - 1
+    r = leaf_hash(entry_hash)
+    for sibling in audit_path:
+        p = bytes.fromhex(sibling)
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r.hex() == root
+
+
+class MerkleFrontier:
+    """
+    In-memory Merkle root over a stream of entry hashes.
+
+    Keeps only the frontier, so memory is O(log n) in the number of leaves.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._frontier: list[bytes | None] = []
+
+    def append(self, entry_hash: str) -> None:
+        node = leaf_hash(entry_hash)
+        level = 0
+        while level < len(self._frontier) and self._frontier[level] is not None:
+            node = node_hash(self._frontier[level], node)
+            self._frontier[level] = None
+            level += 1
+        if level == len(self._frontier):
+            self._frontier.append(node)
+        else:
+            self._frontier[level] = node
+        self.size += 1
+
+    def root(self) -> bytes:
+        root = None
+        for node in self._frontier:
+            if node is not None:
+                root = node if root is None else node_hash(node, root)
+        return root if root is not None else hashlib.sha256(b"").digest()
+
+
+class MerkleAccumulator:
+    """
+    Incrementally maintained Merkle tree persisted as level files.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files = []
+        self._counts = []
+        self._frontier: list[bytes | None] = []
+
+        level = 0
+        while (self.directory / f"level-{level:02d}.bin").exists():
+            self._open_level(level)
+            level += 1
+        self._repair()
+
+    @property
+    def size(self) -> int:
+        """Number of leaves."""
+        return self._counts[0] if self._counts else 0
+
+    def _open_level(self, level: int) -> None:
+        path = self.directory / f"level-{level:02d}.bin"
+        path.touch()
+        f = open(path, "r+b")
+        self._files.append(f)
+        self._counts.append(f.seek(0, 2) // HASH_SIZE)
+        self._frontier.append(None)
+
+    def _read(self, level: int, index: int) -> bytes:
+        f = self._files[level]
+        f.seek(index * HASH_SIZE)
+        return f.read(HASH_SIZE)
+
+    def _push(self, level: int, node: bytes) -> None:
+        if level == len(self._files):
+            self._open_level(level)
+        f = self._files[level]
+        f.seek(self._counts[level] * HASH_SIZE)
+        f.write(node)
+        self._counts[level] += 1
+        self._frontier[level] = node if self._counts[level] & 1 else None
+
+    def _repair(self) -> None:
+        """Make every level consistent with the one below it after a crash."""
+        level = 0
+        while level < len(self._files) or (level and self._counts[level - 1] >= 2):
+            if level == len(self._files):
+                self._open_level(level)
+            f = self._files[level]
+            expected = self._counts[level] if level == 0 else self._counts[level - 1] // 2
+            if self._counts[level] > expected or f.seek(0, 2) % HASH_SIZE:
+                f.truncate(min(self._counts[level], expected) * HASH_SIZE)
+                self._counts[level] = min(self._counts[level], expected)
+            while self._counts[level] < expected:
+                i = self._counts[level]
+                self._push(level, node_hash(
+                    self._read(level - 1, 2 * i), self._read(level - 1, 2 * i + 1)
+                ))
+            if self._counts[level] & 1:
+                self._frontier[level] = self._read(level, self._counts[level] - 1)
+            level += 1
+
+    def append(self, entry_hashes: list[str]) -> None:
+        """Add leaves for newly appended entries."""
+        for entry_hash in entry_hashes:
+            node = leaf_hash(entry_hash)
+            level = 0
+            while True:
+                # A frontier node at this level is the left sibling to merge with
+                left = self._frontier[level] if level < len(self._frontier) else None
+                self._push(level, node)
+                if left is None:
+                    break
+                node = node_hash(left, node)
+                level += 1
+
+    def truncate(self, size: int) -> None:
+        """Drop leaves at or after size."""
+        for level, f in enumerate(self._files):
+            count = size >> level
+            f.truncate(count * HASH_SIZE)
+            self._counts[level] = count
+            self._frontier[level] = self._read(level, count - 1) if count & 1 else None
+
+    def leaf(self, index: int) -> bytes:
+        return self._read(0, index)
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        """Hash of leaves [start, end) built from stored complete subtrees."""
+        n = end - start
+        if n & (n - 1) == 0 and start % n == 0:
+            return self._read(n.bit_length() - 1, start // n)
+        k = _split(n)
+        return node_hash(self._subtree(start, start + k), self._subtree(start + k, end))
+
+    def root(self, tree_size: int | None = None) -> bytes:
+        """Root hash for the current (or an earlier) tree size."""
+        if tree_size is None or tree_size == self.size:
+            root = None
+            for node in self._frontier:
+                if node is not None:
+                    root = node if root is None else node_hash(node, root)
+            return root if root is not None else hashlib.sha256(b"").digest()
+        if not 0 <= tree_size <= self.size:
+            raise ValueError(f"Tree size {tree_size} out of range")
+        return self._subtree(0, tree_size) if tree_size else hashlib.sha256(b"").digest()
+
+    def proof(self, index: int, tree_size: int | None = None) -> list[bytes]:
+        """Audit path for leaf index in a tree of tree_size leaves."""
+        tree_size = self.size if tree_size is None else tree_size
+        if not 0 <= index < tree_size <= self.size:
+            raise ValueError(f"Leaf {index} not in tree of size {tree_size}")
+
+        path = []
+        start, end = 0, tree_size
+        while end - start > 1:
+            k = _split(end - start)
+            if index < start + k:
+                path.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                path.append(self._subtree(start, start + k))
+                start += k
+        return path[::-1]
+
+    def flush(self) -> None:
+        for f in self._files:
+            f.flush()
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+        self._files = []
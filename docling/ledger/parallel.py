@@ -0,0 +1,201 @@
+"""
+Parallel Ledger Verification.
+
+Each entry_hash can be recomputed independently, so the ledger is split
+into line-aligned byte ranges that are re-hashed in a process pool. Only
+the prev_hash links between ranges are stitched together sequentially.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from ..common.canonicalize import hash_canonical_as
+from .merkle import MerkleFrontier
+
+
+# Ranges per worker (smaller ranges balance load across the pool)
+RANGES_PER_WORKER = 4
+
+# Below this many bytes a single sequential pass is faster than a pool
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def split_ranges(path: str | Path, start: int, end: int, count: int) -> list[tuple[int, int]]:
+    """
+    Split [start, end) into at most count byte ranges aligned to line starts.
+    """
+    size = max(end - start, 0)
+    step = max(size // max(count, 1), 1)
+    bounds = [start]
+    with open(path, "rb") as f:
+        while bounds[-1] + step < end:
+            f.seek(bounds[-1] + step)
+            f.readline()  # Advance to the next line start
+            if f.tell() >= end:
+                break
+            bounds.append(f.tell())
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def verify_lines(lines: Iterable[bytes], frontier: MerkleFrontier | None = None) -> dict[str, Any]:
+    """
+    Re-hash a run of consecutive ledger lines.
+
+    prev_hash links are checked inside the run; the first entry's link
+    is returned for the caller to check against the previous run.
+
+    Args:
+        lines: Raw lines, newlines included
+        frontier: Also add each stored entry_hash to this Merkle frontier
+
+    Returns:
+        lines: physical lines read
+        entries: non-empty lines read
+        errors: (line within run, message) in line order
+        first_link: (line within run, prev_hash) of the first entry or None
+        last_hash: entry_hash of the last entry (valid if first_link is set)
+    """
+    errors = []
+    first_link = None
+    prev_hash = None
+    line_num = 0
+    entries = 0
+
+    for line in lines:
+        line_num += 1
+        if not line.strip():
+            continue
+        entries += 1
+
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            errors.append((line_num, f"Invalid JSON: {e}"))
+            if frontier is not None:
+                frontier.append("")
+            continue
+
+        # Check prev_hash chain (the first link is stitched by the caller)
+        if first_link is None:
+            first_link = (line_num, entry.get("prev_hash"))
+        elif entry.get("prev_hash") != prev_hash:
+            errors.append((
+                line_num,
+                f"prev_hash mismatch. Expected {prev_hash}, got {entry.get('prev_hash')}",
+            ))
+
+        # Verify entry_hash
+        stored_hash = entry.pop("entry_hash", None)
+        try:
+            computed_hash = hash_canonical_as(entry, stored_hash or "")
+        except ValueError as e:
+            computed_hash = f"<{e}>"  # Unknown algorithm prefix
+        if stored_hash != computed_hash:
+            errors.append((
+                line_num,
+                f"entry_hash mismatch. Expected {computed_hash}, got {stored_hash}",
+            ))
+        if frontier is not None:
+            frontier.append(stored_hash or "")
+
+        prev_hash = stored_hash
+
+    return {
+        "lines": line_num,
+        "entries": entries,
+        "errors": errors,
+        "first_link": first_link,
+        "last_hash": prev_hash,
+    }
+
+
+def _read_range(path: str | Path, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            yield line
+
+
+def verify_range(path: str | Path, start: int, end: int) -> dict[str, Any]:
+    """Re-hash the entries in one byte range (see verify_lines)."""
+    return verify_lines(_read_range(path, start, end))
+
+
+def stitch(results: list[dict[str, Any]], start: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+    """
+    Join verify_lines results for consecutive runs after a verified position.
+
+    Checks the prev_hash link at the start of each run and numbers error
+    lines from the start of the ledger. Messages in a result's
+    "segment_errors" are appended after its line errors.
+
+    Returns:
+        (list of error messages, last position reached, without offset)
+    """
+    errors = []
+    prev_hash = start["entry_hash"]
+    seq = start["seq"]
+    base_line = start["line"]
+    for result in results:
+        range_errors = result["errors"]
+        if result["first_link"] is not None:
+            link_line, link_hash = result["first_link"]
+            if link_hash != prev_hash:
+                # Goes after any invalid lines before it, ahead of its own entry_hash error
+                position = sum(1 for line, _ in range_errors if line < link_line)
+                range_errors = list(range_errors)
+                range_errors.insert(position, (
+                    link_line,
+                    f"prev_hash mismatch. Expected {prev_hash}, got {link_hash}",
+                ))
+            prev_hash = result["last_hash"]
+
+        errors.extend(f"Line {base_line + line}: {message}" for line, message in range_errors)
+        errors.extend(result.get("segment_errors", []))
+        seq += result["entries"]
+        base_line += result["lines"]
+
+    return errors, {"seq": seq, "line": base_line, "entry_hash": prev_hash}
+
+
+def verify_parallel(
+    path: str | Path,
+    start: dict[str, Any],
+    workers: int | None = None,
+    ranges: int | None = None,
+) -> tuple[list[str], dict[str, Any]]:
+    """
+    Verify entries after a verified position using a process pool.
+
+    Error messages and ordering match Ledger.verify().
+
+    Args:
+        path: Ledger JSONL file
+        start: Last verified position (seq, byte offset, line, entry_hash)
+        workers: Pool size (default: CPU count)
+        ranges: Number of byte ranges (default: RANGES_PER_WORKER per worker)
+
+    Returns:
+        (list of error messages, last position reached)
+    """
+    workers = workers or os.cpu_count() or 1
+    end = os.path.getsize(path)
+    bounds = split_ranges(path, start["offset"], end, ranges or workers * RANGES_PER_WORKER)
+
+    if len(bounds) == 1:
+        results = [verify_range(path, *bounds[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(verify_range, [path] * len(bounds), *zip(*bounds)))
+
+    errors, last = stitch(results, start)
+    last["offset"] = end
+    return errors, last
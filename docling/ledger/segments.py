@@ -0,0 +1,225 @@
+"""
+Sealed Ledger Segments.
+
+When the active ledger file reaches its size or entry limit it is sealed
+into an immutable segment: the raw JSONL bytes are split into frames of
+whole lines and each frame is zlib-compressed independently, so any
+entry can be read by decompressing a single frame. Byte offsets inside a
+segment are the offsets the entries had in the active file, so the
+offset index stays valid across rotation.
+
+The manifest records, per segment, its first and last seq, the prev_hash
+it links to, its head hash, a Merkle root over its entry hashes and the
+frame table.
+"""
+import bisect
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Iterator
+
+from ..common.canonicalize import jcs_canonical_bytes
+from .merkle import MerkleFrontier
+from .parallel import verify_lines
+
+
+# Uncompressed bytes per frame
+FRAME_SIZE = 1024 * 1024
+
+# zlib level for sealed frames
+COMPRESSION_LEVEL = 6
+
+# Frame table columns: [first_seq, offset, compressed_offset, compressed_length]
+FRAME_SEQ, FRAME_OFFSET, FRAME_COMPRESSED_OFFSET, FRAME_COMPRESSED_LENGTH = range(4)
+
+ENTRY_HASH_PREFIX = b'{"entry_hash":"'
+
+
+def entry_hash_of(line: bytes) -> str | None:
+    """entry_hash of a serialized entry (canonical lines start with it)."""
+    if line.startswith(ENTRY_HASH_PREFIX):
+        start = len(ENTRY_HASH_PREFIX)
+        return line[start:line.index(b'"', start)].decode("ascii")
+    return json.loads(line).get("entry_hash")
+
+
+class SegmentStore:
+    """
+    Directory of sealed segments plus their manifest.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        self.segments: list[dict[str, Any]] = []
+        if self.manifest_path.exists():
+            self.segments = json.loads(self.manifest_path.read_bytes())["segments"]
+        self._first_seqs = [meta["first_seq"] for meta in self.segments]
+
+    @property
+    def next_seq(self) -> int:
+        """Seq of the first entry not in a sealed segment."""
+        return self.segments[-1]["last_seq"] + 1 if self.segments else 0
+
+    @property
+    def head_hash(self) -> str | None:
+        """entry_hash of the last sealed entry."""
+        return self.segments[-1]["head_hash"] if self.segments else None
+
+    def find(self, seq: int) -> dict[str, Any] | None:
+        """Segment containing seq, if sealed."""
+        i = bisect.bisect_right(self._first_seqs, seq) - 1
+        if i < 0 or seq > self.segments[i]["last_seq"]:
+            return None
+        return self.segments[i]
+
+    def seal(self, source: str | Path, first_seq: int) -> dict[str, Any]:
+        """
+        Seal the entries of a JSONL file as the next segment.
+
+        The segment file is fsynced before the manifest references it.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{first_seq:012d}.seg"
+        tmp_path = self.directory / (name + ".tmp")
+
+        frames = []
+        frontier = MerkleFrontier()
+        seq = first_seq
+        offset = 0
+        lines = 0
+        prev_hash = head_hash = None
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            frame = []
+            frame_seq, frame_offset, frame_size = seq, 0, 0
+            for line in src:
+                if line.strip():
+                    try:
+                        if seq == first_seq:
+                            prev_hash = json.loads(line).get("prev_hash")
+                        head_hash = entry_hash_of(line)
+                    except ValueError:
+                        head_hash = None  # Sealed as is; verify() reports it
+                    frontier.append(head_hash or "")
+                    seq += 1
+                frame.append(line)
+                frame_size += len(line)
+                offset += len(line)
+                lines += 1
+                if frame_size >= FRAME_SIZE:
+                    frames.append(self._write_frame(dst, frame, frame_seq, frame_offset))
+                    frame = []
+                    frame_seq, frame_offset, frame_size = seq, offset, 0
+            if frame:
+                frames.append(self._write_frame(dst, frame, frame_seq, frame_offset))
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.directory / name)
+
+        meta = {
+            "file": name,
+            "first_seq": first_seq,
+            "last_seq": seq - 1,
+            "lines": lines,
+            "size": offset,
+            "prev_hash": prev_hash,
+            "head_hash": head_hash,
+            "root": frontier.root().hex(),
+            "frames": frames,
+        }
+        self._save(self.segments + [meta])
+        return meta
+
+    @staticmethod
+    def _write_frame(dst, lines: list[bytes], first_seq: int, offset: int) -> list[int]:
+        compressed = zlib.compress(b"".join(lines), COMPRESSION_LEVEL)
+        position = dst.tell()
+        dst.write(compressed)
+        return [first_seq, offset, position, len(compressed)]
+
+    def _save(self, segments: list[dict[str, Any]]) -> None:
+        """Atomically replace the manifest."""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp_path.write_bytes(jcs_canonical_bytes({"segments": segments}))
+        os.replace(tmp_path, self.manifest_path)
+        self.segments = segments
+        self._first_seqs = [meta["first_seq"] for meta in segments]
+
+    def read(self, meta: dict[str, Any], offset: int, length: int) -> bytes:
+        """Read length bytes at an uncompressed offset (one frame)."""
+        offsets = [frame[FRAME_OFFSET] for frame in meta["frames"]]
+        index = bisect.bisect_right(offsets, offset) - 1
+        data = read_frame(self.directory, meta, index)
+        start = offset - meta["frames"][index][FRAME_OFFSET]
+        return data[start:start + length]
+
+    def iter_lines(
+        self, meta: dict[str, Any], from_seq: int | None = None
+    ) -> Iterator[tuple[int, int, bytes]]:
+        return iter_segment_lines(self.directory, meta, from_seq)
+
+
+def read_frame(directory: str | Path, meta: dict[str, Any], index: int) -> bytes:
+    """Decompress one frame of a segment."""
+    frame = meta["frames"][index]
+    with open(Path(directory) / meta["file"], "rb") as f:
+        f.seek(frame[FRAME_COMPRESSED_OFFSET])
+        return zlib.decompress(f.read(frame[FRAME_COMPRESSED_LENGTH]))
+
+
+def iter_segment_lines(
+    directory: str | Path, meta: dict[str, Any], from_seq: int | None = None
+) -> Iterator[tuple[int, int, bytes]]:
+    """
+    Iterate over the lines of a segment, one frame at a time.
+
+    Yields (seq, offset, line) for entries at or after from_seq, or
+    (seq of the next entry, offset, line) for every raw line, blank
+    ones included, when from_seq is None.
+    """
+    frames = meta["frames"]
+    first = 0
+    if from_seq is not None:
+        first = max(bisect.bisect_right([frame[FRAME_SEQ] for frame in frames], from_seq) - 1, 0)
+
+    for index in range(first, len(frames)):
+        seq = frames[index][FRAME_SEQ]
+        offset = frames[index][FRAME_OFFSET]
+        for line in read_frame(directory, meta, index).splitlines(keepends=True):
+            if from_seq is None:
+                yield seq, offset, line
+            elif line.strip() and seq >= from_seq:
+                yield seq, offset, line
+            if line.strip():
+                seq += 1
+            offset += len(line)
+
+
+def verify_segment(directory: str | Path, meta: dict[str, Any]) -> dict[str, Any]:
+    """
+    Re-hash a sealed segment and check it against its manifest record.
+
+    Returns the verify_lines result for the segment's lines, with
+    mismatches of the recorded seq range, head hash and root listed
+    under "segment_errors".
+    """
+    frontier = MerkleFrontier()
+    result = verify_lines((line for _, _, line in iter_segment_lines(directory, meta)), frontier)
+
+    name = meta["file"]
+    errors = []
+    if result["entries"] != meta["last_seq"] - meta["first_seq"] + 1:
+        errors.append(
+            f"Segment {name}: entry count mismatch. "
+            f"Expected {meta['last_seq'] - meta['first_seq'] + 1}, got {result['entries']}"
+        )
+    if result["last_hash"] != meta["head_hash"]:
+        errors.append(
+            f"Segment {name}: head_hash mismatch. Expected {result['last_hash']}, got {meta['head_hash']}"
+        )
+    root = frontier.root().hex()
+    if root != meta["root"]:
+        errors.append(f"Segment {name}: root mismatch. Expected {root}, got {meta['root']}")
+    result["segment_errors"] = errors
+    return result
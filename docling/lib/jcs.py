@@ -1,37 +1,257 @@
 """
 JCS (JSON Canonicalization Scheme) implementation per RFC 8785.
 Provides deterministic JSON serialization for reproducible hashing.
+
+Output matches ECMAScript JSON.stringify on the same data with object
+keys sorted by UTF-16 code units, so hashes agree with other RFC 8785
+implementations. Python's json module writes strings the same way, and
+numbers too outside a few ranges, so documents that avoid those are
+checked in bulk and handed to json.dumps; the rest are walked here.
+
+Hashes are prefixed with their algorithm ("sha256:" or "blake2b:").
+HASH_ALGORITHM picks the one for new hashes; verify_hash uses whichever
+one the expected hash names.
 """
 import json
 import hashlib
+import math
+import os
+from functools import partial
+from itertools import chain, compress, repeat
+from operator import is_, is_not
+from json.encoder import encode_basestring
 from typing import Any
 
+# repr() of a float in this range is positional, like ECMAScript, apart from a trailing ".0"
+_REPR_MIN = 1e-4
+_REPR_MAX = 2.0 ** 53
+
+# Integers outside this range are not exactly representable as IEEE 754 doubles
+_MAX_SAFE_INT = 2 ** 53
+
+_SCALAR_TYPES = frozenset({str, bool, type(None)})
+_NUMBER_TYPES = frozenset({int, float})
+_CONTAINER_TYPES = frozenset({dict, list, tuple})
+_JSON_TYPES = _SCALAR_TYPES | _NUMBER_TYPES | _CONTAINER_TYPES
+
+# Digest algorithms by prefix; BLAKE2b is truncated to 256 bits like SHA-256
+HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": partial(hashlib.blake2b, digest_size=32),
+}
+
+# Algorithm for new hashes
+HASH_ALGORITHM = os.environ.get("HASH_ALGORITHM", "sha256")
+
+_dumps = json.JSONEncoder(
+    separators=(',', ':'), ensure_ascii=False, allow_nan=False, sort_keys=True
+).encode
+
+
+def format_number(value: float | int) -> str:
+    """
+    Serialize a number as ECMAScript Number.prototype.toString does.
+
+    Integers are treated as IEEE 754 doubles, like every JSON number in
+    RFC 8785. NaN and Infinity are not valid JSON and raise ValueError.
+    """
+    if isinstance(value, int) and -_MAX_SAFE_INT < value < _MAX_SAFE_INT:
+        return str(int(value))
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{value} is not a valid JSON number")
+    if value == 0:
+        return "0"  # Includes -0
+    magnitude = abs(value)
+    sign = "-" if value < 0 else ""
+    if _REPR_MIN <= magnitude < _REPR_MAX:
+        text = repr(magnitude)
+        return sign + (text[:-2] if text.endswith(".0") else text)
+
+    # Shortest round-trip digits (repr) as digits x 10^(point - len(digits))
+    mantissa, _, exponent = repr(magnitude).partition("e")
+    whole, _, fraction = mantissa.partition(".")
+    combined = whole + fraction
+    stripped = combined.lstrip("0")
+    point = len(whole) + int(exponent or 0) - (len(combined) - len(stripped))
+    digits = stripped.rstrip("0")
+    k = len(digits)
+
+    if k <= point <= 21:
+        return sign + digits + "0" * (point - k)
+    if 0 < point <= 21:
+        return sign + digits[:point] + "." + digits[point:]
+    if -6 < point <= 0:
+        return sign + "0." + "0" * -point + digits
+    e = point - 1
+    exp = f"e{'+' if e >= 0 else '-'}{abs(e)}"
+    return sign + (digits if k == 1 else digits[0] + "." + digits[1:]) + exp
+
+
+def _of_type(values: list, kind: type):
+    """The items of values whose type is exactly kind (filtered without a Python loop)."""
+    return compress(values, map(is_, map(type, values), repeat(kind)))
+
+
+def _plain_numbers(values: list, types: set) -> bool:
+    """Whether json.dumps writes these ints and floats as ECMAScript does."""
+    if int in types:
+        ints = values if types == {int} else list(_of_type(values, int))
+        if max(ints) >= _MAX_SAFE_INT or min(ints) <= -_MAX_SAFE_INT:
+            return False
+    if float in types:
+        floats = values if types == {float} else list(_of_type(values, float))
+        magnitudes = list(map(abs, floats))
+        if min(magnitudes) < _REPR_MIN or max(magnitudes) >= _REPR_MAX or any(map(float.is_integer, floats)):
+            return False
+    return True
+
+
+def _is_plain(obj: Any) -> bool:
+    """
+    Whether json.dumps already writes obj canonically: ASCII string keys
+    and no numbers that ECMAScript formats differently. Checked a level
+    of the tree at a time, each check running over the whole level.
+    """
+    level = [obj]
+    while level:
+        dicts = list(_of_type(level, dict))
+        try:
+            if not "".join(chain.from_iterable(dicts)).isascii():
+                return False
+        except TypeError:
+            return False  # Non-string keys
+        values = list(chain(
+            chain.from_iterable(map(dict.values, dicts)),
+            chain.from_iterable(compress(level, map(is_not, map(type, level), repeat(dict)))),
+        ))
+        types = set(map(type, values))
+        if not types <= _JSON_TYPES:
+            return False
+        if types & _NUMBER_TYPES and not _plain_numbers(values, types):
+            return False
+        if not types & _CONTAINER_TYPES:
+            break
+        level = list(compress(values, map(_CONTAINER_TYPES.__contains__, map(type, values))))
+    return True
+
+
+def _encode_numbers(obj: list | tuple) -> str:
+    """A list of numbers: one json.dumps, then reformat the tokens ECMAScript writes differently."""
+    text = _dumps(obj)
+    # Exponents and whole floats ("1e-05", "2.0", "-0.0"), found without a per-token loop
+    marks = set()
+    for pattern in ("e", ".0,", ".0]"):
+        pos = text.find(pattern)
+        while pos >= 0:
+            marks.add(text.rfind(",", 0, pos) + 1 or 1)
+            pos = text.find(pattern, pos + 1)
+    if not marks:
+        return text
+    parts = []
+    done = 0
+    for start in sorted(marks):
+        end = text.find(",", start)
+        end = len(text) - 1 if end < 0 else end
+        parts.append(text[done:start])
+        parts.append(format_number(float(text[start:end])))
+        done = end
+    parts.append(text[done:])
+    return "".join(parts)
+
+
+def _encode(obj: Any, parts: list[str]) -> None:
+    kind = type(obj)
+    if kind is dict:
+        for key in obj:
+            if type(key) is not str:
+                raise TypeError(f"JSON object keys must be strings, got {type(key).__name__}")
+        # UTF-16 code unit order (the same as code point order for ASCII keys)
+        if "".join(obj).isascii():
+            keys = sorted(obj)
+        else:
+            keys = sorted(obj, key=lambda key: key.encode("utf-16-be", "surrogatepass"))
+        parts.append("{")
+        for i, key in enumerate(keys):
+            if i:
+                parts.append(",")
+            parts.append(encode_basestring(key))
+            parts.append(":")
+            _encode(obj[key], parts)
+        parts.append("}")
+    elif kind is list or kind is tuple:
+        types = set(map(type, obj))
+        if types <= _SCALAR_TYPES:
+            parts.append(_dumps(obj))
+        elif types <= _NUMBER_TYPES and (
+            int not in types or all(-_MAX_SAFE_INT < v < _MAX_SAFE_INT for v in obj if type(v) is int)
+        ):
+            parts.append(_encode_numbers(obj))  # Vectors
+        else:
+            parts.append("[")
+            for i, item in enumerate(obj):
+                if i:
+                    parts.append(",")
+                _encode(item, parts)
+            parts.append("]")
+    elif kind is str:
+        parts.append(encode_basestring(obj))
+    elif obj is None or isinstance(obj, bool):
+        parts.append(_dumps(obj))
+    elif isinstance(obj, (int, float)):
+        parts.append(format_number(obj))
+    elif isinstance(obj, str):
+        parts.append(encode_basestring(str(obj)))
+    elif isinstance(obj, dict):
+        _encode(dict(obj), parts)
+    elif isinstance(obj, (list, tuple)):
+        _encode(list(obj), parts)
+    else:
+        raise TypeError(f"Object of type {kind.__name__} is not JSON serializable")
+
 
 def canonicalize(obj: Any) -> str:
     """
     Serialize a Python object to JCS-canonical JSON.
-    
+
     Rules (RFC 8785):
     - No whitespace
     - Keys sorted lexicographically (by UTF-16 code units)
-    - Numbers: no leading zeros, no trailing zeros after decimal
+    - Numbers: ECMAScript formatting (shortest round-trip, no ".0", 1e+21)
     - Strings: minimal escape sequences
     """
-    return json.dumps(obj, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+    if type(obj) in _CONTAINER_TYPES and _is_plain(obj):
+        return _dumps(obj)  # Common case: nothing json.dumps writes differently
+    parts: list[str] = []
+    _encode(obj, parts)
+    return "".join(parts)
+
+
+def prefixed_digest(data: bytes, algorithm: str = HASH_ALGORITHM) -> str:
+    """
+    Hash bytes with algorithm (default: HASH_ALGORITHM).
+    Returns prefixed hash string: "sha256:..." or "blake2b:..."
+    """
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}")
+    return f"{algorithm}:{HASH_ALGORITHMS[algorithm](data).hexdigest()}"
 
 
-def canonical_hash(obj: Any) -> str:
+def canonical_hash(obj: Any, algorithm: str = HASH_ALGORITHM) -> str:
     """
-    Compute SHA256 hash of the JCS-canonicalized JSON.
-    Returns prefixed hash string: "sha256:..."
+    Compute the hash of the JCS-canonicalized JSON (default: HASH_ALGORITHM).
+    Returns prefixed hash string: "sha256:..." or "blake2b:..."
     """
-    canonical = canonicalize(obj)
-    digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
-    return f"sha256:{digest}"
+    return prefixed_digest(canonicalize(obj).encode('utf-8'), algorithm)
 
 
 def verify_hash(obj: Any, expected_hash: str) -> bool:
     """
-    Verify that an object's canonical hash matches the expected value.
+    Verify that an object's canonical hash matches the expected value,
+    using the algorithm it is prefixed with (bare hex is SHA-256).
     """
-    return canonical_hash(obj) == expected_hash
+    algorithm, sep, digest = expected_hash.rpartition(":")
+    algorithm = algorithm if sep else "sha256"
+    if algorithm not in HASH_ALGORITHMS:
+        return False
+    return canonical_hash(obj, algorithm) == f"{algorithm}:{digest}"
@@ -31,9 +31,25 @@ class ProvenanceInfo(BaseModel):
 
 
 class IntegrityInfo(BaseModel):
-    """Cryptographic integrity fields."""
+    """
+    Cryptographic integrity fields.
+    
+    sha256_canonical keeps its name whatever the algorithm: its value is
+    "<algorithm>:<hex>" (e.g. "blake2b:...") in the algorithm it names.
+    
+    In "vector_digest" mode sha256_canonical covers the payload with
+    embedding.vector replaced by {"dim", "dtype": "float32-le", <algorithm>}
+    (the digest of the vector's little-endian float32 bytes, keyed by the
+    algorithm sha256_canonical names, e.g. "sha256").
+    
+    prev_ledger_hash is the ledger head when the chunk's document was
+    appended: the embed worker appends a document's chunks as one batch, so
+    every chunk in it carries the same value. A chunk's own predecessor in
+    the chain is its ledger entry's prev_hash.
+    """
     sha256_canonical: str
     prev_ledger_hash: str
+    mode: Literal["canonical", "vector_digest"] = "canonical"
 
 
 class ChunkEmbeddingV1(BaseModel):
@@ -2,21 +2,65 @@
 Ledger Service - Append-only JSONL with hash-chain integrity.
 """
 import os
+import sys
 import json
-import hashlib
+import base64
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Any, Optional
 
+sys.path.insert(0, str(Path(__file__).parent))
+from ledger_shared import (
+    HASH_ALGORITHM,
+    LedgerIndex,
+    MerkleAccumulator,
+    compute_hash,
+    index_keys,
+    leaf_hash,
+    verify_hash,
+)
+
 app = FastAPI(title="Docling Ledger", version="1.0.0")
 
-DATA_DIR = Path("/app/data")
+DATA_DIR = Path(os.environ.get("LEDGER_DATA_DIR", "/app/data"))
 LEDGER_FILE = DATA_DIR / "ledger.jsonl"
+VERIFY_CHECKPOINT_FILE = DATA_DIR / "ledger.verify.json"
+INDEX_FILE = DATA_DIR / "ledger.index"
+MERKLE_DIR = DATA_DIR / "ledger.merkle"
+
+# Block size used when seeking backwards from EOF
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Bytes of NDJSON buffered per chunk of a streamed response
+STREAM_CHUNK_SIZE = 64 * 1024
 
-# In-memory state
+# Longest /entries long-poll, and idle seconds between /subscribe keep-alives
+MAX_WAIT = 60.0
+SSE_KEEPALIVE = 15.0
+
+# In-memory state (recovered once at startup). Appends take the next seq,
+# offset and chain head under append_lock (reserved_seq, reserved_offset,
+# last_hash); next_seq and ledger_offset cover the records written so far.
 last_hash: Optional[str] = None
+next_seq: int = 0
+ledger_offset: int = 0
+reserved_seq: int = 0
+reserved_offset: int = 0
+append_lock = asyncio.Lock()
+new_records = asyncio.Condition()  # Notified after each append
+
+# Runs the ledger file, index and Merkle writes off the event loop, one at a
+# time in the order their records were chained (the Merkle files are only
+# touched from this thread)
+writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger-writer")
+write_failed = False  # Set by the writer; later records chain onto the lost one
+index: Optional[LedgerIndex] = None
+merkle: Optional[MerkleAccumulator] = None
 
 
 class LedgerEntry(BaseModel):
@@ -35,76 +79,251 @@ class LedgerRecord(BaseModel):
     entry_hash: str
 
 
-def compute_hash(data: dict) -> str:
-    canonical = json.dumps(data, separators=(',', ':'), sort_keys=True)
-    return f"sha256:{hashlib.sha256(canonical.encode()).hexdigest()}"
+def read_last_record(path: Path) -> Optional[dict]:
+    """Read the last record of the ledger by seeking backwards from EOF."""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            
+            content = buf.rstrip()
+            if not content:
+                continue
+            newline = content.rfind(b"\n")
+            if newline < 0 and pos > 0:
+                continue
+            return json.loads(content[newline + 1:])
+    return None
+
+
+def read_record_at(offset: int, length: Optional[int] = None) -> dict:
+    """Read the record starting at a byte offset."""
+    with open(LEDGER_FILE, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length) if length is not None else f.readline())
+
+
+def sync_index():
+    """
+    Index records appended since the last indexed one.
+    
+    Records only carry the payload hash, so records re-indexed from the
+    file are found by seq and bundle_id; doc_id and chunk_id keys are
+    taken from payloads as they are appended.
+    """
+    last = index.last()
+    offset = last[1] if last else 0
+    if last is not None:
+        stale = offset > ledger_offset
+        if not stale:
+            try:
+                stale = read_record_at(*index.locate(last[0])).get('seq') != last[0]
+            except ValueError:
+                stale = True
+        if stale:
+            index.truncate(0)
+            offset = 0
+    
+    rows = []
+    with open(LEDGER_FILE, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                rows.append((record['seq'], offset, len(line), {"bundle_id": record['bundle_id']}))
+            offset += len(line)
+            if len(rows) >= 10_000:
+                index.add(rows)
+                rows = []
+    index.add(rows)
+
+
+def sync_merkle():
+    """Add Merkle leaves for records appended since the last one."""
+    if merkle.size > next_seq:
+        merkle.truncate(0)
+    elif merkle.size:
+        last = read_record_at(*index.locate(merkle.size - 1))
+        if leaf_hash(last['entry_hash']) != merkle.leaf(merkle.size - 1):
+            merkle.truncate(0)
+    if merkle.size == next_seq:
+        return
+    
+    batch = []
+    with open(LEDGER_FILE, 'rb') as f:
+        f.seek(index.locate(merkle.size)[0])
+        for line in f:
+            if line.strip():
+                batch.append(json.loads(line)['entry_hash'])
+            if len(batch) >= 10_000:
+                merkle.append(batch)
+                batch = []
+    merkle.append(batch)
+    merkle.flush()
 
 
 @app.on_event("startup")
 async def startup():
-    global last_hash
+    global last_hash, next_seq, ledger_offset, reserved_seq, reserved_offset, index, merkle
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Recover last hash from existing ledger
+    # Recover last hash and sequence from the tail of the existing ledger
+    if LEDGER_FILE.exists():
+        record = read_last_record(LEDGER_FILE)
+        if record is not None:
+            last_hash = record.get('entry_hash')
+            next_seq = record['seq'] + 1
+        ledger_offset = LEDGER_FILE.stat().st_size
+        print(f"Recovered ledger state. Next seq: {next_seq}, last hash: {last_hash}")
+    reserved_seq, reserved_offset = next_seq, ledger_offset
+    
+    index = LedgerIndex(INDEX_FILE)
+    merkle = MerkleAccumulator(MERKLE_DIR)
     if LEDGER_FILE.exists():
-        with open(LEDGER_FILE, 'r') as f:
-            for line in f:
-                if line.strip():
-                    record = json.loads(line)
-                    last_hash = record.get('entry_hash')
-        print(f"Recovered ledger state. Last hash: {last_hash}")
+        sync_index()
+        sync_merkle()
+
+
+def write_record(line: bytes, seq: int, offset: int, keys: dict, entry_hash: str):
+    """
+    Append one record to the file, the index and the Merkle files (on the
+    writer thread).
+    
+    After a failed write the records chained onto it cannot be written, so
+    every later write fails too until a restart recovers from the file.
+    """
+    global write_failed
+    if write_failed:
+        raise RuntimeError("An earlier ledger write failed; restart the service to recover")
+    try:
+        with open(LEDGER_FILE, 'ab') as f:
+            f.write(line)
+        index.add([(seq, offset, len(line), keys)])
+        merkle.append([entry_hash])
+        merkle.flush()
+    except Exception:
+        write_failed = True
+        try:
+            os.truncate(LEDGER_FILE, offset)  # Drop a partial line
+        except OSError:
+            pass
+        raise
 
 
 @app.post("/append", response_model=LedgerRecord)
 async def append_entry(entry: LedgerEntry):
-    global last_hash
+    global last_hash, next_seq, ledger_offset, reserved_seq, reserved_offset
     
-    # Read current sequence number
-    seq = 0
-    if LEDGER_FILE.exists():
-        with open(LEDGER_FILE, 'r') as f:
-            seq = sum(1 for _ in f)
+    # Compute payload hash (independent of chain state)
+    payload = entry.payload if isinstance(entry.payload, dict) else {"value": entry.payload}
+    payload_hash = compute_hash(payload, HASH_ALGORITHM)
+    keys = {**index_keys(entry.payload), "bundle_id": entry.bundle_id}
     
-    # Compute payload hash
-    payload_hash = compute_hash(entry.payload if isinstance(entry.payload, dict) else {"value": entry.payload})
+    async with append_lock:
+        if write_failed:
+            raise HTTPException(status_code=503, detail="Ledger write failed; restart the service to recover")
+        
+        seq, offset = reserved_seq, reserved_offset
+        
+        # Build record
+        record_data = {
+            "seq": seq,
+            "timestamp": datetime.utcnow().isoformat(),
+            "type": entry.type,
+            "bundle_id": entry.bundle_id,
+            "payload_hash": payload_hash,
+            "prev_hash": last_hash
+        }
+        
+        # Compute entry hash (includes prev_hash for chain)
+        entry_hash = compute_hash(record_data, HASH_ALGORITHM)
+        record_data["entry_hash"] = entry_hash
+        line = (json.dumps(record_data) + '\n').encode()
+        
+        # Queue the write; the writer keeps records in the order they were chained
+        written = asyncio.get_running_loop().run_in_executor(
+            writer, write_record, line, seq, offset, keys, entry_hash
+        )
+        last_hash = entry_hash
+        reserved_seq += 1
+        reserved_offset += len(line)
     
-    # Build record
-    record_data = {
-        "seq": seq,
-        "timestamp": datetime.utcnow().isoformat(),
-        "type": entry.type,
-        "bundle_id": entry.bundle_id,
-        "payload_hash": payload_hash,
-        "prev_hash": last_hash
-    }
+    try:
+        await written
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ledger write failed: {e}")
     
-    # Compute entry hash (includes prev_hash for chain)
-    entry_hash = compute_hash(record_data)
-    record_data["entry_hash"] = entry_hash
+    # Every earlier record was written before this one, so the written range
+    # grows even if appends resume out of order
+    next_seq = max(next_seq, seq + 1)
+    ledger_offset = max(ledger_offset, offset + len(line))
+    async with new_records:
+        new_records.notify_all()
+    
+    return LedgerRecord(**record_data)
+
+
+def read_verify_checkpoint() -> Optional[dict]:
+    """
+    Load the verification checkpoint, if it still matches the ledger.
     
-    # Append to ledger
-    with open(LEDGER_FILE, 'a') as f:
-        f.write(json.dumps(record_data) + '\n')
+    The record ending at the checkpoint offset must still carry the
+    checkpointed seq and entry_hash.
+    """
+    try:
+        checkpoint = json.loads(VERIFY_CHECKPOINT_FILE.read_text())
+        offset = checkpoint["offset"]
+    except (OSError, ValueError, KeyError):
+        return None
     
-    last_hash = entry_hash
+    if not 0 < offset <= LEDGER_FILE.stat().st_size:
+        return None
+    with open(LEDGER_FILE, 'rb') as f:
+        f.seek(max(0, offset - TAIL_BLOCK_SIZE))
+        tail = f.read(offset - f.tell())
+    if not tail.endswith(b"\n"):
+        return None
     
-    return LedgerRecord(**record_data)
+    try:
+        record = json.loads(tail[tail.rfind(b"\n", 0, len(tail) - 1) + 1:])
+    except ValueError:
+        return None
+    if record.get('seq') != checkpoint.get('seq') or record.get('entry_hash') != checkpoint.get('entry_hash'):
+        return None
+    return checkpoint
 
 
-@app.get("/verify")
-async def verify_chain():
-    """Verify the integrity of the hash chain."""
-    if not LEDGER_FILE.exists():
-        return {"status": "empty", "entries": 0}
+def write_verify_checkpoint(seq: int, offset: int, entry_hash: str):
+    """Atomically record the last verified (seq, offset, entry_hash)."""
+    tmp = VERIFY_CHECKPOINT_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"seq": seq, "offset": offset, "entry_hash": entry_hash}))
+    os.replace(tmp, VERIFY_CHECKPOINT_FILE)
+
+
+def verify_records(offset: int, end: int, prev: Optional[str], to_seq: Optional[int] = None) -> dict:
+    """
+    Verify records between two byte offsets, starting from a known prev hash.
     
-    prev = None
+    Returns the verification result plus the last verified position.
+    """
     count = 0
-    
-    with open(LEDGER_FILE, 'r') as f:
-        for line in f:
+    last_seq = None
+    with open(LEDGER_FILE, 'rb') as f:
+        f.seek(offset)
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
             if not line.strip():
                 continue
             record = json.loads(line)
+            if to_seq is not None and record['seq'] > to_seq:
+                break
             
             # Check prev_hash linkage
             if record.get('prev_hash') != prev:
@@ -112,14 +331,284 @@ async def verify_chain():
             
             # Verify entry_hash
             check_data = {k: v for k, v in record.items() if k != 'entry_hash'}
-            expected_hash = compute_hash(check_data)
-            if record['entry_hash'] != expected_hash:
+            if not verify_hash(check_data, record['entry_hash']):
                 return {"status": "broken", "at_seq": record['seq'], "reason": "entry_hash mismatch"}
             
             prev = record['entry_hash']
+            last_seq = record['seq']
             count += 1
     
-    return {"status": "verified", "entries": count, "head_hash": prev}
+    return {"status": "verified", "entries": count, "head_hash": prev, "last_seq": last_seq, "offset": offset}
+
+
+@app.get("/verify")
+async def verify_chain(full: bool = False, from_seq: Optional[int] = None, to_seq: Optional[int] = None):
+    """
+    Verify the integrity of the hash chain.
+    
+    By default verification resumes from the last verified checkpoint;
+    full=true re-verifies from seq 0. from_seq/to_seq verify only that
+    range (linked to the record before from_seq) and leave the checkpoint
+    untouched.
+    """
+    if not LEDGER_FILE.exists():
+        return {"status": "empty", "entries": 0}
+    
+    end = ledger_offset or LEDGER_FILE.stat().st_size
+    
+    # Range verification
+    if from_seq is not None:
+        if from_seq <= 0:
+            prev, start = None, 0
+        else:
+            location = index.locate(from_seq - 1)
+            if location is None:
+                raise HTTPException(status_code=404, detail=f"seq {from_seq - 1} not found")
+            prev, start = read_record_at(*location)['entry_hash'], sum(location)
+        result = verify_records(start, end, prev, to_seq)
+        result.pop("offset")
+        return {"from_seq": max(from_seq, 0), **result}
+    
+    # Incremental verification from the checkpoint
+    checkpoint = None if full else read_verify_checkpoint()
+    if checkpoint is not None:
+        result = verify_records(checkpoint["offset"], end, checkpoint["entry_hash"])
+        if result["status"] == "verified":
+            result["entries"] += checkpoint["seq"] + 1
+        result["resumed_from_seq"] = checkpoint["seq"]
+    else:
+        result = verify_records(0, end, None)
+    
+    if result["status"] == "verified" and result["last_seq"] is not None:
+        write_verify_checkpoint(result["last_seq"], result["offset"], result["head_hash"])
+    result.pop("offset", None)
+    result.pop("last_seq", None)
+    return result
+
+
+@app.get("/entry/{seq}", response_model=LedgerRecord)
+async def get_entry(seq: int):
+    """Get a single record by seq (one seek and read)."""
+    location = index.locate(seq)
+    if location is None:
+        raise HTTPException(status_code=404, detail=f"seq {seq} not found")
+    return LedgerRecord(**read_record_at(*location))
+
+
+@app.get("/find")
+async def find_entries(
+    doc_id: Optional[str] = None,
+    chunk_id: Optional[str] = None,
+    bundle_id: Optional[str] = None,
+    limit: int = 100,
+):
+    """Find records by doc_id, chunk_id and/or bundle_id, in seq order."""
+    keys = {"doc_id": doc_id, "chunk_id": chunk_id, "bundle_id": bundle_id}
+    keys = {k: v for k, v in keys.items() if v is not None}
+    if not keys:
+        raise HTTPException(status_code=400, detail="doc_id, chunk_id or bundle_id is required")
+    
+    records = [read_record_at(*index.locate(seq)) for seq in index.find(limit=limit, **keys)]
+    return {"entries": records}
+
+
+def encode_cursor(seq: int, offset: int) -> str:
+    """Opaque cursor for the record with the given seq at a byte offset."""
+    raw = json.dumps({"seq": seq, "offset": offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """(seq, offset) of a cursor, checked against the ledger."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        seq, offset = int(position["seq"]), int(position["offset"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # The cursor must point at a record start (or at the end of the ledger)
+    location = index.locate(seq)
+    expected = location[0] if location is not None else (ledger_offset if seq == next_seq else None)
+    if expected != offset:
+        raise HTTPException(status_code=400, detail="Cursor does not match the ledger")
+    return seq, offset
+
+
+def iter_records(seq: int, offset: int, end: int):
+    """
+    Yield (line, seq, offset) for records from a byte offset up to end.
+    
+    seq and offset are the position after the record, as a cursor stores it.
+    """
+    with open(LEDGER_FILE, 'rb') as f:
+        f.seek(offset)
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            if line.strip():
+                seq += 1
+                yield line, seq, offset
+
+
+def read_records(seq: int, offset: int, end: int, limit: int, event: Optional[str]) -> tuple[list, int, int]:
+    """
+    Read up to limit records (of type event, if given) from a byte offset.
+    
+    Returns the (line, seq, offset) records and the position after the
+    last record read, which is past any records the filter skipped.
+    """
+    records = []
+    for line, seq, offset in iter_records(seq, offset, end):
+        if event is None or json.loads(line).get('type') == event:
+            records.append((line, seq, offset))
+            if len(records) >= limit:
+                break
+    return records, seq, offset
+
+
+def stream_records(seq: int, offset: int, end: int, limit: int, event: Optional[str]):
+    """
+    Yield NDJSON chunks of records from a byte offset up to end.
+    
+    The file is read line by line; records are passed through as stored.
+    The last line is {"cursor": ...}, pointing after the last record read.
+    """
+    chunk = []
+    size = 0
+    count = 0
+    for line, seq, offset in iter_records(seq, offset, end):
+        if event is not None and json.loads(line).get('type') != event:
+            continue
+        chunk.append(line)
+        size += len(line)
+        count += 1
+        if count >= limit:
+            break
+        if size >= STREAM_CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    chunk.append(json.dumps({"cursor": encode_cursor(seq, offset)}).encode() + b"\n")
+    yield b"".join(chunk)
+
+
+def start_position(from_seq: int, cursor: Optional[str]) -> tuple[int, int]:
+    """(seq, offset) to read from, given a cursor or a starting seq."""
+    if cursor is not None:
+        return decode_cursor(cursor)
+    if from_seq >= next_seq:
+        return next_seq, ledger_offset
+    return from_seq, index.locate(from_seq)[0]
+
+
+async def wait_for_records(offset: int, timeout: float) -> bool:
+    """Wait until the ledger extends past offset; False on timeout."""
+    async with new_records:
+        try:
+            await asyncio.wait_for(new_records.wait_for(lambda: ledger_offset > offset), timeout)
+        except asyncio.TimeoutError:
+            return False
+    return True
+
+
+@app.get("/entries")
+async def list_entries(
+    from_seq: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=100_000),
+    event: Optional[str] = None,
+    cursor: Optional[str] = None,
+    wait: float = Query(0.0, ge=0.0, le=MAX_WAIT),
+):
+    """
+    Stream records in seq order as NDJSON, starting at from_seq or a cursor.
+    
+    Returns up to limit records (of type event, if given). The final line
+    is {"cursor": ...}; pass it back as ?cursor= to continue after the last
+    record read. A filtered scan resumes after the records it skipped.
+    With wait > 0, a request at the head of the ledger is held for up to
+    wait seconds until a record is appended (long-poll tailing).
+    """
+    seq, offset = start_position(from_seq, cursor)
+    if wait and offset >= ledger_offset:
+        await wait_for_records(offset, wait)
+    end = ledger_offset  # Records appended while streaming are left for the next page
+    
+    return StreamingResponse(
+        stream_records(seq, offset, end, limit, event),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.get("/subscribe")
+async def subscribe(
+    request: Request,
+    from_seq: int = Query(0, ge=0),
+    event: Optional[str] = None,
+    cursor: Optional[str] = None,
+    batch: int = Query(100, ge=1, le=10_000),
+):
+    """
+    Server-sent events: records from from_seq or a cursor, then new records as they are appended.
+    
+    Each event's data is a record as stored and its id is the cursor after
+    it, so a reconnecting EventSource resumes through Last-Event-ID. The
+    next batch is only read from the file once the previous one has been
+    sent, so a slow subscriber holds at most one batch in memory. While
+    idle, a comment is sent every SSE_KEEPALIVE seconds.
+    """
+    seq, offset = start_position(from_seq, cursor or request.headers.get("last-event-id"))
+    
+    async def events():
+        nonlocal seq, offset
+        while True:
+            if offset >= ledger_offset and not await wait_for_records(offset, SSE_KEEPALIVE):
+                yield b": keepalive\n\n"
+                continue
+            records, seq, offset = await asyncio.to_thread(read_records, seq, offset, ledger_offset, batch, event)
+            if records:
+                yield b"".join(
+                    b"id: %s\ndata: %s\n\n" % (encode_cursor(s, o).encode(), line.rstrip())
+                    for line, s, o in records
+                )
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/merkle/root")
+async def merkle_root():
+    """Current Merkle root over all record hashes."""
+    def snapshot():
+        return {"tree_size": merkle.size, "root": merkle.root().hex()}
+    
+    return await asyncio.get_running_loop().run_in_executor(writer, snapshot)
+
+
+@app.get("/merkle/proof/{seq}")
+async def inclusion_proof(seq: int, tree_size: Optional[int] = None):
+    """
+    O(log n) inclusion proof for one record (RFC 9162 audit path).
+    
+    Leaves are SHA-256(0x00 || entry_hash), nodes SHA-256(0x01 || left || right).
+    """
+    def prove():
+        size = merkle.size if tree_size is None else tree_size
+        if not 0 <= seq < size <= merkle.size:
+            raise HTTPException(status_code=404, detail=f"seq {seq} not in tree of size {size}")
+        return size, merkle.proof(seq, size), merkle.root(size)
+    
+    # On the writer thread, which owns the Merkle files
+    size, audit_path, root = await asyncio.get_running_loop().run_in_executor(writer, prove)
+    
+    record = read_record_at(*index.locate(seq))
+    return {
+        "seq": seq,
+        "tree_size": size,
+        "entry_hash": record['entry_hash'],
+        "audit_path": [node.hex() for node in audit_path],
+        "root": root.hex(),
+    }
 
 
 @app.get("/health")
@@ -0,0 +1,176 @@
+"""
+Ledger Follower - read-only replica of the ledger service.
+
+Tails GET /entries with a long-poll cursor and appends each record to a
+local JSONL file, byte-for-byte as the service stores it. Every record is
+checked before it is written: its seq must follow the replica's head, its
+prev_hash must link to the replica's last entry_hash and its entry_hash
+must match the record. Nothing in the replica is rewritten; a record that
+fails a check stops the follower.
+
+Usage:
+    python ledger_follower.py --url http://ledger:8001 --path ./replica/ledger.jsonl
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from ledger_shared import verify_hash
+
+# Records requested per long-poll, and seconds each poll is held at the head
+BATCH_SIZE = 1000
+POLL_WAIT = 30.0
+
+# Block size used when seeking backwards from EOF
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+class ReplicaError(Exception):
+    """A record from the primary does not extend the replica's chain."""
+
+
+class LedgerFollower:
+    """
+    Local append-only replica kept in sync with a ledger service.
+    """
+
+    def __init__(self, url: str, path: str | Path, batch_size: int = BATCH_SIZE, wait: float = POLL_WAIT):
+        self.url = url.rstrip('/')
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.wait = wait
+        self.next_seq = 0
+        self.last_hash: Optional[str] = None
+        self.cursor: Optional[str] = None
+        self._recover()
+
+    def _recover(self):
+        """Resume from the replica's last complete record."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb+') as f:
+            # Read backwards from EOF until the last complete record is in hand
+            size = pos = f.seek(0, os.SEEK_END)
+            tail = b""
+            while True:
+                complete = tail[:tail.rfind(b"\n") + 1]
+                if pos == 0 or b"\n" in complete.rstrip():
+                    break
+                step = min(TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+            if pos + len(complete) < size:
+                f.truncate(pos + len(complete))  # Drop a record cut short by a crash
+        last = complete.rstrip().rsplit(b"\n", 1)[-1]
+        if last:
+            record = json.loads(last)
+            self.next_seq = record['seq'] + 1
+            self.last_hash = record['entry_hash']
+
+    def check(self, line: bytes) -> dict:
+        """Check that a record extends the replica's chain; returns it parsed."""
+        record = json.loads(line)
+        if record.get('seq') != self.next_seq:
+            raise ReplicaError(f"Expected seq {self.next_seq}, got {record.get('seq')}")
+        if record.get('prev_hash') != self.last_hash:
+            raise ReplicaError(f"prev_hash mismatch at seq {self.next_seq}")
+        if not verify_hash({k: v for k, v in record.items() if k != 'entry_hash'}, record.get('entry_hash') or ""):
+            raise ReplicaError(f"entry_hash mismatch at seq {self.next_seq}")
+        return record
+
+    def apply(self, body: bytes) -> int:
+        """
+        Check and append the records of one /entries response.
+
+        The checked records are written (and fsynced) together before the
+        cursor advances; returns the number of records appended.
+
+        A body cut short (no trailing cursor line, or a partial record)
+        raises ValueError without changing the replica.
+        """
+        lines = body.splitlines()
+        try:
+            cursor = json.loads(lines.pop())['cursor']
+        except (IndexError, KeyError, TypeError, ValueError):
+            raise ValueError("Truncated /entries response (no cursor line)") from None
+
+        next_seq, last_hash = self.next_seq, self.last_hash
+        try:
+            for line in lines:
+                record = self.check(line)
+                self.next_seq, self.last_hash = record['seq'] + 1, record['entry_hash']
+        except (ReplicaError, ValueError):
+            self.next_seq, self.last_hash = next_seq, last_hash
+            raise
+
+        if lines:
+            with open(self.path, 'ab') as f:
+                f.write(b"".join(line + b"\n" for line in lines))
+                f.flush()
+                os.fsync(f.fileno())
+        self.cursor = cursor
+        return len(lines)
+
+    def fetch(self) -> bytes:
+        """One long-poll /entries request from the replica's position."""
+        params = {"limit": self.batch_size, "wait": self.wait}
+        if self.cursor is not None:
+            params["cursor"] = self.cursor
+        else:
+            params["from_seq"] = self.next_seq
+        url = f"{self.url}/entries?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(url, timeout=self.wait + 30) as response:
+            return response.read()
+
+    def poll(self) -> int:
+        """Fetch and apply one page; returns the number of records appended."""
+        return self.apply(self.fetch())
+
+    def run(self):
+        """
+        Follow the primary until interrupted.
+
+        Connection failures, responses cut short and truncated batches are
+        retried from the last applied cursor; a ReplicaError stops it.
+        """
+        delay = 1.0
+        while True:
+            try:
+                count = self.poll()
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                print(f"[follower] {e}; retrying in {delay:.0f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 60.0)
+                continue
+            delay = 1.0
+            if count:
+                print(f"[follower] Replicated to seq {self.next_seq - 1}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only ledger replica")
+    parser.add_argument("--url", default=os.environ.get("LEDGER_URL", "http://localhost:8001"))
+    parser.add_argument("--path", default=os.environ.get("REPLICA_PATH", "./replica/ledger.jsonl"))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    follower = LedgerFollower(args.url, args.path, batch_size=args.batch_size)
+    print(f"[follower] Following {follower.url} into {follower.path} from seq {follower.next_seq}")
+    try:
+        follower.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
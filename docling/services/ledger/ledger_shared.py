@@ -0,0 +1,56 @@
+"""
+Code the ledger service and follower share with the embedded ledger.
+
+The sidecar index (ledger/index.py), the Merkle files (ledger/merkle.py)
+and the digest algorithms (common/canonicalize.py) are loaded straight
+from their files, so that importing them does not import the rest of the
+ledger and common packages (common needs torch). The service image copies
+those files to the same paths relative to this one.
+"""
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from types import ModuleType
+
+# Root of the docling tree (or of the service image)
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _load(name: str, path: Path) -> ModuleType:
+    """Import a module from a file under the given name (once per process)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_index = _load("ledger_index", ROOT / "ledger" / "index.py")
+_merkle = _load("ledger_merkle", ROOT / "ledger" / "merkle.py")
+_canonicalize = _load("ledger_canonicalize", ROOT / "common" / "canonicalize.py")
+
+LedgerIndex = _index.LedgerIndex
+index_keys = _index.index_keys
+MerkleAccumulator = _merkle.MerkleAccumulator
+leaf_hash = _merkle.leaf_hash
+verify_inclusion = _merkle.verify_inclusion
+HASH_ALGORITHMS = _canonicalize.HASH_ALGORITHMS
+HASH_ALGORITHM = _canonicalize.HASH_ALGORITHM
+
+
+def compute_hash(data: dict, algorithm: str = HASH_ALGORITHM) -> str:
+    """Prefixed digest of a record as the service stores it (sorted keys, ASCII-escaped JSON)."""
+    canonical = json.dumps(data, separators=(',', ':'), sort_keys=True)
+    return f"{algorithm}:{_canonicalize.hash_hex(canonical.encode(), algorithm)}"
+
+
+def verify_hash(data: dict, digest: str) -> bool:
+    """Check data against a digest with the algorithm it names (bare hex is sha256)."""
+    try:
+        algorithm, hex_digest = _canonicalize.split_digest(digest)
+    except ValueError:
+        return False
+    return compute_hash(data, algorithm) == f"{algorithm}:{hex_digest}"
@@ -0,0 +1,199 @@
+"""
+Canonicalize Test - CanonicalEncoder against jcs_canonical_bytes.
+"""
+import hashlib
+import random
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common import canonicalize
+from docling.common.canonicalize import (
+    CanonicalEncoder,
+    canonical_bytes_vector_digest,
+    hash_canonical,
+    hash_canonical_vector_digest,
+    hash_canonical_without_integrity,
+    hash_hex_many,
+    hash_many,
+    jcs_canonical_bytes,
+    sha256_many,
+    split_digest,
+    vector_commitment,
+    verify_digest,
+    verify_integrity,
+)
+from docling.ledger import Ledger
+
+
+def make_chunk_payload(i, dim=384):
+    rng = random.Random(i)
+    return {
+        "schema": "chunk.embedding.v1",
+        "doc_id": f"sha256:{i:064x}",
+        "chunk_id": f"sha256:{i + 1:064x}",
+        "chunker": {"version": "chunk.v1", "params": {"max_tokens": 400, "overlap": 60}},
+        "embedding": {
+            "model_id": "all-MiniLM-L6-v2",
+            "dim": dim,
+            "vector": [rng.uniform(-1, 1) for _ in range(dim)],
+        },
+        "provenance": {"source_block_refs": [{"page": 1, "block": j, "note": "é ✓"} for j in range(3)]},
+    }
+
+
+def test_encoder_matches_jcs_canonical_bytes():
+    """Encoded bytes and hashes should be identical to the one-shot functions."""
+    encoder = CanonicalEncoder()
+    samples = [
+        make_chunk_payload(1),
+        {"b": [1, {"d": None, "c": True}, (2.5, "x")], "a": {"nested": [[1, 2], []]}, "u": "ü "},
+        {"scalars": 1, "only": "here"},
+        {2: [{"k": 1}], 1: "non-str keys"},
+        [1, 2, 3],
+        "text",
+    ]
+    for obj in samples:
+        assert encoder.encode(obj) == jcs_canonical_bytes(obj), f"Mismatch for {obj!r:.60}"
+    for obj in samples[:4]:
+        assert encoder.hash(obj) == hash_canonical(obj)
+
+    payload = make_chunk_payload(2)
+    payload["integrity"] = {"sha256_canonical": "sha256:0", "prev_ledger_hash": None}
+    assert encoder.hash_without_integrity(payload) == hash_canonical_without_integrity(payload)
+
+
+def test_encoder_reuses_cached_subtrees():
+    """An unchanged vector should be encoded once; a resized one re-encoded."""
+    encoder = CanonicalEncoder()
+    payload = make_chunk_payload(3)
+    encoder.hash_without_integrity(payload)
+    cached = encoder._cache[id(payload["embedding"]["vector"])][2]
+
+    payload["integrity"] = {"sha256_canonical": "sha256:0", "prev_ledger_hash": None}
+    data = encoder.encode(payload)
+    assert data == jcs_canonical_bytes(payload)
+    assert cached in data and encoder._cache[id(payload["embedding"]["vector"])][2] is cached
+
+    payload["embedding"]["vector"].append(0.5)
+    assert encoder.encode(payload) == jcs_canonical_bytes(payload), "A resized list is re-encoded"
+
+
+def test_incremental_hash_spans_chunks():
+    """Hashing in pieces should match hashing the joined bytes, for large payloads too."""
+    encoder = CanonicalEncoder(min_cached_size=10**9)  # Nothing cached
+    payload = {f"k{i}": make_chunk_payload(i, dim=768)["embedding"] for i in range(40)}
+    digest = hashlib.sha256()
+    encoder.update(digest, payload)
+    assert digest.hexdigest() == hash_canonical(payload)
+
+
+def test_ledger_append_with_encoder():
+    """Appending with an encoder should write the same entries as without one."""
+    with tempfile.TemporaryDirectory() as tmp:
+        encoder = CanonicalEncoder()
+        payloads = [make_chunk_payload(i) for i in range(3)]
+        for p in payloads:
+            p["integrity"] = {"sha256_canonical": f"sha256:{encoder.hash_without_integrity(p)}"}
+
+        ledger = Ledger(Path(tmp) / "ledger.jsonl")
+        ledger.append_many((("chunk.embedding.v1", p) for p in payloads), encoder)
+        ledger.append("chunk.embedding.v1", payloads[0], encoder)
+        ledger.close()
+
+        ok, errors = Ledger(Path(tmp) / "ledger.jsonl").verify()
+        assert ok, errors
+        lines = (Path(tmp) / "ledger.jsonl").read_bytes().splitlines()
+        assert all(jcs_canonical_bytes(payloads[i % 3]) in line for i, line in enumerate(lines))
+
+
+def test_vector_digest_integrity():
+    """Vector digest payloads should verify without serializing the vector, legacy ones as before."""
+    payload = make_chunk_payload(4)
+    vector = [struct.unpack("<f", struct.pack("<f", v))[0] for v in payload["embedding"]["vector"]]
+    payload["embedding"]["vector"] = vector
+
+    commitment = vector_commitment(vector)
+    assert commitment["dim"] == 384 and commitment["dtype"] == "float32-le"
+    assert commitment["sha256"] == hashlib.sha256(struct.pack("<384f", *vector)).hexdigest()
+
+    digest = hash_canonical_vector_digest(payload)
+    assert digest != hash_canonical_without_integrity(payload)
+    payload["integrity"] = {"sha256_canonical": f"sha256:{digest}", "prev_ledger_hash": None, "mode": "vector_digest"}
+    assert verify_integrity(payload)
+
+    legacy = make_chunk_payload(5)
+    legacy["integrity"] = {"sha256_canonical": f"sha256:{hash_canonical_without_integrity(legacy)}"}
+    assert verify_integrity(legacy), "Records without a mode keep verifying"
+
+    original = vector[7]
+    vector[7] = struct.unpack("<f", struct.pack("<f", original + 1e-3))[0]
+    assert not verify_integrity(payload), "A changed vector must fail"
+    vector[7] = original * (1 + 1e-12)
+    assert hash_canonical_vector_digest(payload) == digest
+    assert not verify_integrity(payload), "Digits below float32 precision must fail too"
+
+
+def test_digest_prefixes_select_algorithm():
+    """Digests should be verified with the algorithm their prefix names."""
+    data = b"canonical bytes"
+    blake = hashlib.blake2b(data, digest_size=32).hexdigest()
+    assert split_digest(f"blake2b:{blake}") == ("blake2b", blake)
+    assert split_digest(hashlib.sha256(data).hexdigest())[0] == "sha256", "Bare hex is SHA-256"
+    assert verify_digest(data, f"blake2b:{blake}") and verify_digest(data, hashlib.sha256(data).hexdigest())
+    assert not verify_digest(data, f"sha256:{blake}")
+    try:
+        split_digest("md5:00")
+        assert False, "Unknown algorithms should be rejected"
+    except ValueError:
+        pass
+
+    payload = make_chunk_payload(6)
+    payload["embedding"]["vector"] = [0.5, -0.25, 1.0]
+    assert CanonicalEncoder().hash_without_integrity(payload, "blake2b") == hash_canonical_without_integrity(
+        payload, "blake2b"
+    )
+    for mode, hasher in (("canonical", hash_canonical_without_integrity), ("vector_digest", hash_canonical_vector_digest)):
+        digest = hasher(payload, "blake2b")
+        payload["integrity"] = {"sha256_canonical": f"blake2b:{digest}", "mode": mode}
+        assert verify_integrity(payload), mode
+        payload["integrity"]["sha256_canonical"] = f"sha256:{digest}"
+        assert not verify_integrity(payload), f"{mode}: the prefix selects the algorithm"
+    assert set(vector_commitment(payload["embedding"]["vector"], "blake2b")) == {"dim", "dtype", "blake2b"}
+
+def test_batch_hashing_matches_one_at_a_time():
+    """hash_many / sha256_many should return the sequential digests, in order, with or without the pool."""
+    texts = [("chunk %d " % i * 400).encode() for i in range(64)]
+    payloads = [make_chunk_payload(i) for i in range(16)]
+    saved = canonicalize.HASH_THREADS, canonicalize.PARALLEL_HASH_MIN_BYTES
+    try:
+        for threads, min_bytes in ((1, 1024 * 1024), (4, 0)):
+            canonicalize.HASH_THREADS, canonicalize.PARALLEL_HASH_MIN_BYTES = threads, min_bytes
+            assert sha256_many(texts) == [hashlib.sha256(t).hexdigest() for t in texts], threads
+            assert hash_hex_many(texts, "blake2b") == [hashlib.blake2b(t, digest_size=32).hexdigest() for t in texts]
+            assert hash_many(payloads) == [hash_canonical(p) for p in payloads], threads
+            encoder = CanonicalEncoder()
+            assert hash_many(payloads, "sha256", encoder.encode_without_integrity) == [
+                hash_canonical_without_integrity(p) for p in payloads
+            ]
+            assert hash_many(payloads, "sha256", canonical_bytes_vector_digest) == [
+                hash_canonical_vector_digest(p) for p in payloads
+            ]
+            assert sha256_many([]) == [] and sha256_many([b"x"]) == [hashlib.sha256(b"x").hexdigest()]
+        assert canonicalize._hash_pool is not None, "Large batches should have used the pool"
+    finally:
+        canonicalize.HASH_THREADS, canonicalize.PARALLEL_HASH_MIN_BYTES = saved
+
+
+if __name__ == "__main__":
+    test_encoder_matches_jcs_canonical_bytes()
+    test_encoder_reuses_cached_subtrees()
+    test_incremental_hash_spans_chunks()
+    test_ledger_append_with_encoder()
+    test_vector_digest_integrity()
+    test_digest_prefixes_select_algorithm()
+    test_batch_hashing_matches_one_at_a_time()
+    print("All canonicalize tests passed!")
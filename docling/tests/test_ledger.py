@@ -0,0 +1,495 @@
+"""
+Ledger Test - Hash-chain append, recovery and verification.
+Runs against a temporary ledger file (no services needed).
+"""
+import json
+import multiprocessing
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.canonicalize import hash_canonical, jcs_canonical_bytes
+from docling.ledger import Ledger, LedgerClient, LedgerDaemon, segments, verify_inclusion
+from docling.ledger.ledger import read_tail_line
+from docling.ledger.merkle import leaf_hash, merkle_root
+from docling.ledger.parallel import verify_parallel
+
+
+def _fill(ledger, n, start=0):
+    """Append n small chunk events."""
+    for i in range(start, start + n):
+        ledger.append("chunk.embedding.v1", {"doc_id": "doc-1", "chunk_id": f"c{i}"})
+
+
+def test_recovery_from_checkpoint():
+    """Reopening a ledger should restore head hash and entry count."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path, checkpoint_interval=4)
+        _fill(ledger, 10)
+        head = ledger.get_prev_hash()
+
+        checkpoint = json.loads(ledger.checkpoint_path.read_text())
+        assert checkpoint["seq"] == 7, "Checkpoint should cover the last full interval"
+
+        reopened = Ledger(path, checkpoint_interval=4)
+        assert reopened.get_prev_hash() == head, "Head hash should be recovered"
+        assert len(reopened) == 10, "Entry count should be recovered"
+
+        checkpoint = json.loads(reopened.checkpoint_path.read_text())
+        assert checkpoint["seq"] == 9, "Recovery should refresh a stale checkpoint"
+        assert checkpoint["offset"] == path.stat().st_size
+
+
+def test_recovery_ignores_invalid_checkpoint():
+    """A checkpoint that no longer matches the ledger should be discarded."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path, checkpoint_interval=2)
+        _fill(ledger, 5)
+        head = ledger.get_prev_hash()
+
+        ledger.checkpoint_path.write_text(json.dumps({
+            "seq": 1, "offset": 17, "head_hash": "bogus"
+        }))
+
+        reopened = Ledger(path)
+        assert reopened.get_prev_hash() == head, "Head hash should come from the tail"
+        assert len(reopened) == 5, "Entry count should fall back to a full count"
+
+        _fill(reopened, 1, start=5)
+        ok, errors = reopened.verify()
+        assert ok, f"Chain should remain valid: {errors}"
+
+
+def test_append_many_chains_batch():
+    """A batch should chain exactly like individual appends."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        _fill(ledger, 2)
+        entries = ledger.append_many(
+            ("chunk.embedding.v1", {"chunk_id": f"b{i}"}) for i in range(5)
+        )
+
+        assert len(entries) == 5 and len(ledger) == 7
+        assert entries[1]["prev_hash"] == entries[0]["entry_hash"], "Batch should be chained"
+        assert ledger.get_prev_hash() == entries[-1]["entry_hash"]
+        assert ledger.append_many([]) == [], "Empty batch should be a no-op"
+
+        ok, errors = ledger.verify()
+        assert ok, f"Chain should be valid: {errors}"
+
+
+def test_prepared_entries_match_canonical_form():
+    """Entries hashed before the lock should be byte-identical to canonical JSON."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        first = ledger.append("doc.normalized.v1", {"z": 1, "a": {"ü": "naïve", "b": [1.5, None]}})
+        second = ledger.append_many([("chunk.embedding.v1", {"text": "日本語 \"quoted\""})])[0]
+
+        lines = path.read_bytes().splitlines(keepends=True)
+        for entry, line in zip((first, second), lines):
+            assert line == jcs_canonical_bytes(entry) + b"\n", "Line should be canonical JSON"
+            unhashed = {k: v for k, v in entry.items() if k != "entry_hash"}
+            assert entry["entry_hash"] == hash_canonical(unhashed)
+        assert second["prev_hash"] == first["entry_hash"]
+
+
+def test_group_commit_close_persists():
+    """Group-commit appends should all be on disk after close."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        with Ledger(path, durability="group", flush_interval=10, fsync_interval=None) as ledger:
+            _fill(ledger, 20)
+            head = ledger.get_prev_hash()
+
+        reopened = Ledger(path)
+        assert len(reopened) == 20, "All buffered entries should be committed"
+        assert reopened.get_prev_hash() == head
+
+
+def test_incremental_verify_resumes_from_checkpoint():
+    """Verification should resume after the last verified entry."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        _fill(ledger, 5)
+        assert ledger.verify() == (True, [])
+
+        checkpoint = json.loads(ledger.verify_checkpoint_path.read_text())
+        assert checkpoint["seq"] == 4 and checkpoint["offset"] == path.stat().st_size
+
+        _fill(ledger, 3, start=5)
+        assert ledger.verify() == (True, [])
+        assert json.loads(ledger.verify_checkpoint_path.read_text())["seq"] == 7
+
+        # Tamper with an already verified entry: only a full pass re-checks it
+        lines = path.read_bytes().splitlines(keepends=True)
+        lines[1] = lines[1].replace(b'"c1"', b'"cX"')
+        path.write_bytes(b"".join(lines))
+
+        assert ledger.verify() == (True, []), "Verified prefix is not re-hashed"
+        ok, errors = ledger.verify(full=True)
+        assert not ok and errors[0].startswith("Line 2: entry_hash mismatch")
+
+
+def test_incremental_verify_detects_rewritten_checkpoint_entry():
+    """A changed checkpoint entry should force a full verification."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        _fill(ledger, 3)
+        ledger.verify()
+
+        lines = path.read_bytes().splitlines(keepends=True)
+        lines[-1] = lines[-1].replace(b'"c2"', b'"cX"')
+        path.write_bytes(b"".join(lines))
+
+        ok, errors = ledger.verify()
+        assert not ok and errors[0].startswith("Line 3: entry_hash mismatch")
+
+
+def test_parallel_verify_matches_sequential():
+    """Parallel verification should report the same errors in the same order."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        _fill(ledger, 40)
+
+        lines = path.read_bytes().splitlines(keepends=True)
+        lines[3] = lines[3].replace(b'"c3"', b'"cX"')  # entry_hash mismatch
+        lines[17] = b"{not json\n"  # Invalid JSON, breaks the next link
+        del lines[30]  # prev_hash mismatch
+        path.write_bytes(b"".join(lines))
+
+        start = {"seq": -1, "offset": 0, "line": 0, "entry_hash": None}
+        expected, expected_last = ledger._verify_from(start)
+        for ranges in (1, 3, 7, 39):
+            errors, last = verify_parallel(path, start, workers=2, ranges=ranges)
+            assert errors == expected, f"Errors should match with {ranges} ranges"
+            assert last == expected_last
+
+
+def test_get_and_find_use_index():
+    """Entries should be retrievable by seq and payload keys."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        _fill(ledger, 3)
+        ledger.append("doc.normalized.v1", {"doc_id": "doc-2", "bundle_id": "b-1"})
+        _fill(ledger, 2, start=3)
+
+        assert ledger.get(1)["payload"]["chunk_id"] == "c1"
+        assert ledger.get(3)["event_type"] == "doc.normalized.v1"
+        assert ledger.get(99) is None
+
+        found = ledger.find(doc_id="doc-1")
+        assert [e["payload"]["chunk_id"] for e in found] == ["c0", "c1", "c2", "c3", "c4"]
+        assert ledger.find(doc_id="doc-1", chunk_id="c4") == [ledger.get(5)]
+        assert ledger.find(bundle_id="b-1") == [ledger.get(3)]
+        assert len(ledger.find(doc_id="doc-1", limit=2)) == 2
+        assert [e["payload"]["chunk_id"] for e in ledger.iter_entries(4)] == ["c3", "c4"]
+
+
+def test_index_catches_up_and_rebuilds():
+    """The index should follow entries written without it and rebuild when stale."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        _fill(Ledger(path), 2)
+        _fill(Ledger(path, index=False), 2, start=2)
+
+        ledger = Ledger(path)
+        assert ledger.get(3)["payload"]["chunk_id"] == "c3", "Index should catch up"
+
+        # Replace the ledger with different content
+        path.unlink()
+        other = Ledger(path, index=False)
+        other.append("x", {"doc_id": "doc-9"})
+        other.append("x", {"doc_id": "doc-9", "chunk_id": "long" * 50})
+
+        ledger = Ledger(path)
+        assert [e["payload"]["doc_id"] for e in ledger.find(doc_id="doc-9")] == ["doc-9"] * 2
+        assert ledger.find(doc_id="doc-1") == [], "Stale keys should be dropped"
+
+
+def test_merkle_inclusion_proofs():
+    """Every entry should have a verifiable inclusion proof."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        _fill(Ledger(path), 5)  # Written before the tree existed
+
+        ledger = Ledger(path, merkle=True)
+        _fill(ledger, 8, start=5)
+        root = ledger.merkle_root()
+        assert root["tree_size"] == 13
+
+        for seq in range(13):
+            proof = ledger.inclusion_proof(seq)
+            assert len(proof["audit_path"]) <= 4, "Proof should be O(log n)"
+            assert verify_inclusion(
+                proof["entry_hash"], seq, proof["tree_size"], proof["audit_path"], root["root"]
+            ), f"Proof for seq {seq} should verify"
+
+        old = ledger.inclusion_proof(2, tree_size=6)
+        assert verify_inclusion(old["entry_hash"], 2, 6, old["audit_path"], old["root"])
+        assert not verify_inclusion(
+            ledger.get(3)["entry_hash"], 2, 6, old["audit_path"], old["root"]
+        ), "Proof should not verify another entry"
+
+        ledger.close()
+        assert Ledger(path, merkle=True).merkle_root() == root, "Tree should persist"
+
+
+def test_segments_read_and_verify_across_rotation():
+    """Sealed segments should be transparent to readers, verify and reopen."""
+    frame_size = segments.FRAME_SIZE
+    segments.FRAME_SIZE = 300  # Several frames per segment
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ledger.jsonl"
+            ledger = Ledger(path, merkle=True, segment_max_entries=5)
+            _fill(ledger, 23)
+
+            manifest = json.loads((Path(tmp) / "ledger.jsonl.segments" / "manifest.json").read_bytes())
+            sealed = manifest["segments"]
+            assert [(m["first_seq"], m["last_seq"]) for m in sealed] == [
+                (0, 4), (5, 9), (10, 14), (15, 19)
+            ], "Segments should rotate every 5 entries"
+            assert all(len(m["frames"]) > 1 for m in sealed), "Segments should be framed"
+            assert len(path.read_bytes().splitlines()) == 3, "Active file holds the tail"
+
+            entries = list(ledger.iter_entries())
+            assert [e["payload"]["chunk_id"] for e in entries] == [f"c{i}" for i in range(23)]
+            assert sealed[1]["head_hash"] == entries[9]["entry_hash"]
+            assert sealed[1]["root"] == merkle_root(
+                [leaf_hash(e["entry_hash"]) for e in entries[5:10]]
+            ).hex(), "Segment root should cover its entries"
+
+            assert [ledger.get(seq) for seq in range(23)] == entries
+            assert [e["payload"]["chunk_id"] for e in ledger.iter_entries(13)][:2] == ["c13", "c14"]
+            assert ledger.find(doc_id="doc-1", chunk_id="c7") == [entries[7]]
+            proof = ledger.inclusion_proof(6)
+            assert verify_inclusion(
+                proof["entry_hash"], 6, proof["tree_size"], proof["audit_path"], proof["root"]
+            )
+
+            assert ledger.verify() == (True, [])
+            ledger.close()
+
+            ledger = Ledger(path, segment_max_entries=5)
+            assert len(ledger) == 23 and ledger.get_prev_hash() == entries[-1]["entry_hash"]
+            _fill(ledger, 4, start=23)
+            assert ledger.verify() == (True, []), "Incremental verify should cross a rotation"
+            assert ledger.verify(full=True) == (True, [])
+            assert len(list(ledger.iter_entries())) == 27
+    finally:
+        segments.FRAME_SIZE = frame_size
+
+
+def test_get_during_rotations():
+    """get() should return the right entry while appends keep rotating the active file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(Path(tmp) / "ledger.jsonl", segment_max_entries=3)
+        _fill(ledger, 3)
+        done = threading.Event()
+        writer = threading.Thread(target=lambda: (_fill(ledger, 300, start=3), done.set()))
+        writer.start()
+        checked = 0
+        while not done.is_set() or checked < 300:
+            seq = max(0, len(ledger) - 1 - checked % 4)
+            entry = ledger.get(seq)
+            assert entry is not None and entry["payload"]["chunk_id"] == f"c{seq}", seq
+            checked += 1
+        writer.join()
+        ledger.close()
+
+
+def test_segments_verify_detects_tampering_and_recovers_rotation():
+    """verify() should check segment records; a half-done rotation should be undone."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path, segment_max_entries=4)
+        _fill(ledger, 10)
+        ledger.close()
+
+        # Crash after sealing, before the active file was replaced
+        manifest_path = Path(tmp) / "ledger.jsonl.segments" / "manifest.json"
+        active = path.read_bytes()
+        store = segments.SegmentStore(manifest_path.parent)
+        store.seal(path, 8)
+        path.write_bytes(active)
+
+        ledger = Ledger(path, segment_max_entries=4)
+        assert len(ledger) == 10 and path.read_bytes() == b"", "Sealed copy should be dropped"
+        assert ledger.verify(full=True) == (True, [])
+
+        manifest = json.loads(manifest_path.read_bytes())
+        manifest["segments"][1]["root"] = "00" * 32
+        manifest_path.write_text(json.dumps(manifest))
+
+        valid, errors = Ledger(path).verify(full=True)
+        assert not valid
+        assert errors == [
+            f"Segment 000000000004.seg: root mismatch. Expected {ledger._segments.segments[1]['root']}, "
+            f"got {'00' * 32}"
+        ]
+
+
+def test_blob_store_for_large_payloads():
+    """Large payloads should be stored as blobs and rehydrated on read."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path, blob_threshold=1024)
+        vector = [i / 384 for i in range(384)]
+        big = {"doc_id": "doc-1", "chunk_id": "c0", "embedding": {"vector": vector}}
+        ledger.append("doc.normalized.v1", {"doc_id": "doc-1"})
+        entry = ledger.append("chunk.embedding.v1", big)
+        ledger.append("chunk.embedding.v1", dict(big, chunk_id="c1"))
+        ledger.append("chunk.embedding.v1", big)  # Same content, same blob
+
+        stub = entry["payload"]
+        assert stub["$blob"].startswith("sha256:") and stub["chunk_id"] == "c0"
+        assert "vector" not in path.read_text(), "Vectors should not be inline"
+        assert len(list((Path(tmp) / "ledger.jsonl.blobs").rglob("*"))) == 4, "2 blobs, 2 fan-out dirs"
+
+        assert ledger.get(1)["payload"] == big
+        assert ledger.get(1, resolve=False) == entry
+        assert ledger.get(0)["payload"] == {"doc_id": "doc-1"}, "Small payloads stay inline"
+        assert [e["payload"]["chunk_id"] for e in ledger.find(doc_id="doc-1")[1:]] == ["c0", "c1", "c0"]
+        assert ledger.verify() == (True, [])
+
+        blob = next(p for p in (Path(tmp) / "ledger.jsonl.blobs").rglob("*") if p.is_file())
+        blob.write_bytes(blob.read_bytes().replace(b"doc-1", b"doc-2"))
+        try:
+            [ledger.get(seq) for seq in (1, 2)]
+            assert False, "A tampered blob should not resolve"
+        except ValueError:
+            pass
+
+
+def test_mixed_hash_algorithms_verify():
+    """Entries hashed with BLAKE2b should chain onto and verify alongside SHA-256 ones."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        ledger = Ledger(path)
+        _fill(ledger, 5)
+        ledger.close()
+
+        ledger = Ledger(path, hash_algorithm="blake2b", blob_threshold=256)
+        _fill(ledger, 5, start=5)
+        entry = ledger.append("chunk.embedding.v1", {"doc_id": "doc-1", "vector": [i / 7 for i in range(64)]})
+        assert entry["entry_hash"].startswith("blake2b:") and entry["payload"]["$blob"].startswith("blake2b:")
+        entries = [json.loads(line) for line in path.read_bytes().splitlines()]
+        assert ":" not in entries[4]["entry_hash"] and entries[5]["prev_hash"] == entries[4]["entry_hash"]
+        assert ledger.get(10)["payload"]["vector"][7] == 1.0
+        assert ledger.verify(full=True) == (True, [])
+        start = {"seq": -1, "offset": 0, "line": 0, "entry_hash": None}
+        assert verify_parallel(path, start, workers=2, ranges=3)[0] == []
+        ledger.close()
+
+        lines = path.read_bytes().splitlines(keepends=True)
+        lines[7] = lines[7].replace(b'"c7"', b'"cX"')
+        lines[2] = lines[2].replace(b'"c2"', b'"cX"')
+        path.write_bytes(b"".join(lines))
+        ok, errors = Ledger(path, index=False).verify(full=True)
+        assert not ok and [e.split(":")[0] for e in errors] == ["Line 3", "Line 8"], errors
+
+
+def _append_through_daemon(socket_path, worker, n):
+    client = LedgerClient(socket_path)
+    receipts = [client.append("chunk.embedding.v1", {"chunk_id": f"w{worker}-{i}"}) for i in range(n)]
+    receipts += client.append_many(
+        ("chunk.embedding.v1", {"chunk_id": f"w{worker}-batch-{i}"}) for i in range(n)
+    )
+    return receipts
+
+
+def test_daemon_serializes_appends_from_processes():
+    """Appends from several processes should form one chain through the daemon."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ledger.jsonl"
+        socket_path = Path(tmp) / "ledger.sock"
+        daemon = LedgerDaemon(Ledger(path), socket_path)
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            results = pool.starmap(_append_through_daemon, [(socket_path, w, 10) for w in range(4)])
+        receipts = [r for worker in results for r in worker]
+
+        client = LedgerClient(socket_path)
+        assert len(client) == 80
+        assert sorted(r["seq"] for r in receipts) == list(range(80)), "Seqs should be unique"
+        by_seq = {r["seq"]: r for r in receipts}
+        assert all(by_seq[seq]["prev_hash"] == by_seq[seq - 1]["entry_hash"] for seq in range(1, 80))
+        assert client.get_prev_hash() == by_seq[79]["entry_hash"]
+        try:
+            client._call({"op": "append", "events": [["x", "not a length", {}]]})
+            assert False, "Malformed events should be rejected"
+        except RuntimeError:
+            pass
+        assert len(client) == 80, "The client should reconnect after a rejected request"
+        for body in (b'{"b":1,"a":2}', b'{"a":1}\n{"a":2}', b'[1]', b'{"a": 1}'):
+            try:
+                client._call({"op": "append", "events": [["x", len(body)]]}, body)
+                assert False, f"Non-canonical payload {body!r} should be rejected"
+            except RuntimeError as e:
+                assert "Payload 0" in str(e), e
+        assert len(client) == 80, "Rejected payloads should not be appended"
+
+        # A bad header declaring a payload: the payload must not be parsed as the next request
+        smuggled = json.dumps({"op": "append", "events": [["x", 2]]}).encode() + b"\n{}"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            header = json.dumps({"op": "append", "events": [["x", -len(smuggled)]]}).encode()
+            sock.sendall(header + b"\n" + smuggled)
+            reply = sock.makefile("rb")
+            assert json.loads(reply.readline())["error"].startswith("Bad request")
+            assert reply.readline() == b"", "The daemon should close the connection after a bad request"
+        assert len(client) == 80, "Payload bytes should never be appended as a request"
+        client.close()
+        daemon.close()
+
+        ledger = Ledger(path)
+        assert ledger.verify() == (True, [])
+        assert [e["entry_hash"] for e in ledger.iter_entries()] == [by_seq[s]["entry_hash"] for s in range(80)]
+
+
+def test_read_tail_line_spans_blocks():
+    """Tail reads should handle lines larger than one seek block."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.jsonl"
+        long_line = b"x" * 200_000 + b"\n"
+        path.write_bytes(b"first\n" + long_line + b"\n\n")
+
+        offset, line = read_tail_line(path)
+        assert offset == 6, "Offset should point at the start of the last line"
+        assert line == long_line, "Last line should be returned with its newline"
+        assert read_tail_line(path, end=6) == (0, b"first\n")
+
+
+if __name__ == "__main__":
+    test_recovery_from_checkpoint()
+    test_recovery_ignores_invalid_checkpoint()
+    test_append_many_chains_batch()
+    test_prepared_entries_match_canonical_form()
+    test_group_commit_close_persists()
+    test_incremental_verify_resumes_from_checkpoint()
+    test_incremental_verify_detects_rewritten_checkpoint_entry()
+    test_parallel_verify_matches_sequential()
+    test_get_and_find_use_index()
+    test_index_catches_up_and_rebuilds()
+    test_merkle_inclusion_proofs()
+    test_segments_read_and_verify_across_rotation()
+    test_get_during_rotations()
+    test_segments_verify_detects_tampering_and_recovers_rotation()
+    test_blob_store_for_large_payloads()
+    test_mixed_hash_algorithms_verify()
+    test_daemon_serializes_appends_from_processes()
+    test_read_tail_line_spans_blocks()
+    print("All ledger tests passed!")
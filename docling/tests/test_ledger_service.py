@@ -0,0 +1,382 @@
+"""
+Ledger Service Test - /append sequencing and /verify.
+Runs the FastAPI app in-process against a temporary data directory.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+
+SERVICE_PATH = Path(__file__).parent.parent / "services" / "ledger" / "ledger.py"
+
+
+def load_service(data_dir):
+    """Import a fresh copy of the ledger service bound to data_dir."""
+    os.environ["LEDGER_DATA_DIR"] = str(data_dir)
+    spec = importlib.util.spec_from_file_location("ledger_service", SERVICE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _append_concurrently(service, n):
+    await service.startup()
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        responses = await asyncio.gather(*[
+            client.post("/append", json={"type": "test", "bundle_id": "b1", "payload": {"i": i}})
+            for i in range(n)
+        ])
+        verify = await client.get("/verify")
+    return [r.json() for r in responses], verify.json()
+
+
+def test_concurrent_appends_get_unique_seqs():
+    """Concurrent appends should get consecutive, unique sequence numbers."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(tmp)
+        records, verify = asyncio.run(_append_concurrently(service, 50))
+
+        assert sorted(r["seq"] for r in records) == list(range(50)), "Seqs should be unique"
+        assert verify["status"] == "verified", f"Chain should verify: {verify}"
+        assert verify["entries"] == 50
+
+
+def test_sequence_recovered_at_startup():
+    """A restarted service should continue the sequence and chain."""
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_append_concurrently(load_service(tmp), 3))
+
+        service = load_service(tmp)
+        records, verify = asyncio.run(_append_concurrently(service, 2))
+
+        assert sorted(r["seq"] for r in records) == [3, 4], "Sequence should resume"
+        assert service.ledger_offset == (Path(tmp) / "ledger.jsonl").stat().st_size
+        assert verify["status"] == "verified", f"Chain should verify: {verify}"
+
+
+async def _verify(service, **params):
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        return (await client.get("/verify", params=params)).json()
+
+
+async def _append_with_failed_write(service):
+    await service.startup()
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        post = lambda i: client.post("/append", json={"type": "test", "bundle_id": "b1", "payload": {"i": i}})
+        await post(0)
+        append, service.merkle.append = service.merkle.append, None  # Fails after the line is written
+        failed = await post(1)
+        service.merkle.append = append
+        return failed.status_code, (await post(2)).status_code
+
+
+def test_failed_write_stops_appends():
+    """A failed write should be undone in the file and refuse appends chained after it until a restart."""
+    with tempfile.TemporaryDirectory() as tmp:
+        failed, after = asyncio.run(_append_with_failed_write(load_service(tmp)))
+        assert (failed, after) == (500, 503)
+        assert len((Path(tmp) / "ledger.jsonl").read_text().splitlines()) == 1, "The partial write should be removed"
+
+        records, verify = asyncio.run(_append_concurrently(load_service(tmp), 2))
+        assert sorted(r["seq"] for r in records) == [1, 2], "A restart should resume after the last written record"
+        assert verify["status"] == "verified", f"Chain should verify: {verify}"
+
+
+def test_verify_checkpoint_and_range():
+    """Verification should resume from its checkpoint and support ranges."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(tmp)
+        asyncio.run(_append_concurrently(service, 10))
+
+        result = asyncio.run(_verify(service))
+        assert result["status"] == "verified" and result["entries"] == 10
+        assert result["resumed_from_seq"] == 9, "Second pass should resume from the checkpoint"
+
+        result = asyncio.run(_verify(service, full=True))
+        assert result["entries"] == 10 and "resumed_from_seq" not in result
+
+        result = asyncio.run(_verify(service, from_seq=4, to_seq=6))
+        assert result["status"] == "verified" and result["entries"] == 3
+        assert result["last_seq"] == 6
+
+
+def test_hash_algorithm_switch_keeps_verifying():
+    """Records hashed with BLAKE2b after a restart should chain onto and verify with SHA-256 ones."""
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_append_concurrently(load_service(tmp), 3))
+
+        service = load_service(tmp)
+        service.HASH_ALGORITHM = "blake2b"
+        records, verify = asyncio.run(_append_concurrently(service, 2))
+        assert all(r["entry_hash"].startswith("blake2b:") for r in records)
+        assert verify["status"] == "verified", f"Chain should verify: {verify}"
+        assert asyncio.run(_verify(service, full=True))["entries"] == 5
+
+        lines = (Path(tmp) / "ledger.jsonl").read_text().splitlines()
+        record = json.loads(lines[3])
+        assert record["payload_hash"].startswith("blake2b:") and record["prev_hash"].startswith("sha256:")
+        record["entry_hash"] = "sha256:" + record["entry_hash"].split(":")[1]
+        assert not service.verify_hash({k: v for k, v in record.items() if k != "entry_hash"}, record["entry_hash"])
+
+
+async def _lookups(service):
+    await service.startup()
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        for i in range(4):
+            await client.post("/append", json={
+                "type": "chunk.embedding.v1",
+                "bundle_id": f"b{i % 2}",
+                "payload": {"doc_id": "d1", "chunk_id": f"c{i}"},
+            })
+        entry = (await client.get("/entry/2")).json()
+        missing = await client.get("/entry/99")
+        by_doc = (await client.get("/find", params={"doc_id": "d1"})).json()
+        by_both = (await client.get("/find", params={"chunk_id": "c3", "bundle_id": "b1"})).json()
+    return entry, missing, by_doc, by_both
+
+
+def test_entry_and_find_lookups():
+    """Records should be retrievable by seq and indexed keys."""
+    with tempfile.TemporaryDirectory() as tmp:
+        entry, missing, by_doc, by_both = asyncio.run(_lookups(load_service(tmp)))
+
+        assert entry["seq"] == 2 and entry["bundle_id"] == "b0"
+        assert missing.status_code == 404
+        assert [r["seq"] for r in by_doc["entries"]] == [0, 1, 2, 3]
+        assert [r["seq"] for r in by_both["entries"]] == [3]
+
+
+async def _proofs(service, n):
+    records, _ = await _append_concurrently(service, n)
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        root = (await client.get("/merkle/root")).json()
+        proofs = [(await client.get(f"/merkle/proof/{seq}")).json() for seq in range(n)]
+        missing = await client.get(f"/merkle/proof/{n}")
+    return root, proofs, missing
+
+
+def test_merkle_proofs():
+    """Each record should have an inclusion proof against the current root."""
+    sys.path.insert(0, str(SERVICE_PATH.parent))
+    from ledger_shared import verify_inclusion
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root, proofs, missing = asyncio.run(_proofs(load_service(tmp), 7))
+
+        assert root["tree_size"] == 7 and missing.status_code == 404
+        for proof in proofs:
+            assert proof["root"] == root["root"]
+            assert verify_inclusion(
+                proof["entry_hash"], proof["seq"], proof["tree_size"], proof["audit_path"], proof["root"]
+            ), f"Proof for seq {proof['seq']} should verify"
+
+
+def _ndjson(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]["cursor"]
+
+
+async def _entries(service):
+    await service.startup()
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        for i in range(6):
+            await client.post("/append", json={
+                "type": "doc.normalized.v1" if i % 3 == 0 else "chunk.embedding.v1",
+                "bundle_id": "b1",
+                "payload": {"i": i},
+            })
+        pages = []
+        page, cursor = _ndjson(await client.get("/entries", params={"from_seq": 1, "limit": 2}))
+        pages.append(page)
+        page, cursor = _ndjson(await client.get("/entries", params={"cursor": cursor}))
+        pages.append(page)
+        tail, tail_cursor = _ndjson(await client.get("/entries", params={"cursor": cursor}))
+        await client.post("/append", json={"type": "test", "bundle_id": "b1", "payload": {"i": 6}})
+        tailed, _ = _ndjson(await client.get("/entries", params={"cursor": tail_cursor}))
+        filtered, _ = _ndjson(await client.get("/entries", params={"event": "doc.normalized.v1"}))
+        bad = await client.get("/entries", params={"cursor": cursor[:-4] + "AAAA"})
+    return pages, tail, tailed, filtered, bad
+
+
+def test_entries_stream_with_cursor():
+    """/entries should page through records with a cursor and pick up new ones."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pages, tail, tailed, filtered, bad = asyncio.run(_entries(load_service(tmp)))
+
+        assert [r["seq"] for r in pages[0]] == [1, 2]
+        assert [r["seq"] for r in pages[1]] == [3, 4, 5], "Cursor should resume after the last record"
+        assert tail == [], "Nothing new at the head"
+        assert [r["seq"] for r in tailed] == [6], "Tail cursor should return new records"
+        assert [r["seq"] for r in filtered] == [0, 3]
+        assert all("entry_hash" in r for r in pages[0])
+        assert bad.status_code == 400
+
+
+async def _sse_events(service, n, **params):
+    """Drive /subscribe as raw ASGI until n events arrive, appending one record mid-stream."""
+    query = "&".join(f"{k}={v}" for k, v in params.items()).encode()
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "path": "/subscribe",
+        "raw_path": b"/subscribe", "query_string": query, "headers": [], "scheme": "http",
+        "server": ("ledger", 80), "client": ("test", 1), "root_path": "",
+    }
+    body = []
+    done = asyncio.Event()
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if b"".join(body).count(b"\n\n") >= n:
+                done.set()
+
+    task = asyncio.create_task(service.app(scope, receive, send))
+    await asyncio.sleep(0.1)
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        await client.post("/append", json={"type": "live", "bundle_id": "b1", "payload": {"i": "live"}})
+    await asyncio.wait_for(done.wait(), 5)
+    disconnect.set()
+    task.cancel()
+    events = []
+    for block in b"".join(body).decode().split("\n\n")[:n]:
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["id"], json.loads(fields["data"])))
+    return events
+
+
+async def _tail(service):
+    records, _ = await _append_concurrently(service, 3)
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        _, cursor = _ndjson(await client.get("/entries"))
+        poll = asyncio.create_task(client.get("/entries", params={"cursor": cursor, "wait": 5}))
+        await asyncio.sleep(0.1)
+        assert not poll.done(), "Long-poll at the head should wait for a record"
+        await client.post("/append", json={"type": "test", "bundle_id": "b1", "payload": {"i": 3}})
+        polled, _ = _ndjson(await poll)
+    events = await _sse_events(service, 3, from_seq=2)
+    return polled, events
+
+
+def test_tail_long_poll_and_subscribe():
+    """Long-poll and SSE subscribers should receive records appended after they connect."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(tmp)
+        polled, events = asyncio.run(_tail(service))
+
+        assert [r["seq"] for r in polled] == [3]
+        assert [record["seq"] for _, record in events] == [2, 3, 4]
+        assert events[-1][1]["type"] == "live"
+        assert service.decode_cursor(events[-1][0]) == (5, service.ledger_offset), "Event id is the cursor"
+
+
+async def _follow(service, follower, pages):
+    await service.startup()
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ledger") as client:
+        for i in range(5):
+            await client.post("/append", json={"type": "test", "bundle_id": "b1", "payload": {"i": i}})
+        for _ in range(pages):
+            params = {"cursor": follower.cursor} if follower.cursor else {"from_seq": follower.next_seq}
+            follower.apply((await client.get("/entries", params={**params, "limit": 2})).content)
+
+
+def test_follower_replicates_and_verifies():
+    """The follower should mirror the ledger, resume after a restart and reject a broken chain."""
+    sys.path.insert(0, str(SERVICE_PATH.parent))
+    from ledger_follower import LedgerFollower, ReplicaError
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(Path(tmp) / "primary")
+        replica = Path(tmp) / "replica" / "ledger.jsonl"
+        follower = LedgerFollower("http://ledger", replica)
+        asyncio.run(_follow(service, follower, 2))
+        assert follower.next_seq == 4
+
+        with open(replica, "ab") as f:
+            f.write(b'{"seq": 4, "trunc')  # Crash mid-write
+        follower = LedgerFollower("http://ledger", replica)
+        assert follower.next_seq == 4, "Restart should resume after the last complete record"
+        asyncio.run(_follow(load_service(Path(tmp) / "primary"), follower, 3))
+        assert replica.read_bytes() == service.LEDGER_FILE.read_bytes()[:replica.stat().st_size]
+        assert follower.next_seq == 10
+
+        forged = json.loads(service.LEDGER_FILE.read_text().splitlines()[-1])
+        forged.update(seq=10, prev_hash=follower.last_hash, bundle_id="forged")
+        try:
+            follower.apply(json.dumps(forged).encode() + b'\n{"cursor": "x"}\n')
+            assert False, "A record with a stale entry_hash should be rejected"
+        except ReplicaError as e:
+            assert "entry_hash mismatch" in str(e)
+        assert follower.next_seq == 10 and len(replica.read_text().splitlines()) == 10
+
+
+def test_follower_retries_truncated_responses():
+    """A response cut mid-body should be retried from the last applied cursor, not kill the follower."""
+    sys.path.insert(0, str(SERVICE_PATH.parent))
+    import http.client
+    import ledger_follower
+    from ledger_follower import LedgerFollower
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = load_service(Path(tmp) / "primary")
+        replica = Path(tmp) / "replica" / "ledger.jsonl"
+        follower = LedgerFollower("http://ledger", replica)
+        asyncio.run(_follow(service, follower, 1))
+        cursor, lines = follower.cursor, service.LEDGER_FILE.read_bytes().splitlines(keepends=True)
+
+        for body in (lines[2], lines[2] + lines[3][:20], b""):
+            try:
+                follower.apply(body)
+                assert False, "A truncated body should be rejected"
+            except ValueError:
+                pass
+            assert (follower.next_seq, follower.cursor) == (2, cursor), "A truncated body should change nothing"
+        assert len(replica.read_bytes().splitlines()) == 2
+
+        failures = [http.client.IncompleteRead(b"partial"), ValueError("Truncated /entries response")]
+        def poll():
+            if failures:
+                raise failures.pop(0)
+            raise KeyboardInterrupt
+        follower.poll = poll
+        sleep, ledger_follower.time.sleep = ledger_follower.time.sleep, lambda s: None
+        try:
+            follower.run()
+            assert False, "run() should only stop on KeyboardInterrupt here"
+        except KeyboardInterrupt:
+            pass
+        finally:
+            ledger_follower.time.sleep = sleep
+        assert not failures, "Both failures should have been retried"
+
+
+if __name__ == "__main__":
+    test_concurrent_appends_get_unique_seqs()
+    test_sequence_recovered_at_startup()
+    test_failed_write_stops_appends()
+    test_verify_checkpoint_and_range()
+    test_hash_algorithm_switch_keeps_verifying()
+    test_entry_and_find_lookups()
+    test_merkle_proofs()
+    test_entries_stream_with_cursor()
+    test_tail_long_poll_and_subscribe()
+    test_follower_replicates_and_verifies()
+    test_follower_retries_truncated_responses()
+    print("All ledger service tests passed!")
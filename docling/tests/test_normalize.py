@@ -0,0 +1,172 @@
+"""
+Normalize Test - normalize_text fast paths against the plain pipeline.
+"""
+import random
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.normalize import (
+    CellNormalizer,
+    l2_normalize,
+    l2_normalize_,
+    l2_normalize_numpy,
+    l2_normalize_numpy_,
+    normalize_many,
+    normalize_stream,
+    normalize_text,
+)
+
+
+def reference_normalize_text(text):
+    """normalize_text as originally written (NFKC, then every step unconditionally)."""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[^\S\n]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+SAMPLES = [
+    "", " ", "42", " 1,234.50 ", "Total  revenue", "a\tb", "line\r\nbreak\rmore",
+    "para\n\n\n\nnext", "\n \n \n", "x\x0b\x0cy", "\x1c\x1dsep\x1e\x1f", "nul\x00byte", "del\x7f",
+    "café", "ﬁnance", "Ｆｕｌｌ　ｗｉｄｔｈ", "non breaking", "é", "²³", " sep ",
+    "next\x85line", "  mixed \t ü  \r\n\r\n\r\n end  ",
+]
+
+
+def test_matches_reference_pipeline():
+    """Fast paths should produce exactly what the plain pipeline does."""
+    rng = random.Random(11)
+    alphabet = "ab 1.\t\n\r\x0b\x1c\x85 　éﬁ²́"
+    samples = SAMPLES + ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(3000)]
+    for text in samples:
+        assert normalize_text(text) == reference_normalize_text(text), f"Mismatch for {text!r}"
+
+
+def test_normalize_many_matches_normalize_text():
+    """The batch entry point should match element by element, repeats included."""
+    cells = SAMPLES * 3 + ["  dup  "] * 5
+    assert normalize_many(cells) == [normalize_text(c) for c in cells]
+    assert normalize_many(iter(cells)) == normalize_many(cells)
+    assert normalize_many([]) == []
+
+
+def test_cell_normalizer_caches_repeats():
+    """Repeated cells should be served from the cache, with bounded size and exact counters."""
+    rows = [["0", " N/A ", "kg", f"row {i}"] for i in range(100)]
+    cells = CellNormalizer(max_entries=8)
+    table = cells.normalize_table(rows)
+    assert table == [[normalize_text(c) for c in row] for row in rows]
+    assert cells.misses == 3 + 100 and cells.hits == 3 * 100 - 3, (cells.hits, cells.misses)
+    assert cells.normalize.cache_info().currsize == 8, "The cache should stay bounded"
+    assert cells.normalize_row(["kg", "new"]) == ["kg", "new"] and cells.misses == 104
+    cells.clear()
+    assert cells.hits == cells.misses == 0
+
+
+def _split(text, rng, max_size):
+    pieces = []
+    while text:
+        size = rng.randint(0, max_size)
+        pieces.append(text[:size])
+        text = text[size:]
+    return pieces
+
+
+def test_stream_matches_whole_string():
+    """Streamed output should equal normalize_text of the joined pieces, however they are split."""
+    cases = [
+        ["line\r", "\nnext"],  # CRLF split across pieces
+        ["a  ", " \t ", "  b"],  # Whitespace run across pieces
+        ["p\n", "\n", "\n\n", "q"],  # Newline run across pieces
+        ["cafe", "\u0301", " x"],  # Combining accent after the base letter's piece
+        ["\u1100", "\u1161", "\u11a8"],  # Hangul jamo composing across pieces
+        ["ﬁ", "nance", "　", "ｘ"],  # Compatibility characters
+        ["  ", "\n\n", ""],  # Only whitespace
+        ["", "  lead", "ing", "  ", "trail  ", "\r\n"],
+        [],
+    ]
+    for pieces in cases:
+        assert "".join(normalize_stream(pieces)) == normalize_text("".join(pieces)), pieces
+        assert "".join(normalize_stream(iter(pieces))) == normalize_text("".join(pieces))
+
+    rng = random.Random(5)
+    alphabet = "ab .\t\n\n\r\r\x0b\x85 　éﬁ²\u0301\u0323\u1100\u1161\u11a8ｘ"
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        pieces = _split(text, rng, rng.choice([1, 3, 10]))
+        out = list(normalize_stream(pieces))
+        assert "".join(out) == normalize_text(text), f"Mismatch for {pieces!r}"
+        assert all(out), "No empty pieces should be yielded"
+
+
+def test_stream_splits_non_ascii_text():
+    """Text with no ASCII at all should still be cut at safe boundaries, and match normalize_text."""
+    rng = random.Random(7)
+    # CJK, kana with combining and halfwidth voiced marks, Hangul syllables and jamo,
+    # Oriya vowel parts that compose (starter second), compatibility and space characters
+    alphabet = "日本語か\u3099ｶﾞ가각\u1100\u1161\u11a8é\u0301\u0b47\u0b3e①ﬁ\u3000\u00a0\u0085 "
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        pieces = _split(text, rng, rng.choice([1, 2, 5]))
+        assert "".join(normalize_stream(pieces)) == normalize_text(text), f"Mismatch for {pieces!r}"
+
+    paragraph = "".join(rng.choice("日本語の文章を正規化する。ﾃｷｽﾄ　가나다") for _ in range(1000)) + "\u3000\n"
+    text = paragraph * 2000  # About 2M characters, none ASCII but the newlines
+    piece = 64 * 1024
+    out = list(normalize_stream(text[i:i + piece] for i in range(0, len(text), piece)))
+    assert "".join(out) == normalize_text(text)
+    assert len(out) > 1 and max(map(len, out)) <= 2 * piece, "Non-ASCII text should not pile up in one piece"
+
+
+def test_l2_normalize_in_place_and_out():
+    """Blocked in-place and out= normalization should match the allocating versions and keep dtypes."""
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((1000, 64)).astype(np.float32)
+    x[3] = 0  # Zero rows stay zero
+    expected = l2_normalize_numpy(x.astype(np.float64))
+
+    half = x.astype(np.float16)
+    assert np.allclose(l2_normalize_numpy_(half, block_rows=64), expected, atol=1e-3) and not half[3].any()
+
+    for block_rows in (1, 7, 1000, 5000):
+        y = x.copy()
+        assert l2_normalize_numpy_(y, block_rows=block_rows) is y and y.dtype == np.float32
+        assert np.allclose(y, expected, atol=1e-6) and not y[3].any(), block_rows
+        out = np.empty_like(x)
+        l2_normalize_numpy(x.astype(np.float64), out=out, block_rows=block_rows)
+        assert np.allclose(out, expected, atol=1e-6)
+
+    cube = x.reshape(10, 100, 64).copy()
+    l2_normalize_numpy_(cube, block_rows=33)
+    assert np.allclose(cube.reshape(1000, 64), expected, atol=1e-6)
+    try:
+        l2_normalize_numpy(x, out=np.empty((64, 1000), np.float32).T)
+        assert False, "A non-contiguous out should be rejected"
+    except ValueError:
+        pass
+
+    for dtype, atol in ((torch.float32, 1e-6), (torch.float16, 1e-3)):
+        t = torch.from_numpy(x).to(dtype)
+        reference = l2_normalize(t.float())
+        assert l2_normalize_(t, block_rows=64) is t and t.dtype == dtype
+        assert torch.allclose(t.float(), reference, atol=atol) and not t[3].any(), dtype
+    out = torch.empty(1000, 64)
+    assert torch.allclose(l2_normalize(torch.from_numpy(x), out=out, block_rows=100), torch.from_numpy(expected).float(), atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_matches_reference_pipeline()
+    test_normalize_many_matches_normalize_text()
+    test_cell_normalizer_caches_repeats()
+    test_stream_matches_whole_string()
+    test_stream_splits_non_ascii_text()
+    test_l2_normalize_in_place_and_out()
+    print("All normalize tests passed!")
@@ -0,0 +1,96 @@
+"""
+Weights Test - streamed weights hash and the on-disk digest cache.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from docling.common.weights import (
+    WeightsHashCache,
+    cached_weights_hash,
+    files_fingerprint,
+    model_files,
+    share_model_memory,
+    weights_hash,
+)
+
+
+def make_state_dict():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(32, 16), torch.nn.LayerNorm(16), torch.nn.Linear(16, 8))
+    state_dict = model.state_dict()
+    state_dict["transposed"] = torch.randn(8, 4).t()  # Non-contiguous
+    state_dict["scalar"] = torch.tensor(3.0)
+    return state_dict
+
+
+def test_weights_hash_matches_concatenated_bytes():
+    """The streamed hash should equal SHA-256 over the concatenated tensor bytes, as before."""
+    state_dict = make_state_dict()
+    weights_bytes = b""
+    for key in sorted(state_dict.keys()):
+        weights_bytes += state_dict[key].cpu().numpy().tobytes()
+    assert weights_hash(state_dict) == hashlib.sha256(weights_bytes).hexdigest()
+
+    blake2b = hashlib.blake2b(weights_bytes, digest_size=32).hexdigest()
+    assert weights_hash(state_dict, "blake2b") == blake2b
+
+    state_dict["0.bias"] = state_dict["0.bias"] + 1
+    assert weights_hash(state_dict) != hashlib.sha256(weights_bytes).hexdigest(), "Changed weights should change the hash"
+
+
+def test_cached_weights_hash():
+    """Digests should be cached per model file fingerprint and recomputed when files change."""
+    state_dict = make_state_dict()
+    expected = weights_hash(state_dict)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model_dir = Path(tmpdir) / "model"
+        (model_dir / "sub").mkdir(parents=True)
+        (model_dir / "config.json").write_text("{}")
+        torch.save(state_dict, model_dir / "sub" / "weights.pt")
+        files = model_files(model_dir)
+        assert [f.name for f in files] == ["config.json", "weights.pt"]
+
+        cache = WeightsHashCache(Path(tmpdir) / "cache" / "weights.json")
+        assert cached_weights_hash(state_dict, files, cache) == (expected, False)
+        assert cached_weights_hash({}, files, cache) == (expected, True), "Second start should skip hashing"
+        assert cached_weights_hash({}, files, WeightsHashCache(cache.path)) == (expected, True)
+        assert cached_weights_hash(state_dict, files, cache, "blake2b") == (weights_hash(state_dict, "blake2b"), False), \
+            "Digests should be cached per algorithm"
+
+        fingerprint = files_fingerprint(files)
+        stat = files[0].stat()
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        assert files_fingerprint(files) != fingerprint, "A newer mtime should change the fingerprint"
+        assert cached_weights_hash(state_dict, files, cache) == (expected, False)
+
+        cache.path.write_text("not json")
+        assert cache.get(files_fingerprint(files)) is None, "A corrupt cache should read as empty"
+        assert cached_weights_hash(state_dict, None, cache) == (expected, False)
+
+        small = WeightsHashCache(Path(tmpdir) / "small.json", max_entries=2)
+        for i in range(3):
+            small.put(f"f{i}", f"d{i}")
+        assert small.get("f0") is None and small.get("f2") == "d2", "Oldest entries should be dropped"
+
+
+def test_share_model_memory():
+    """Parameters and buffers should move to shared memory with their values and hash unchanged."""
+    model = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.BatchNorm1d(4))
+    expected = weights_hash(model.state_dict())
+    assert share_model_memory(model) is model
+    assert all(t.is_shared() for t in model.state_dict().values()), "Every tensor should be shared"
+    assert weights_hash(model.state_dict()) == expected
+
+
+if __name__ == "__main__":
+    test_weights_hash_matches_concatenated_bytes()
+    test_cached_weights_hash()
+    test_share_model_memory()
+    print("All weights tests passed!")